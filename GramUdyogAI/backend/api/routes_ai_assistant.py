@@ -2,11 +2,11 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 from core.translation import llama_translate_string as translate_text
-from core.job_recommender import get_all_job_names, get_relevant_jobs, load_selected_jobs, find_best_job
-from core.scheme_recommender import get_all_scheme_names, get_relevant_scheme_names, load_selected_schemes
-from core.business_suggestion_generation import generate_prompt_from_skills, get_business_suggestions
-from core.llm_function_selector import select_function_and_args, llama_summarize_items
-from core.ai_assistant_data import get_recent_events, get_featured_projects, get_youtube_summaries, get_user_profile_summary, UserInfo, YoutubeSummaryRequest
+from core.intent_router import route_request
+from services import events as event_service
+from services import visual_summaries as visual_summary_service
+from core.streaming import sse_response, token_emitter
+import asyncio
 import re
 
 # Import course functions - handle gracefully if not available
@@ -31,24 +31,46 @@ class AssistantResponse(BaseModel):
 @router.post("/ai-assistant-enhanced")
 async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
     """Supercharged AI assistant: supports all major features, robust chaining, real data, and helper lookups."""
+    return await run_assistant(req)
+
+@router.post("/ai-assistant-enhanced/stream")
+async def ai_assistant_enhanced_stream(req: AssistantRequest):
+    """
+    Server-Sent Events variant of /ai-assistant-enhanced. Emits progress events
+    (translation, selected intent, retrieval) and LLM tokens where the selected
+    feature generates text, then the usual response payload as the "result" event.
+    """
+    return sse_response(lambda emit: run_assistant(req, emit))
+
+async def run_assistant(req: AssistantRequest, emit=None):
+    """Assistant pipeline shared by the JSON and streaming endpoints"""
     print("Received enhanced request:", req.dict())
     
+    def progress(stage, **data):
+        if emit:
+            emit("progress", {"stage": stage, **data})
+
     # 1. Translate input to English if needed
     if req.lang != "en":
-        user_text_en = translate_text(req.text, "en")
+        progress("translating_input")
+        user_text_en = await asyncio.to_thread(translate_text, req.text, "en")
         print("Translated text to English:", user_text_en)
     else:
         user_text_en = req.text
         print("Text is already in English:", user_text_en)
 
-    # 2. Use Llama to select function and arguments
-    func_name, args = select_function_and_args(user_text_en)
+    # 2. Route locally when confident, otherwise use Llama to select function and arguments
+    progress("selecting_intent")
+    func_name, args = await asyncio.to_thread(route_request, user_text_en)
     print("Selected function:", func_name)
     print("Arguments for function:", args)
+    progress("intent_selected", feature_type=func_name, arguments=args)
 
     response_data = AssistantResponse(output="", feature_type=func_name)
+    on_token = token_emitter(emit)
 
     # 3. Robust function handling and chaining
+    progress("retrieving")
     try:
         # --- EVENTS ---
         if func_name == "event_management":
@@ -59,7 +81,7 @@ async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
                 event_name_match = None
             if event_name_match:
                 event_name = event_name_match.group(1).strip()
-                events = await request.app.router.routes[0].endpoint.__globals__['search_events'](event_name, 1)
+                events = await asyncio.to_thread(event_service.search_events, event_name, 1)
                 if events:
                     event_id = events[0]['id']
             if event_id:
@@ -85,7 +107,7 @@ async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
                 event_name_match = None
             if event_name_match:
                 event_name = event_name_match.group(1).strip()
-                events = await request.app.router.routes[0].endpoint.__globals__['search_events'](event_name, 1)
+                events = await asyncio.to_thread(event_service.search_events, event_name, 1)
                 if events:
                     event_id = events[0]['id']
             if isinstance(args, str) and args:
@@ -186,7 +208,8 @@ async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
                 all_names = await get_all_scheme_names()
                 relevant_names = await get_relevant_scheme_names(occupation, all_names)
                 selected_schemes = await load_selected_schemes(relevant_names)
-                explained = await explain_schemes(occupation, selected_schemes)
+                progress("schemes_selected", relevant_schemes=relevant_names)
+                explained = await explain_schemes(occupation, selected_schemes, on_token=on_token)
                 response_data.structured_data = {"schemes": explained}
                 response_data.output = f"Here are some government schemes for {occupation}."
 
@@ -194,7 +217,7 @@ async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
         elif func_name == "business_suggestion":
             from core.business_suggestion_generation import generate_prompt_from_skills, get_business_suggestions
             prompt = generate_prompt_from_skills(args)
-            suggestions = await get_business_suggestions(prompt)
+            suggestions = await get_business_suggestions(prompt, on_token=on_token)
             suggestions_data = [s.dict() for s in suggestions.suggestions] if hasattr(suggestions, "suggestions") else []
             response_data.structured_data = {"suggestions": suggestions_data}
             response_data.output = f"Here are some business suggestions."
@@ -207,7 +230,7 @@ async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
             response_data.output = f"Here are some recommended courses."
         elif func_name == "skill_tutorial":
             from core.skill_tutorial import get_skill_tutorials
-            tutorials = await get_skill_tutorials(args)
+            tutorials = await asyncio.to_thread(get_skill_tutorials, args)
             response_data.structured_data = {"tutorials": tutorials}
             response_data.output = f"Here are some skill tutorials."
 
@@ -266,20 +289,20 @@ async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
 
         # --- VISUAL SUMMARY ---
         elif func_name == "visual_summary":
-            # Use the real visual summary API endpoint
-            import httpx
-            async with httpx.AsyncClient() as client:
-                vs_req = {"topic": args if isinstance(args, str) else (args.get("topic") if isinstance(args, dict) else ""),
-                          "context": args.get("context") if isinstance(args, dict) and "context" in args else "",
-                          "language": req.lang or "en"}
-                vs_response = await client.post(f"http://localhost:8000/api/visual-summary", json=vs_req)
-                if vs_response.status_code == 200:
-                    summary = vs_response.json()
-                    response_data.structured_data = {"visual_summary": summary}
-                    response_data.output = f"Here is a visual summary for your topic."
-                else:
-                    response_data.structured_data = {"visual_summary": {"error": "Failed to generate visual summary."}}
-                    response_data.output = "Sorry, could not generate a visual summary."
+            # Generate in-process through the shared service layer
+            vs_args = args if isinstance(args, dict) else {"topic": args if isinstance(args, str) else ""}
+            try:
+                summary = await visual_summary_service.create_visual_summary(
+                    topic=vs_args.get("topic", ""),
+                    context=vs_args.get("context", ""),
+                    language=req.lang or "en"
+                )
+                response_data.structured_data = {"visual_summary": summary}
+                response_data.output = f"Here is a visual summary for your topic."
+            except Exception as e:
+                print(f"Visual summary generation failed: {e}")
+                response_data.structured_data = {"visual_summary": {"error": "Failed to generate visual summary."}}
+                response_data.output = "Sorry, could not generate a visual summary."
 
         # --- AUDIO (STT) ---
         # elif func_name == "audio_transcription":
@@ -305,14 +328,15 @@ async def ai_assistant_enhanced(req: AssistantRequest, request: Request = None):
 
     # 4. Translate output back to user's language if needed
     if req.lang != "en":
+        progress("translating_output", lang=req.lang)
         try:
             from core.translation import translate_structured_data_safely, generate_short_summary, translate_text_safely
             if response_data.structured_data:
-                response_data.structured_data = translate_structured_data_safely(response_data.structured_data, req.lang)
-                response_data.output = translate_text_safely(response_data.output, req.lang)
+                response_data.structured_data = await asyncio.to_thread(translate_structured_data_safely, response_data.structured_data, req.lang)
+                response_data.output = await asyncio.to_thread(translate_text_safely, response_data.output, req.lang)
             elif response_data.summary:
-                response_data.summary = translate_text_safely(response_data.summary, req.lang)
-            response_data.output = translate_text_safely(response_data.output, req.lang)
+                response_data.summary = await asyncio.to_thread(translate_text_safely, response_data.summary, req.lang)
+            response_data.output = await asyncio.to_thread(translate_text_safely, response_data.output, req.lang)
         except Exception as e:
             print(f"Translation error: {e}")
             import traceback
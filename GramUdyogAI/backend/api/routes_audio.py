@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from core.audio_generation import TextToSpeech
 import os
@@ -45,6 +45,21 @@ async def generate_audio(request: TTSRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/generate/stream")
+async def stream_audio(request: TTSRequest):
+    """Stream WAV audio sentence by sentence as it is synthesized"""
+    if not tts.token:
+        raise HTTPException(status_code=503, detail="Audio generation disabled - E2E_TIR_ACCESS_TOKEN not set")
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    language = LANGUAGE_MAP.get(request.language, request.language)
+    return StreamingResponse(
+        tts.stream_audio(text=request.text, speaker=request.speaker, language=language),
+        media_type="audio/wav",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/generate/{language}")
 async def generate_localized_audio(request: TTSRequest, language: str):
     print(f"\n=== Generating Audio for Language: {language} ===")
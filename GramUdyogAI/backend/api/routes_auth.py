@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, validator
 import sqlite3
@@ -7,11 +7,18 @@ import bcrypt
 import jwt
 import re
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import secrets
+import asyncio
+import threading
+import time
 import os
 from dotenv import load_dotenv
+from core.rate_limiter import KeyedRateLimiter
+from core.metrics import InstrumentedConnection, record_cache
 
 # Load environment variables
 load_dotenv()
@@ -28,14 +35,34 @@ JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRY_HOURS = 24
 
+# In-process caches for get_current_user: verified token payloads until expiry and
+# user records for a short TTL, so authenticated requests skip the users lookup
+USER_CACHE_TTL_SECONDS = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+TOKEN_CACHE_MAX_ENTRIES = 10000
+_auth_cache_lock = threading.Lock()
+_token_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_user_cache: Dict[int, Tuple[float, Optional[Dict[str, Any]]]] = {}
+
 # Password validation patterns
 PASSWORD_PATTERN = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$')
 PHONE_PATTERN = re.compile(r'^\+?[1-9]\d{1,14}$')
 
+# bcrypt costs 100-300 ms of CPU per call, so it runs on a small dedicated pool.
+# At most PASSWORD_QUEUE_SLOTS calls may be running or queued on it; beyond
+# that requests are turned away with 503 instead of waiting indefinitely.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_QUEUE_SLOTS = int(os.getenv("PASSWORD_QUEUE_SLOTS", str(PASSWORD_HASH_WORKERS * 4)))
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_slots = asyncio.Semaphore(PASSWORD_QUEUE_SLOTS)
+
+# Login throttling: short bursts allowed, then attempts refill slowly
+_login_phone_limiter = KeyedRateLimiter(rate=5 / 60, burst=5)
+_login_ip_limiter = KeyedRateLimiter(rate=30 / 60, burst=20)
+
 # Fix the get_db function to return dictionary rows
 def get_db_connection():
     """Get database connection with row factory for dictionary access"""
-    conn = sqlite3.connect('gramudyogai.db')
+    conn = sqlite3.connect('gramudyogai.db', factory=InstrumentedConnection)
     conn.row_factory = sqlite3.Row  # This makes rows accessible by column name
     return conn
 
@@ -120,6 +147,40 @@ def verify_password(password: str, hashed: str) -> bool:
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def _run_password_work(func, *args):
+    if _password_slots.locked():
+        logger.warning("Password hashing queue full; rejecting request")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": "1"}
+        )
+    async with _password_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bounded bcrypt pool, keeping the event loop free"""
+    return await _run_password_work(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password on the bounded bcrypt pool, keeping the event loop free"""
+    return await _run_password_work(verify_password, password, hashed)
+
+def check_login_rate_limit(phone: str, client_ip: Optional[str]):
+    """Reject login bursts per phone number and per client IP before any bcrypt work is queued"""
+    retry_after = max(
+        _login_phone_limiter.try_acquire(phone),
+        _login_ip_limiter.try_acquire(client_ip) if client_ip else 0.0
+    )
+    if retry_after > 0:
+        logger.warning(f"Login throttled for phone={phone} ip={client_ip}")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+
 def create_jwt_token(user_id: int, user_type: str) -> str:
     """Create JWT token"""
     payload = {
@@ -131,30 +192,62 @@ def create_jwt_token(user_id: int, user_type: str) -> str:
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 def verify_jwt_token(token: str) -> Dict[str, Any]:
-    """Verify JWT token and return payload"""
+    """Verify JWT token and return payload (memoized until the token expires)"""
+    now = time.time()
+    with _auth_cache_lock:
+        cached = _token_cache.get(token)
+        if cached and cached["exp"] > now:
+            _token_cache.move_to_end(token)
+            record_cache("auth_token", "hit")
+            return cached
+    record_cache("auth_token", "miss")
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if "exp" in payload:
+        with _auth_cache_lock:
+            _token_cache[token] = payload
+            if len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+                _token_cache.popitem(last=False)
+    return payload
+
+def invalidate_user_cache(user_id: int):
+    """Forget a cached user record after its profile, status or password changes"""
+    with _auth_cache_lock:
+        _user_cache.pop(user_id, None)
+
+def _load_user(user_id: int) -> Optional[Dict[str, Any]]:
+    now = time.time()
+    with _auth_cache_lock:
+        cached = _user_cache.get(user_id)
+        if cached and cached[0] > now:
+            record_cache("auth_user", "hit")
+            return cached[1]
+    record_cache("auth_user", "miss")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, phone, user_type, name, organization, is_active FROM users WHERE id = ?', (user_id,))
+    row = cursor.fetchone()
+    conn.close()
+    user = dict(row) if row else None
+    with _auth_cache_lock:
+        _user_cache[user_id] = (now + USER_CACHE_TTL_SECONDS, user)
+    return user
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Get current user from JWT token"""
     token = credentials.credentials
     payload = verify_jwt_token(token)
-    
+
     # Verify user still exists and is active
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, phone, user_type, name, organization, is_active FROM users WHERE id = ?', (payload['user_id'],))
-    user = cursor.fetchone()
-    conn.close()
-    
+    user = _load_user(payload['user_id'])
+
     if not user or not user['is_active']:
         raise HTTPException(status_code=401, detail="User not found or inactive")
-    
+
     return {
         "id": user['id'],
         "phone": user['phone'],
@@ -176,7 +269,7 @@ async def register_user(user_data: UserRegister):
             raise HTTPException(status_code=400, detail="Phone number already registered")
         
         # Hash password
-        password_hash = hash_password(user_data.password)
+        password_hash = await hash_password_async(user_data.password)
         
         # Create user
         cursor.execute('''
@@ -218,8 +311,9 @@ async def register_user(user_data: UserRegister):
         raise HTTPException(status_code=500, detail="Registration failed")
 
 @router.post("/auth/login", response_model=TokenResponse)
-async def login_user(login_data: UserLogin):
+async def login_user(login_data: UserLogin, request: Request):
     """Login user"""
+    check_login_rate_limit(login_data.phone, request.client.host if request.client else None)
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -241,7 +335,7 @@ async def login_user(login_data: UserLogin):
             raise HTTPException(status_code=401, detail="Account is deactivated")
         
         # Verify password
-        if not verify_password(login_data.password, user['password_hash']):
+        if not await verify_password_async(login_data.password, user['password_hash']):
             conn.close()
             raise HTTPException(status_code=401, detail="Invalid phone number or password")
         
@@ -335,11 +429,11 @@ async def change_password(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Verify current password
-    if not verify_password(current_password, user['password_hash']):
+    if not await verify_password_async(current_password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Current password is incorrect")
     
     # Hash new password
-    new_password_hash = hash_password(new_password)
+    new_password_hash = await hash_password_async(new_password)
     
     # Update password
     cursor.execute('''
@@ -350,6 +444,7 @@ async def change_password(
     
     conn.commit()
     conn.close()
+    invalidate_user_cache(current_user['id'])
     
     return {"message": "Password changed successfully"}
 
@@ -409,7 +504,7 @@ async def reset_password(reset_data: PasswordReset, reset_token: str):
         raise HTTPException(status_code=400, detail="Reset token has expired")
     
     # Hash new password
-    new_password_hash = hash_password(reset_data.new_password)
+    new_password_hash = await hash_password_async(reset_data.new_password)
     
     # Update password
     cursor.execute('''
@@ -427,6 +522,7 @@ async def reset_password(reset_data: PasswordReset, reset_token: str):
     
     conn.commit()
     conn.close()
+    invalidate_user_cache(token_record['user_id'])
     
     return {"message": "Password reset successfully"}
 
@@ -443,7 +539,7 @@ async def delete_account(
     cursor.execute('SELECT password_hash FROM users WHERE id = ?', (current_user['id'],))
     user = cursor.fetchone()
     
-    if not verify_password(password, user['password_hash']):
+    if not await verify_password_async(password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Password is incorrect")
     
     # Soft delete (deactivate account)
@@ -455,5 +551,6 @@ async def delete_account(
     
     conn.commit()
     conn.close()
+    invalidate_user_cache(current_user['id'])
     
     return {"message": "Account deleted successfully"}
@@ -12,6 +12,7 @@ from core.scheme_recommender import (
     explain_schemes,
 )
 from core.translation import llama_translate_string as translate_text
+from core.streaming import sse_response, token_emitter
 #from core.government_api import router as government_router
 
 from fastapi.responses import JSONResponse
@@ -48,3 +49,14 @@ async def suggest_business(data: Recommendation):
         return suggestions
     return suggestions.dict() if hasattr(suggestions, 'dict') else suggestions
 
+@router.post('/suggest-business/stream')
+async def suggest_business_stream(data: Recommendation):
+    """Server-Sent Events variant of /suggest-business: raw LLM tokens, then the validated suggestions"""
+    async def produce(emit):
+        emit("progress", {"stage": "generating_suggestions"})
+        prompt = generate_prompt_from_skills(data.skills)
+        suggestions = await get_business_suggestions(prompt, on_token=token_emitter(emit))
+        if isinstance(suggestions, dict) and "error" in suggestions:
+            return suggestions
+        return suggestions.dict() if hasattr(suggestions, 'dict') else suggestions
+    return sse_response(produce)
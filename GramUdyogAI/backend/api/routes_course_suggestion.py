@@ -13,6 +13,7 @@ from core.course_recommender import (
     generate_structured_recommendations
 )
 from core.translation import llama_translate_string as translate_text
+from core.metrics import InstrumentedConnection
 
 # --- 1. SETUP & MODELS ---
 router = APIRouter()
@@ -38,7 +39,7 @@ def get_db_connection():
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Database not found.")
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(DB_PATH, factory=InstrumentedConnection)
         conn.row_factory = sqlite3.Row
         yield conn
     finally:
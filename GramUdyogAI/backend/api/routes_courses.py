@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 from init_db import get_db
+from services.tags import tag_filter, tag_prefix_filter, tag_prefix_bounds, normalize_tag
+from services.row_mappers import COURSE_MAPPER
+from core.fast_json import FastJSONResponse
+from services.http_cache import catalog_response, table_version
 from core.translation import llama_translate_string as translate_text
 from core.skill_tutorial import llama_chat_completion as get_llm_response
 from typing import Optional, List
@@ -60,7 +64,7 @@ async def get_courses(
         params.append(skill_level)
     
     if conditions:
-        base_query += " WHERE " + " AND ".join(conditions)
+        base_query += " AND " + " AND ".join(conditions)
     
     base_query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
     params.extend([limit, offset])
@@ -78,28 +82,12 @@ async def get_courses(
     
     conn.close()
 
-    return {
-        "courses": [
-    {
-        "id": course['id'],
-        "name": course['name'],
-        "link": course['link'],
-        "category": course['category'],
-        "skill_level": course['skill_level'],
-        "duration": course['duration'],
-        "provider": course['provider'],
-        "description": course['description'],
-        "tags": json.loads(course['tags'] or '[]'),
-        "source": course['source'],
-        "is_active": bool(course['is_active']),
-        "created_at": course['created_at'],
-    }
-    for course in courses
-],
+    return FastJSONResponse({
+        "courses": COURSE_MAPPER.many(courses),
         "total_count": total_count,
         "limit": limit,
         "offset": offset
-    }
+    })
 
 @router.get("/courses/search")
 async def search_courses(
@@ -107,6 +95,7 @@ async def search_courses(
     category: Optional[str] = Query(None, description="Filter by category"),
     skill_level: Optional[str] = Query(None, description="Filter by skill level"),
     provider: Optional[str] = Query(None, description="Filter by provider"),
+    tag: Optional[str] = Query(None, description="Filter by tag"),
     limit: int = Query(20, description="Number of results to return"),
     offset: int = Query(0, description="Number of results to skip")
 ):
@@ -124,9 +113,14 @@ async def search_courses(
     params = []
     
     if query:
-        conditions.append("(name LIKE ? OR description LIKE ? OR tags LIKE ?)")
+        # Tags match by prefix so partial words still hit ("tailor" -> "tailoring")
+        conditions.append(f"(name LIKE ? OR description LIKE ? OR {tag_prefix_filter(['course_tags'])})")
         search_term = f"%{query}%"
-        params.extend([search_term, search_term, search_term])
+        params.extend([search_term, search_term, *tag_prefix_bounds(query)])
+    
+    if tag:
+        conditions.append(tag_filter(['course_tags']))
+        params.append(normalize_tag(tag))
     
     if category:
         conditions.append("category = ?")
@@ -159,64 +153,16 @@ async def search_courses(
     
     conn.close()
 
-    return {
-        "courses": [
-            {
-        "id": course['id'],
-        "name": course['name'],
-        "link": course['link'],
-        "category": course['category'],
-        "skill_level": course['skill_level'],
-        "duration": course['duration'],
-        "provider": course['provider'],
-        "description": course['description'],
-        "tags": json.loads(course['tags'] or '[]'),
-        "source": course['source'],
-        "is_active": bool(course['is_active']),
-        "created_at": course['created_at'],
-    }
-            for course in courses
-        ],
+    return FastJSONResponse({
+        "courses": COURSE_MAPPER.many(courses),
         "total_count": total_count,
         "limit": limit,
         "offset": offset
-    }
+    })
 
-@router.get("/courses/{course_id}")
-async def get_course_by_id(course_id: int):
-    """Get a specific course by ID"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT id, name, link, category, skill_level, duration, provider, description, tags, source, is_active, created_at
-        FROM courses WHERE id = ? AND is_active = 1
-    """, (course_id,))
-    course = cursor.fetchone()
-
-    conn.close()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    return  {
-        "id": course['id'],
-        "name": course['name'],
-        "link": course['link'],
-        "category": course['category'],
-        "skill_level": course['skill_level'],
-        "duration": course['duration'],
-        "provider": course['provider'],
-        "description": course['description'],
-        "tags": json.loads(course['tags'] or '[]'),
-        "source": course['source'],
-        "is_active": bool(course['is_active']),
-        "created_at": course['created_at'],
-    }
-
-@router.get("/courses/categories")
-async def get_course_categories():
-    """Get all available course categories"""
+# Catalog endpoints, declared before /courses/{course_id} so the path parameter does
+# not capture them; responses are cached and revalidated by services.http_cache
+def load_course_categories():
     conn = get_db()
     cursor = conn.cursor()
 
@@ -233,9 +179,7 @@ async def get_course_categories():
         for cat in categories
     ]
 
-@router.get("/courses/skill-levels")
-async def get_skill_levels():
-    """Get all available skill levels"""
+def load_skill_levels():
     conn = get_db()
     cursor = conn.cursor()
 
@@ -252,6 +196,35 @@ async def get_skill_levels():
         for level in levels
     ]
 
+@router.get("/courses/categories")
+async def get_course_categories(request: Request):
+    """Get all available course categories"""
+    return catalog_response(request, table_version("courses"), load_course_categories)
+
+@router.get("/courses/skill-levels")
+async def get_skill_levels(request: Request):
+    """Get all available skill levels"""
+    return catalog_response(request, table_version("courses"), load_skill_levels)
+
+@router.get("/courses/{course_id}")
+async def get_course_by_id(course_id: int):
+    """Get a specific course by ID"""
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT id, name, link, category, skill_level, duration, provider, description, tags, source, is_active, created_at
+        FROM courses WHERE id = ? AND is_active = 1
+    """, (course_id,))
+    course = cursor.fetchone()
+
+    conn.close()
+
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    return COURSE_MAPPER(course)
+
 @router.post("/courses")
 async def create_course(course: CourseCreate):
     """Create a new course"""
@@ -1,17 +1,29 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse
 from core.skill_tutorial import generate_visual_summary_json
 from core.llm_recommendations import get_course_recommendations
-from core.job_recommender import get_all_job_names, get_relevant_jobs, load_selected_jobs, find_best_job
+from core.job_recommender import recommend_jobs
 from core.business_suggestion_generation import generate_prompt_from_skills, get_business_suggestions
 from core.scheme_recommender import get_all_scheme_names, get_relevant_scheme_names, load_selected_schemes, explain_schemes
 from init_db import get_db
+from api.routes_auth import verify_jwt_token
+from services.dashboard_cache import (
+    get_cached_dashboard,
+    set_cached_dashboard,
+    get_refresh_candidates,
+    profile_hash,
+)
+import asyncio
 import json
-from datetime import datetime
+import time
+import uuid
+from typing import Optional
 from groq import Groq
 import os
 from dotenv import load_dotenv, find_dotenv
 from core.translation import llama_translate_string as translate_text
+from core.metrics import instrument_groq
 # load_dotenv(find_dotenv())
 router = APIRouter()
 
@@ -121,38 +133,31 @@ LANGUAGE_MAP = {
 
 
 
-def get_latest_profile_id():
-    conn = get_db()
-    cursor = conn.cursor()
-    result = cursor.execute(
-        'SELECT id FROM users ORDER BY created_at DESC LIMIT 1'
-    ).fetchone()
-    conn.close()
-    return result[0] if result else None
+optional_bearer = HTTPBearer(auto_error=False)
 
-def get_dashboard_cache(profile_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    result = cursor.execute(
-        "SELECT dashboard_json FROM dashboard_cache WHERE profile_id = ?", (profile_id,)
-    ).fetchone()
-    conn.close()
-    return json.loads(result["dashboard_json"]) if result else None
+def resolve_requesting_user_id(credentials: Optional[HTTPAuthorizationCredentials]):
+    """User verified by the bearer token, or None; a user_id in the posted profile is never trusted"""
+    if credentials:
+        try:
+            return verify_jwt_token(credentials.credentials)["user_id"]
+        except Exception:
+            pass
+    return None
 
-def set_dashboard_cache(profile_id, dashboard_json):
+def load_profile_for_dashboard(user_id: int) -> Optional[dict]:
+    """Current unified profile of a user, shaped like the profile the frontend posts"""
     conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT OR REPLACE INTO dashboard_cache (profile_id, dashboard_json, created_at) VALUES (?, ?, ?)",
-        (profile_id, json.dumps(dashboard_json), datetime.now())
-    )
-    conn.commit()
+    row = conn.execute('SELECT * FROM unified_profiles WHERE user_id = ?', (user_id,)).fetchone()
     conn.close()
+    if not row:
+        return None
+    profile = dict(row)
+    profile['skills'] = json.loads(profile['skills'] or "[]")
+    return profile
 
 # Use Groq LLM for all extraction
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-groq_client = Groq(api_key=GROQ_API_KEY)
+groq_client = instrument_groq(Groq(api_key=GROQ_API_KEY), "dashboard_profile")
 
 async def extract_dashboard_fields_with_llm(profile: dict, language_code: str):
     prompt = f"""
@@ -176,8 +181,8 @@ User profile:
 {json.dumps(profile, ensure_ascii=False)}
 Language code: {language_code}
 """
-    # --- FIX: Remove await, use sync call ---
-    response = groq_client.chat.completions.create(
+    response = await asyncio.to_thread(
+        groq_client.chat.completions.create,
         model="llama3-8b-8192",
         messages=[{"role": "user", "content": prompt}],
         response_format={"type": "json_object"},
@@ -188,43 +193,182 @@ Language code: {language_code}
     except Exception:
         return {}
 
+# Per-section time budgets in seconds; a section that overruns is returned as pending
+SECTION_TIMEOUTS = {
+    "jobs": 12,
+    "business_suggestions": 20,
+    "schemes": 15,
+}
+# Pending sections are kept this long for clients to collect them
+PENDING_TTL_SECONDS = 600
+# Background precompute of dashboards for recently active users (0 disables it)
+PRECOMPUTE_INTERVAL_SECONDS = int(os.getenv("DASHBOARD_PRECOMPUTE_INTERVAL_SECONDS", "300"))
+PRECOMPUTE_BATCH_SIZE = 5
+
+_pending_dashboards = {}
+
+async def build_jobs_section(llm_fields: dict):
+    job_query = llm_fields.get("jobs", {}).get("query", "")
+    print('Job query:', job_query)
+    jobs = await recommend_jobs(job_query, top_k=1)
+    print('Best job found:', jobs[0] if jobs else None)
+    return jobs
+
+async def build_business_section(llm_fields: dict):
+    bs_prompt = llm_fields.get("business_suggestions", {}).get("prompt", "")
+    prompt = generate_prompt_from_skills(bs_prompt)
+    suggestions = await get_business_suggestions(prompt)
+    if hasattr(suggestions, "suggestions"):
+        return [s.model_dump() for s in suggestions.suggestions]
+    if isinstance(suggestions, dict) and "suggestions" in suggestions:
+        return suggestions["suggestions"]
+    return []
+
+async def build_schemes_section(llm_fields: dict):
+    occupation = llm_fields.get("schemes", {}).get("occupation", "")
+    all_names = await get_all_scheme_names()
+    relevant_names = await get_relevant_scheme_names(occupation, all_names)
+    selected_schemes = await load_selected_schemes(relevant_names)
+    return await explain_schemes(occupation, selected_schemes)
+
+async def run_section(name: str, task: asyncio.Task, timeout: float):
+    """Wait up to timeout for a section. Returns (finished, value); a timed-out task keeps running"""
+    try:
+        return True, await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        print(f"Dashboard section '{name}' exceeded {timeout}s budget")
+        return False, None
+    except Exception as e:
+        print(f"Dashboard section '{name}' failed: {e}")
+        return True, []
+
+def register_pending_sections(results: dict, pending: dict, on_complete) -> str:
+    """
+    Track sections still running after the response; once they finish the full
+    dashboard is passed to the on_complete coroutine, scheduled as a task
+    """
+    now = time.time()
+    for token in [t for t, entry in _pending_dashboards.items() if now - entry["created"] > PENDING_TTL_SECONDS]:
+        _pending_dashboards.pop(token, None)
+
+    token = uuid.uuid4().hex
+    entry = {"created": now, "results": dict(results), "tasks": pending}
+    _pending_dashboards[token] = entry
+
+    def on_done(_):
+        if not all(task.done() for task in pending.values()):
+            return
+        for name, task in pending.items():
+            entry["results"][name] = task.result() if not task.cancelled() and task.exception() is None else []
+        entry["store_task"] = asyncio.ensure_future(on_complete(entry["results"]))
+
+    for task in pending.values():
+        task.add_done_callback(on_done)
+    return token
+
+@router.get("/dashboard-recommendations/pending/{token}")
+async def get_pending_dashboard_sections(token: str):
+    """Collect sections that were still running when the dashboard was returned"""
+    entry = _pending_dashboards.get(token)
+    if not entry:
+        return JSONResponse(content={"error": "Unknown or expired token"}, status_code=404)
+    sections, still_pending = {}, []
+    for name, task in entry["tasks"].items():
+        if not task.done():
+            still_pending.append(name)
+        elif task.cancelled() or task.exception() is not None:
+            sections[name] = []
+        else:
+            sections[name] = task.result()
+    if not still_pending:
+        _pending_dashboards.pop(token, None)
+    return JSONResponse(content={**sections, "pending_sections": still_pending})
+
+async def generate_dashboard(profile: dict, language_code: str) -> dict:
+    """Build a complete dashboard without time budgets (used by the background refresher)"""
+    llm_fields = await extract_dashboard_fields_with_llm(profile, language_code)
+    results = {
+        "visual_summary": {"error": "Visual summary generation is disabled."},
+        "csr_courses": [],
+        "jobs": [],
+        "business_suggestions": [],
+        "schemes": [],
+    }
+    builders = {
+        "jobs": build_jobs_section(llm_fields),
+        "business_suggestions": build_business_section(llm_fields),
+        "schemes": build_schemes_section(llm_fields),
+    }
+    outcomes = await asyncio.gather(*builders.values(), return_exceptions=True)
+    for name, value in zip(builders, outcomes):
+        results[name] = [] if isinstance(value, Exception) else value
+    return results
+
+async def refresh_dashboards_once(limit: int = PRECOMPUTE_BATCH_SIZE):
+    """Rebuild missing, invalidated or nearly expired dashboards of recently active users"""
+    for candidate in await asyncio.to_thread(get_refresh_candidates, limit):
+        user_id = candidate["user_id"]
+        profile = await asyncio.to_thread(load_profile_for_dashboard, user_id) or candidate["profile"]
+        if not profile:
+            continue
+        language_code = candidate["language"]
+        try:
+            results = await generate_dashboard(profile, language_code)
+            await asyncio.to_thread(set_cached_dashboard, user_id, language_code, profile, results)
+            print(f"Precomputed dashboard for user {user_id} ({language_code})")
+        except Exception as e:
+            print(f"Dashboard precompute failed for user {user_id}: {e}")
+
+async def dashboard_refresh_worker():
+    while True:
+        try:
+            await refresh_dashboards_once()
+        except Exception as e:
+            print(f"Dashboard refresh worker error: {e}")
+        await asyncio.sleep(PRECOMPUTE_INTERVAL_SECONDS)
+
+_refresh_worker_task: Optional[asyncio.Task] = None
+
+def start_dashboard_refresh_worker():
+    """Start the precompute worker once (if enabled); started by the app lifespan in main.py"""
+    global _refresh_worker_task
+    if PRECOMPUTE_INTERVAL_SECONDS > 0 and (_refresh_worker_task is None or _refresh_worker_task.done()):
+        _refresh_worker_task = asyncio.create_task(dashboard_refresh_worker())
+    return _refresh_worker_task
+
 @router.post("/dashboard-recommendations")
-async def dashboard_recommendations(request: Request):
+async def dashboard_recommendations(request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)):
     body = await request.json()
     force_refresh = body.get("force_refresh", False)
-    profile = body if "skills" in body else None
-    lang = body.get("language", "en") or "en"
-
-    # If not profile in POST, try to get latest from DB
-    if not profile:
-        conn = get_db()
-        cursor = conn.cursor()
-        result = cursor.execute(
-            'SELECT * FROM users ORDER BY created_at DESC LIMIT 1'
-        ).fetchone()
-        conn.close()
-        if not result:
+
+    # The dashboard is cached only under the user verified by the bearer token;
+    # without a posted profile that user's stored profile is used
+    user_id = resolve_requesting_user_id(credentials)
+    if "skills" in body:
+        profile = body
+    elif user_id is None:
+        return JSONResponse(content={"error": "Sign in or send a profile"}, status_code=401)
+    else:
+        profile = await asyncio.to_thread(load_profile_for_dashboard, user_id)
+        if not profile:
             return JSONResponse(content={"error": "No user profile found"}, status_code=400)
-        profile = dict(result)
-        profile['skills'] = profile['skills'].split(',') if profile['skills'] else []
-        profile['jobTypes'] = profile['job_types'].split(',') if profile.get('job_types') else []
 
-    # Normalize language code
-    language = profile.get("language", "en")
+    # Normalize language code; a requested language wins over the profile's
+    language = body.get("language") or profile.get("language") or "en"
     language_code = LANGUAGE_MAP.get(language.strip().lower(), "en")
 
-    # Get latest profile id for caching
-    profile_id = get_latest_profile_id()
-    if not profile_id:
-        return JSONResponse(content={"error": "No user profile found"}, status_code=400)
-
-    # Try cache unless force_refresh
-    if not force_refresh:
-        cached = get_dashboard_cache(profile_id)
+    # Cache per requesting user, profile and language; anonymous requests are not cached
+    if user_id is not None and not force_refresh:
+        cached = await asyncio.to_thread(get_cached_dashboard, user_id, language_code, profile_hash(profile, language_code))
         if cached:
-            print('Returning cached dashboard', cached)
+            print('Returning cached dashboard for user', user_id)
             return JSONResponse(content=cached)
 
+    async def store(dashboard):
+        if user_id is not None:
+            await asyncio.to_thread(set_cached_dashboard, user_id, language_code, profile, dashboard)
+            print('Cached dashboard for user ID:', user_id)
+
     # Use LLM to extract all relevant fields for dashboard
     try:
         llm_fields = await extract_dashboard_fields_with_llm(profile, language_code)
@@ -267,52 +411,32 @@ async def dashboard_recommendations(request: Request):
     except Exception:
         results["csr_courses"] = []
 
-    # Jobs (use LLM query)
-    try:
-        job_query = llm_fields.get("jobs", {}).get("query", "")
-        print('Job query:', job_query)
-        all_job_names = await get_all_job_names()
-        print('All job names:', all_job_names)
-        relevant_job_names = await get_relevant_jobs(job_query, all_job_names)
-        relevant_jobs = await load_selected_jobs(relevant_job_names.get('relevant_jobs', []) if isinstance(relevant_job_names, dict) else relevant_job_names)
-        best_job = await find_best_job(job_query, relevant_jobs)
-        if best_job:
-            results["jobs"] = [best_job]
-        print('Best job found:', best_job)
-    except Exception:
-        results["jobs"] = []
+    # Jobs, business suggestions and schemes are independent, so run them concurrently
+    sections = {
+        "jobs": build_jobs_section(llm_fields),
+        "business_suggestions": build_business_section(llm_fields),
+        "schemes": build_schemes_section(llm_fields),
+    }
+    tasks = {name: asyncio.create_task(coro) for name, coro in sections.items()}
+    outcomes = await asyncio.gather(*(
+        run_section(name, task, SECTION_TIMEOUTS[name]) for name, task in tasks.items()
+    ))
 
-    # Business Suggestions (use LLM prompt)
-    try:
-        bs_prompt = llm_fields.get("business_suggestions", {}).get("prompt", "")
-        prompt = generate_prompt_from_skills(bs_prompt)
-        suggestions = await get_business_suggestions(prompt)
-        if hasattr(suggestions, "suggestions"):
-            results["business_suggestions"] = [s.model_dump() for s in suggestions.suggestions]
-        elif isinstance(suggestions, dict) and "suggestions" in suggestions:
-            results["business_suggestions"] = suggestions["suggestions"]
-        elif isinstance(suggestions, dict) and "error" in suggestions:
-            results["business_suggestions"] = []
+    pending = {}
+    for (name, task), (finished, value) in zip(tasks.items(), outcomes):
+        if finished:
+            results[name] = value
         else:
-            results["business_suggestions"] = []
-        print('Business suggestions:', results["business_suggestions"])
-    except Exception:
-        results["business_suggestions"] = []
+            pending[name] = task
 
-    # Schemes (use LLM occupation)
-    try:
-        occupation = llm_fields.get("schemes", {}).get("occupation", "")
-        all_names = await get_all_scheme_names()
-        relevant_names = await get_relevant_scheme_names(occupation, all_names)
-        selected_schemes = await load_selected_schemes(relevant_names)
-        explanation = await explain_schemes(occupation, selected_schemes)
-        results["schemes"] = explanation
-        print('Schemes:', results["schemes"])
-    except Exception:
-        results["schemes"] = []
+    if pending:
+        # Return what is ready now; the client polls the rest by token
+        token = register_pending_sections(results, pending, store)
+        results["pending_sections"] = list(pending)
+        results["pending_token"] = token
+        print('Dashboard sections still pending:', list(pending))
+        return JSONResponse(content=results)
 
-    # Cache the dashboard for this profile
-    set_dashboard_cache(profile_id, results)
-    print('Cached dashboard for profile ID:', profile_id)
+    await store(results)
     print('Dashboard results:', results)
     return JSONResponse(content=results)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+import asyncio
 import sqlite3
 from datetime import datetime, timedelta
 import json
@@ -12,6 +13,13 @@ from core.skill_tutorial import generate_visual_summary_json
 from api.routes_auth import get_current_user
 from init_db import get_db
 from models.team_member import TeamMember
+from services import events as event_service
+from services.events import serialize_events
+from services.visual_summaries import store_visual_summary
+from core.fast_json import FastJSONResponse
+from core.metrics import Counter, Gauge
+from services.user_activity import invalidate_user_activity
+from services.tags import sync_tags, delete_tags, tag_filter, normalize_tag
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -73,58 +81,92 @@ class SocialMediaPost(BaseModel):
     image_url: Optional[str] = None
     scheduled_at: Optional[str] = None
 
-def update_event_status_automatically():
-    """Automatically update event status based on dates"""
-    try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        current_date = datetime.now().date()
-        
-        # Update events that should be ongoing
-        cursor.execute('''
-            UPDATE events 
-            SET status = 'ongoing', updated_at = ?
-            WHERE status = 'active' 
-            AND date(start_date) <= ? 
-            AND date(end_date) >= ?
-        ''', (datetime.now().isoformat(), current_date.isoformat(), current_date.isoformat()))
-        
-        # Update events that should be completed
-        cursor.execute('''
-            UPDATE events 
-            SET status = 'completed', updated_at = ?
-            WHERE status IN ('active', 'ongoing') 
-            AND date(end_date) < ?
-        ''', (datetime.now().isoformat(), current_date.isoformat()))
-        
-        # Update events that should be active (future events)
-        cursor.execute('''
-            UPDATE events 
-            SET status = 'active', updated_at = ?
-            WHERE status = 'draft' 
-            AND date(start_date) > ?
-        ''', (datetime.now().isoformat(), current_date.isoformat()))
-        
-        conn.commit()
-        conn.close()
-        logger.info("Event statuses updated automatically")
-        
-    except Exception as e:
-        logger.error(f"Error updating event statuses: {e}")
-
+# Longest the status scheduler sleeps without re-checking, in case events are
+# edited outside the API or the clock jumps
+STATUS_SCHEDULER_MAX_SLEEP_SECONDS = 6 * 3600
+
+# Exposed through GET /events/status-scheduler; lag is how late a transition
+# was applied after the moment it became due
+status_scheduler_stats = {
+    "runs": 0,
+    "transitions_applied": 0,
+    "last_run_at": None,
+    "next_transition_at": None,
+    "last_lag_seconds": 0.0,
+    "max_lag_seconds": 0.0,
+}
+
+# The same figures at /metrics
+STATUS_SCHEDULER_RUNS = Counter("event_status_scheduler_runs_total", "Event status scheduler passes")
+STATUS_TRANSITIONS = Counter(
+    "event_status_transitions_total", "Event status transitions applied by the scheduler", ("new_status",)
+)
+Gauge(
+    "event_status_scheduler_last_lag_seconds", "How late the last due status transition was applied", (),
+    lambda: [((), status_scheduler_stats["last_lag_seconds"])]
+)
+Gauge(
+    "event_status_scheduler_max_lag_seconds", "Largest status transition lag since start", (),
+    lambda: [((), status_scheduler_stats["max_lag_seconds"])]
+)
+_status_scheduler_wakeup = asyncio.Event()
+
+def wake_status_scheduler():
+    """Recompute the next transition after an event is created or its dates or status change"""
+    _status_scheduler_wakeup.set()
+
+async def run_status_transitions():
+    """Apply due status transitions and schedule the next one"""
+    now = datetime.now()
+    due = status_scheduler_stats["next_transition_at"]
+    if due is not None and now >= due:
+        lag = (now - due).total_seconds()
+        status_scheduler_stats["last_lag_seconds"] = lag
+        status_scheduler_stats["max_lag_seconds"] = max(status_scheduler_stats["max_lag_seconds"], lag)
+
+    changes = await asyncio.to_thread(event_service.apply_due_status_transitions, now)
+    next_at = await asyncio.to_thread(event_service.next_status_transition_at)
+
+    status_scheduler_stats["runs"] += 1
+    status_scheduler_stats["transitions_applied"] += len(changes)
+    STATUS_SCHEDULER_RUNS.inc()
+    for change in changes:
+        STATUS_TRANSITIONS.inc(change["new_status"])
+    status_scheduler_stats["last_run_at"] = now
+    status_scheduler_stats["next_transition_at"] = next_at
+    if changes:
+        logger.info(f"Event status scheduler applied {len(changes)} transitions")
+    return changes
+
+async def event_status_scheduler():
+    while True:
+        try:
+            await run_status_transitions()
+        except Exception as e:
+            logger.error(f"Error updating event statuses: {e}")
+        next_at = status_scheduler_stats["next_transition_at"]
+        timeout = STATUS_SCHEDULER_MAX_SLEEP_SECONDS
+        if next_at is not None:
+            timeout = min(timeout, max(0.0, (next_at - datetime.now()).total_seconds()))
+        try:
+            await asyncio.wait_for(_status_scheduler_wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        _status_scheduler_wakeup.clear()
 
+_status_scheduler_task: Optional[asyncio.Task] = None
 
-# Update event statuses on startup
-update_event_status_automatically()
+def start_event_status_scheduler():
+    """Start the status scheduler loop once; started by the app lifespan in main.py"""
+    global _status_scheduler_task
+    if _status_scheduler_task is None or _status_scheduler_task.done():
+        _status_scheduler_task = asyncio.create_task(event_status_scheduler())
+    return _status_scheduler_task
 
-def get_user_name_by_id(user_id):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT name FROM users WHERE id = ?', (user_id,))
-    row = cursor.fetchone()
-    conn.close()
-    return row['name'] if row else 'Unknown'
+@router.get("/events/status-scheduler")
+async def get_status_scheduler_stats():
+    """Status scheduler health: runs, transitions applied, next transition and lag"""
+    return status_scheduler_stats
 
 @router.get("/events")
 async def get_events(
@@ -132,7 +174,8 @@ async def get_events(
     offset: int = Query(0, ge=0),
     event_type: Optional[str] = None,
     status: Optional[str] = None,
-    location: Optional[str] = None
+    location: Optional[str] = None,
+    skill: Optional[str] = None
 ):
     """Get all events with optional filtering"""
     try:
@@ -154,83 +197,19 @@ async def get_events(
             query += " AND (location LIKE ? OR state LIKE ?)"
             params.extend([f"%{location}%", f"%{location}%"])
         
+        if skill:
+            query += " AND " + tag_filter(['event_skills'])
+            params.append(normalize_tag(skill))
+        
         query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
         cursor.execute(query, params)
         events_data = cursor.fetchall()
         
-        events = []
-        for row in events_data:
-            # Safe JSON parsing function
-            def safe_json_loads(data, default=None):
-                if data is None:
-                    return default
-                try:
-                    if isinstance(data, str):
-                        return json.loads(data)
-                    elif isinstance(data, (list, dict)):
-                        return data
-                    else:
-                        return default
-                except (json.JSONDecodeError, TypeError):
-                    return default
-
-            event = {
-                "id": row['id'],
-                "title": row['title'],
-                "description": row['description'],
-                "event_type": row['event_type'],
-                "category": row['category'],
-                "location": row['location'],
-                "state": row['state'],
-                "start_date": row['start_date'],
-                "end_date": row['end_date'],
-                "max_participants": row['max_participants'],
-                "current_participants": row['current_participants'],
-                "budget": row['budget'],
-                "prize_pool": row['prize_pool'],
-                "organizer": {
-                    "id": row['organizer_id'],
-                    "type": row['organizer_type'],
-                    "name": get_user_name_by_id(row['organizer_id'])
-                },
-                "skills_required": safe_json_loads(row['skills_required'], []),
-                "tags": safe_json_loads(row['tags'], []),
-                "status": row['status'],
-                "impact_metrics": safe_json_loads(row['impact_metrics'], {
-                    "participants_target": 0,
-                    "skills_developed": 0,
-                    "projects_created": 0,
-                    "employment_generated": 0
-                }),
-                "marketing_highlights": safe_json_loads(row['marketing_highlights'], []),
-                "success_metrics": safe_json_loads(row['success_metrics'], []),
-                "sections": safe_json_loads(row['sections'], []),
-                "social_media_posts": [],
-                "created_at": row['created_at'],
-                "updated_at": row['updated_at']
-            }
-            
-            # Fetch social media posts for this event
-            cursor.execute("SELECT * FROM social_media_posts WHERE event_id = ?", (event["id"],))
-            posts_data = cursor.fetchall()
-            event["social_media_posts"] = [
-                {
-                    "id": post['id'],
-                    "platform": post['platform'],
-                    "content": post['content'],
-                    "image_url": post['image_url'],
-                    "scheduled_at": post['scheduled_at'],
-                    "status": post['status']
-                }
-                for post in posts_data
-            ]
-            
-            events.append(event)
-        
+        events = serialize_events(cursor, events_data)
         conn.close()
-        return events
+        return FastJSONResponse(events)
         
     except Exception as e:
         logger.error(f"Error fetching events: {e}")
@@ -302,6 +281,7 @@ async def create_event(event: EventCreate, current_user: Dict[str, Any] = Depend
         event_id = cursor.lastrowid
         if event_id is None:
             raise HTTPException(status_code=500, detail="Failed to create event")
+        sync_tags(cursor, 'event_skills', event_id, event.skills_required)
         
         # Log status change
         cursor.execute('''
@@ -314,6 +294,8 @@ async def create_event(event: EventCreate, current_user: Dict[str, Any] = Depend
         
         conn.commit()
         conn.close()
+        wake_status_scheduler()
+        invalidate_user_activity(created_by)
         
         # Return the created event
         return await get_event_by_id(event_id)
@@ -337,70 +319,7 @@ async def get_event_by_id(event_id: int):
         if not row:
             raise HTTPException(status_code=404, detail="Event not found")
         
-        # Safe JSON parsing function
-        def safe_json_loads(data, default=None):
-            if data is None:
-                return default
-            try:
-                if isinstance(data, str):
-                    return json.loads(data)
-                elif isinstance(data, (list, dict)):
-                    return data
-                else:
-                    return default
-            except (json.JSONDecodeError, TypeError):
-                return default
-
-        event = {
-                "id": row['id'],
-                "title": row['title'],
-                "description": row['description'],
-                "event_type": row['event_type'],
-                "category": row['category'],
-                "location": row['location'],
-                "state": row['state'],
-                "start_date": row['start_date'],
-                "end_date": row['end_date'],
-                "max_participants": row['max_participants'],
-                "current_participants": row['current_participants'],
-                "budget": row['budget'],
-                "prize_pool": row['prize_pool'],
-                "organizer": {
-                    "id": row['organizer_id'],
-                    "type": row['organizer_type'],
-                    "name": get_user_name_by_id(row['organizer_id'])
-                },
-                "skills_required": safe_json_loads(row['skills_required'], []),
-                "tags": safe_json_loads(row['tags'], []),
-                "status": row['status'],
-                "impact_metrics": safe_json_loads(row['impact_metrics'], {
-                    "participants_target": 0,
-                    "skills_developed": 0,
-                    "projects_created": 0,
-                    "employment_generated": 0
-                }),
-                "marketing_highlights": safe_json_loads(row['marketing_highlights'], []),
-                "success_metrics": safe_json_loads(row['success_metrics'], []),
-                "sections": safe_json_loads(row['sections'], []),
-                "social_media_posts": [],
-                "created_at": row['created_at'],
-                "updated_at": row['updated_at']
-            }
-        
-        # Fetch social media posts
-        cursor.execute("SELECT * FROM social_media_posts WHERE event_id = ?", (event_id,))
-        posts_data = cursor.fetchall()
-        event["social_media_posts"] = [
-            {
-                "id": post['id'],
-                "platform": post['platform'],
-                "content": post['content'],
-                "image_url": post['image_url'],
-                "scheduled_at": post['scheduled_at'],
-                "status": post['status']
-            }
-            for post in posts_data
-        ]
+        event = serialize_events(cursor, [row])[0]
         
         conn.close()
         return event
@@ -676,9 +595,12 @@ async def update_event(event_id: int, event_update: EventUpdate):
             
             query = f"UPDATE events SET {', '.join(update_fields)} WHERE id = ?"
             cursor.execute(query, params)
+            if event_update.skills_required is not None:
+                sync_tags(cursor, 'event_skills', event_id, event_update.skills_required)
             
             conn.commit()
             conn.close()
+            wake_status_scheduler()
             
             return await get_event_by_id(event_id)
         else:
@@ -705,9 +627,12 @@ async def delete_event(event_id: int):
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Event not found")
+        delete_tags(cursor, event_id, ('event_skills',))
         
         conn.commit()
         conn.close()
+        # The organizer and every participant lose an activity
+        invalidate_user_activity()
         
         return {"message": "Event deleted successfully"}
         
@@ -773,6 +698,7 @@ async def update_event_status(event_id: int, status_update: EventStatusUpdate, c
         
         conn.commit()
         conn.close()
+        wake_status_scheduler()
         
         return {"message": f"Event status updated to {status_update.status}"}
         
@@ -826,8 +752,8 @@ async def get_event_status_history(event_id: int):
 async def update_all_event_statuses():
     """Manually trigger status update for all events (admin function)"""
     try:
-        update_event_status_automatically()
-        return {"message": "Event statuses updated successfully"}
+        changes = await run_status_transitions()
+        return {"message": "Event statuses updated successfully", "changes": changes}
     except Exception as e:
         logger.error(f"Error updating event statuses: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -836,58 +762,12 @@ async def update_all_event_statuses():
 async def join_event(event_id: int, user_id: int):
     """Join an event as a participant"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Check if event exists and has space
-        cursor.execute('''
-            SELECT e.max_participants, e.current_participants, e.status
-            FROM events e WHERE e.id = ?
-        ''', (event_id,))
-        event_data = cursor.fetchone()
-        
-        if not event_data:
-            raise HTTPException(status_code=404, detail="Event not found")
-        
-        max_participants = event_data['max_participants']
-        current_participants = event_data['current_participants']
-        status = event_data['status']
-        
-        if status != 'active':
-            raise HTTPException(status_code=400, detail="Event is not accepting participants")
-        
-        if current_participants >= max_participants:
-            raise HTTPException(status_code=400, detail="Event is full")
-        
-        # Check if user is already a participant
-        cursor.execute('''
-            SELECT id FROM event_participants 
-            WHERE event_id = ? AND user_id = ?
-        ''', (event_id, user_id))
-        
-        if cursor.fetchone():
-            raise HTTPException(status_code=400, detail="User is already a participant")
-        
-        # Add user as participant
-        cursor.execute('''
-            INSERT INTO event_participants (event_id, user_id, status, joined_at)
-            VALUES (?, ?, 'registered', ?)
-        ''', (event_id, user_id, datetime.now().isoformat()))
-        
-        # Update current participants count
-        cursor.execute('''
-            UPDATE events 
-            SET current_participants = current_participants + 1
-            WHERE id = ?
-        ''', (event_id,))
-        
-        conn.commit()
-        conn.close()
-        
+        await asyncio.to_thread(event_service.join_event, event_id, user_id)
+        invalidate_user_activity(user_id)
         return {"message": "Successfully joined event", "status": "success"}
         
-    except HTTPException:
-        raise
+    except event_service.EventRegistrationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         logger.error(f"Error joining event: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -896,38 +776,12 @@ async def join_event(event_id: int, user_id: int):
 async def leave_event(event_id: int, user_id: int):
     """Leave an event"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Check if user is a participant
-        cursor.execute('''
-            SELECT id FROM event_participants 
-            WHERE event_id = ? AND user_id = ?
-        ''', (event_id, user_id))
-        
-        if not cursor.fetchone():
-            raise HTTPException(status_code=400, detail="User is not a participant")
-        
-        # Remove user from participants
-        cursor.execute('''
-            DELETE FROM event_participants 
-            WHERE event_id = ? AND user_id = ?
-        ''', (event_id, user_id))
-        
-        # Update current participants count
-        cursor.execute('''
-            UPDATE events 
-            SET current_participants = current_participants - 1
-            WHERE id = ?
-        ''', (event_id,))
-        
-        conn.commit()
-        conn.close()
-        
+        await asyncio.to_thread(event_service.leave_event, event_id, user_id)
+        invalidate_user_activity(user_id)
         return {"message": "Successfully left event", "status": "success"}
         
-    except HTTPException:
-        raise
+    except event_service.EventRegistrationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         logger.error(f"Error leaving event: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -957,20 +811,6 @@ async def get_user_events(user_id: int):
         if not cursor.fetchone():
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Safe JSON parsing function
-        def safe_json_loads(data, default=None):
-            if data is None:
-                return default
-            try:
-                if isinstance(data, str):
-                    return json.loads(data)
-                elif isinstance(data, (list, dict)):
-                    return data
-                else:
-                    return default
-            except (json.JSONDecodeError, TypeError):
-                return default
-        
         # Get events where user is the organizer
         cursor.execute('''
             SELECT e.*, 'organizer' as user_role
@@ -1001,60 +841,7 @@ async def get_user_events(user_id: int):
         # Sort by creation date
         unique_events.sort(key=lambda x: x['created_at'], reverse=True)
         
-        events = []
-        for row in unique_events:
-            event = {
-                "id": row['id'],
-                "title": row['title'],
-                "description": row['description'],
-                "event_type": row['event_type'],
-                "category": row['category'],
-                "location": row['location'],
-                "state": row['state'],
-                "start_date": row['start_date'],
-                "end_date": row['end_date'],
-                "max_participants": row['max_participants'],
-                "current_participants": row['current_participants'],
-                "budget": row['budget'],
-                "prize_pool": row['prize_pool'],
-                "organizer": {
-                    "id": row['organizer_id'],
-                    "type": row['organizer_type'],
-                    "name": get_user_name_by_id(row['organizer_id'])
-                },
-                "skills_required": safe_json_loads(row['skills_required'], []),
-                "tags": safe_json_loads(row['tags'], []),
-                "status": row['status'],
-                "impact_metrics": safe_json_loads(row['impact_metrics'], {
-                    "participants_target": 0,
-                    "skills_developed": 0,
-                    "projects_created": 0,
-                    "employment_generated": 0
-                }),
-                "marketing_highlights": safe_json_loads(row['marketing_highlights'], []),
-                "success_metrics": safe_json_loads(row['success_metrics'], []),
-                "sections": safe_json_loads(row['sections'], []),
-                "social_media_posts": [],
-                "created_at": row['created_at'],
-                "updated_at": row['updated_at']
-            }
-            
-            # Fetch social media posts for this event
-            cursor.execute("SELECT * FROM social_media_posts WHERE event_id = ?", (event["id"],))
-            posts_data = cursor.fetchall()
-            event["social_media_posts"] = [
-                {
-                    "id": post['id'],
-                    "platform": post['platform'],
-                    "content": post['content'],
-                    "image_url": post['image_url'],
-                    "scheduled_at": post['scheduled_at'],
-                    "status": post['status']
-                }
-                for post in posts_data
-            ]
-            
-            events.append(event)
+        events = serialize_events(cursor, unique_events)
         
         conn.close()
         return events
@@ -1086,24 +873,7 @@ async def generate_visual_summary_for_event(event_id: int):
             generate_audio=True
         )
         
-        # Save to database (you can create a separate table for event visual summaries)
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO visual_summaries (
-                topic, summary_data, created_at, event_id
-            ) VALUES (?, ?, ?, ?)
-        ''', (
-            event["title"],
-            json.dumps(visual_summary.model_dump()),
-            datetime.now().isoformat(),
-            event_id
-        ))
-        
-        summary_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        summary_id = store_visual_summary(event["title"], visual_summary.model_dump())
         
         return {
             "summary_id": summary_id,
@@ -1119,66 +889,7 @@ async def generate_visual_summary_for_event(event_id: int):
 async def search_events(query: str, limit: int = 10):
     """Search events by name or keyword (title or description). Fully implemented for AI assistant and frontend helpers."""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        sql = "SELECT * FROM events WHERE title LIKE ? OR description LIKE ? ORDER BY created_at DESC LIMIT ?"
-        like_query = f"%{query}%"
-        cursor.execute(sql, (like_query, like_query, limit))
-        events_data = cursor.fetchall()
-        
-        def safe_json_loads(data, default=None):
-            if data is None:
-                return default
-            try:
-                if isinstance(data, str):
-                    return json.loads(data)
-                elif isinstance(data, (list, dict)):
-                    return data
-                else:
-                    return default
-            except (json.JSONDecodeError, TypeError):
-                return default
-        
-        events = []
-        for row in events_data:
-            event = {
-                "id": row['id'],
-                "title": row['title'],
-                "description": row['description'],
-                "event_type": row['event_type'],
-                "category": row['category'],
-                "location": row['location'],
-                "state": row['state'],
-                "start_date": row['start_date'],
-                "end_date": row['end_date'],
-                "max_participants": row['max_participants'],
-                "current_participants": row['current_participants'],
-                "budget": row['budget'],
-                "prize_pool": row['prize_pool'],
-                "organizer": {
-                    "id": row['organizer_id'],
-                    "type": row['organizer_type'],
-                    "name": get_user_name_by_id(row['organizer_id'])
-                },
-                "skills_required": safe_json_loads(row['skills_required'], []),
-                "tags": safe_json_loads(row['tags'], []),
-                "status": row['status'],
-                "impact_metrics": safe_json_loads(row['impact_metrics'], {
-                    "participants_target": 0,
-                    "skills_developed": 0,
-                    "projects_created": 0,
-                    "employment_generated": 0
-                }),
-                "marketing_highlights": safe_json_loads(row['marketing_highlights'], []),
-                "success_metrics": safe_json_loads(row['success_metrics'], []),
-                "sections": safe_json_loads(row['sections'], []),
-                "social_media_posts": [],
-                "created_at": row['created_at'],
-                "updated_at": row['updated_at']
-            }
-            events.append(event)
-        conn.close()
-        return events
+        return event_service.search_events(query, limit)
     except Exception as e:
         logger.error(f"Error searching events: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
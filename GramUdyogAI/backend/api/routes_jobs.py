@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 from core.job_recommender import *
 from init_db import get_db
@@ -7,7 +7,15 @@ import os
 from dotenv import load_dotenv, find_dotenv
 import json
 import time
-from core.translation import llama_translate_string as translate_text, llama_chat_completion
+import asyncio
+from core.translation import llama_translate_string as translate_text
+from core.streaming import sse_response
+from core.fast_json import FastJSONResponse
+from services.row_mappers import JOB_MAPPER
+from services.http_cache import catalog_response, table_version
+from services.tags import sync_tags, delete_tags, tag_filter, normalize_tag, match_jobs_for_user
+from services.job_matching import invalidate_job_match_index, rank_jobs, load_jobs, experience_ceiling
+from services import job_embeddings
 from typing import Optional, List
 import json
 import os
@@ -71,6 +79,24 @@ class JobSearchQuery(BaseModel):
 class UserInfo(BaseModel):
     user_info: str  # Input from the user for job recommendation
 
+# A job's skills can come from either side table: skills_required for posted
+# jobs, tags for the Skill India import
+JOB_TAG_TABLES = ('job_skills', 'job_tags')
+
+# Best job plus five alternatives
+SMART_RECOMMENDATION_TOP_K = 6
+
+_job_embedding_load_task: Optional[asyncio.Task] = None
+
+def start_job_embedding_load():
+    """Build the job embedding index in the background, once; started by the app lifespan in main.py"""
+    global _job_embedding_load_task
+    # Encoding jobs not seen before can take a while; recommendations are
+    # term-based until the index is ready
+    if _job_embedding_load_task is None:
+        _job_embedding_load_task = asyncio.create_task(asyncio.to_thread(job_embeddings.load_job_embedding_index))
+    return _job_embedding_load_task
+
 @router.post("/jobs")
 async def create_job(job: JobPosting):
     conn = get_db()
@@ -80,9 +106,12 @@ async def create_job(job: JobPosting):
         INSERT INTO job_postings (title, description, company, location, company_contact, pay, job_title, salary_range, is_active)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (job.title, job.description, job.company, job.location, job.company_contact, job.pay, job.title, job.pay, True))
+    job_id = cursor.lastrowid
 
     conn.commit()
     conn.close()
+    invalidate_job_match_index()
+    await asyncio.to_thread(job_embeddings.add_job_embedding, job_id)
 
     return {"message": "Job posted successfully"}
 
@@ -104,10 +133,13 @@ async def create_enhanced_job(job: EnhancedJobPosting):
         json.dumps(job.skills_required), job.is_active,
         job.job_title, "Contact via apply_url", job.salary_range
     ))
+    job_id = cursor.lastrowid
+    sync_tags(cursor, 'job_skills', job_id, job.skills_required)
 
     conn.commit()
-    job_id = cursor.lastrowid
     conn.close()
+    invalidate_job_match_index()
+    await asyncio.to_thread(job_embeddings.add_job_embedding, job_id)
 
     return {"message": "Enhanced job posted successfully", "job_id": job_id}
 
@@ -122,6 +154,7 @@ async def get_jobs(
     source: Optional[str] = Query(None, description="Filter by source"),
     is_active: Optional[bool] = Query(True, description="Filter by active status"),
     search: Optional[str] = Query(None, description="Search in job title and description"),
+    skill: Optional[str] = Query(None, description="Filter by required skill or tag"),
     diverse: Optional[bool] = Query(True, description="Show diverse job types")
 ):
     """Get all jobs with optional filtering"""
@@ -169,6 +202,10 @@ async def get_jobs(
         search_term = f"%{search}%"
         params.extend([search_term, search_term, search_term])
     
+    if skill:
+        conditions.append(tag_filter(JOB_TAG_TABLES))
+        params.extend([normalize_tag(skill)] * len(JOB_TAG_TABLES))
+    
     if conditions:
         base_query += " AND " + " AND ".join(conditions)
     
@@ -199,40 +236,12 @@ async def get_jobs(
     
     conn.close()
 
-    return {
-        "jobs": [
-            {
-                "id": job["id"],
-                "job_title": job["job_title"] or job["title"],  # job_title or title (legacy)
-                "company_name": job["company"] if job["company"] else "",  # company_name or company
-                "location": job["location"],
-                "salary_range": job["salary_range"] or job["pay"] or "",  # salary_range or pay (legacy)
-                "description": job["description"],
-                "industry": job["industry"],
-                "sector": job["sector"],
-                "job_type": job["job_type"],
-                "employment_type": job["employment_type"],
-                "experience_required": job["experience_required"],
-                "skills_required": json.loads(job["skills_required"]) if job["skills_required"] else [],
-                "posted_date": job["posted_date"],
-                "application_deadline": job["application_deadline"],
-                "tags": json.loads(job["tags"]) if job["tags"] else [],
-                "source": job["source"],
-                "is_active": job["is_active"],
-                "created_at": job["created_at"],
-                "apply_url": job["apply_url"],
-                # Legacy fields for backward compatibility
-                "title": job["job_title"] or job["title"],
-                "company": job["company"] if job["company"] else "",
-                "company_contact": job["company_contact"] if job["company_contact"] else "",
-                "pay": job["salary_range"] or job["pay"] or ""
-            }
-            for job in jobs
-        ],
+    return FastJSONResponse({
+        "jobs": JOB_MAPPER.many(jobs),
         "total_count": total_count,
         "limit": limit,
         "offset": offset
-    }
+    })
 
 @router.get("/jobs/search")
 async def search_jobs(
@@ -305,41 +314,200 @@ async def search_jobs(
     
     conn.close()
 
+    return FastJSONResponse({
+        "jobs": JOB_MAPPER.many(jobs),
+        "total_count": total_count,
+        "limit": limit,
+        "offset": offset
+    })
+
+@router.get("/jobs/skill-matches/{user_id}")
+async def get_skill_matched_jobs(user_id: int, limit: int = Query(20, ge=1, le=100)):
+    """Active jobs ranked by how many of the user's profile skills they list"""
+    matches = match_jobs_for_user(user_id, limit)
+    if not matches:
+        return {"jobs": [], "total_count": 0}
+
+    conn = get_db()
+    placeholders = ", ".join("?" for _ in matches)
+    rows = conn.execute(f"""
+        SELECT id, job_title, company, location, salary_range, description,
+               industry, sector, job_type, employment_type, experience_required,
+               skills_required, source, title, company_contact, pay, apply_url
+        FROM job_postings WHERE id IN ({placeholders})
+    """, [job_id for job_id, _ in matches]).fetchall()
+    conn.close()
+
+    jobs_by_id = {row["id"]: row for row in rows}
+    jobs = [
+        format_job_response(jobs_by_id[job_id], overlap)
+        for job_id, overlap in matches if job_id in jobs_by_id
+    ]
+    return {"jobs": jobs, "total_count": len(jobs)}
+
+# Catalog endpoints, declared before /jobs/{job_id} so the path parameter does not
+# capture them; responses are cached and revalidated by services.http_cache
+def load_job_industries():
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT DISTINCT industry, COUNT(*) as count FROM job_postings WHERE industry IS NOT NULL AND is_active = 1 GROUP BY industry ORDER BY count DESC")
+    industries = cursor.fetchall()
+
+    conn.close()
+
+    return [
+        {
+            "industry": industry["industry"],
+            "count": industry["count"]
+        }
+        for industry in industries
+    ]
+
+def load_job_locations():
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT DISTINCT location, COUNT(*) as count FROM job_postings WHERE location IS NOT NULL AND is_active = 1 GROUP BY location ORDER BY count DESC LIMIT 50")
+    locations = cursor.fetchall()
+
+    conn.close()
+
+    return [
+        {
+            "location": location["location"],
+            "count": location["count"]
+        }
+        for location in locations
+    ]
+
+def load_job_sectors():
+    conn = get_db()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT DISTINCT sector, COUNT(*) as count FROM job_postings WHERE sector IS NOT NULL AND is_active = 1 GROUP BY sector ORDER BY count DESC")
+    sectors = cursor.fetchall()
+
+    conn.close()
+
+    return [
+        {
+            "sector": sector["sector"],
+            "count": sector["count"]
+        }
+        for sector in sectors
+    ]
+
+def load_job_statistics():
+    conn = get_db()
+    cursor = conn.cursor()
+
+    # Total jobs
+    cursor.execute("SELECT COUNT(*) as total FROM job_postings WHERE is_active = 1")
+    total_jobs_row = cursor.fetchone()
+    if isinstance(total_jobs_row, dict):
+        total_jobs = total_jobs_row.get("total")
+    else:
+        total_jobs = total_jobs_row[0]
+
+    # Jobs by experience level
+    cursor.execute("SELECT experience_required, COUNT(*) as count FROM job_postings WHERE is_active = 1 GROUP BY experience_required ORDER BY experience_required")
+    exp_levels = cursor.fetchall()
+
+    # Top industries
+    cursor.execute("SELECT industry, COUNT(*) as count FROM job_postings WHERE industry IS NOT NULL AND is_active = 1 GROUP BY industry ORDER BY count DESC LIMIT 10")
+    top_industries = cursor.fetchall()
+
+    # Top locations
+    cursor.execute("SELECT location, COUNT(*) as count FROM job_postings WHERE location IS NOT NULL AND is_active = 1 GROUP BY location ORDER BY count DESC LIMIT 10")
+    top_locations = cursor.fetchall()
+
+    # Average salary from salary_range field (extract numeric values where possible)
+    cursor.execute("SELECT salary_range FROM job_postings WHERE salary_range IS NOT NULL AND salary_range != '' AND is_active = 1")
+    salary_ranges = cursor.fetchall()
+    
+    # Try to extract average salary from salary_range strings
+    total_salary = 0
+    salary_count = 0
+    import re
+    for salary_range in salary_ranges:
+        if isinstance(salary_range, dict):
+            salary_str = salary_range.get("salary_range")
+        else:
+            salary_str = salary_range[0]
+        if not salary_str:
+            continue
+        # Try to extract numbers from salary strings
+        numbers = re.findall(r'\d+', salary_str.replace(',', ''))
+        if numbers:
+            try:
+                if len(numbers) >= 2:
+                    # If we have a range like "30,000 - 50,000"
+                    avg_for_this_job = (int(numbers[0]) + int(numbers[1])) / 2
+                else:
+                    # If we have a single number
+                    avg_for_this_job = int(numbers[0])
+                total_salary += avg_for_this_job
+                salary_count += 1
+            except ValueError:
+                continue
+    
+    avg_salary = total_salary / salary_count if salary_count > 0 else None
+
+    conn.close()
+
+    def get_val(row, key, idx):
+        if isinstance(row, dict):
+            return row.get(key)
+        else:
+            return row[idx]
+
     return {
-        "jobs": [
+        "total_jobs": total_jobs,
+        "experience_levels": [
             {
-                "id": job["id"],
-                "job_title": job["job_title"] or job["title"],
-                "company_name": job["company"] or "",
-                "location": job["location"],
-                "salary_range": job["salary_range"] or job["pay"] or "",
-                "description": job["description"],
-                "industry": job["industry"],
-                "sector": job["sector"],
-                "job_type": job["job_type"],
-                "employment_type": job["employment_type"],
-                "experience_required": job["experience_required"],
-                "skills_required": json.loads(job["skills_required"]) if job["skills_required"] else [],
-                "posted_date": job["posted_date"],
-                "application_deadline": job["application_deadline"],
-                "tags": json.loads(job["tags"]) if job["tags"] else [],
-                "source": job["source"],
-                "is_active": job["is_active"],
-                "created_at": job["created_at"],
-                "apply_url": job["apply_url"],
-                # Legacy fields for backward compatibility
-                "title": job["job_title"] or job["title"],
-                "company": job["company"] or "",
-                "company_contact": job["company_contact"] or "",
-                "pay": job["salary_range"] or job["pay"] or ""
+                "experience_required": get_val(exp, "experience_required", 0),
+                "count": get_val(exp, "count", 1)
             }
-            for job in jobs
+            for exp in exp_levels
         ],
-        "total_count": total_count,
-        "limit": limit,
-        "offset": offset
+        "top_industries": [
+            {
+                "industry": get_val(ind, "industry", 0),
+                "count": get_val(ind, "count", 1)
+            }
+            for ind in top_industries
+        ],
+        "top_locations": [
+            {
+                "location": get_val(loc, "location", 0),
+                "count": get_val(loc, "count", 1)
+            }
+            for loc in top_locations
+        ],
+        "average_salary": round(avg_salary, 2) if avg_salary else None
     }
 
+@router.get("/jobs/industries")
+async def get_job_industries(request: Request):
+    """Get all available job industries"""
+    return catalog_response(request, table_version("job_postings"), load_job_industries)
+
+@router.get("/jobs/locations")
+async def get_job_locations(request: Request):
+    """Get all available job locations"""
+    return catalog_response(request, table_version("job_postings"), load_job_locations)
+
+@router.get("/jobs/sectors")
+async def get_job_sectors(request: Request):
+    """Get all available job sectors"""
+    return catalog_response(request, table_version("job_postings"), load_job_sectors)
+
+@router.get("/jobs/stats")
+async def get_job_statistics(request: Request):
+    """Get overall job statistics"""
+    return catalog_response(request, table_version("job_postings"), load_job_statistics)
+
 @router.get("/jobs/{job_id}")
 async def get_job_by_id(job_id: int):
     """Get a specific job by ID"""
@@ -412,8 +580,12 @@ async def update_job(job_id: int, job_update: SkillIndiaJob):
         conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
 
+    sync_tags(cursor, 'job_skills', job_id, job_update.skills_required)
+    sync_tags(cursor, 'job_tags', job_id, job_update.tags)
     conn.commit()
     conn.close()
+    invalidate_job_match_index()
+    await asyncio.to_thread(job_embeddings.add_job_embedding, job_id)
 
     return {"message": "Job updated successfully"}
 
@@ -429,8 +601,11 @@ async def delete_job(job_id: int):
         conn.close()
         raise HTTPException(status_code=404, detail="Job not found")
 
+    delete_tags(cursor, job_id, ('job_skills', 'job_tags'))
     conn.commit()
     conn.close()
+    invalidate_job_match_index()
+    job_embeddings.remove_job_embedding(job_id)
 
     return {"message": "Job deleted successfully"}
 
@@ -449,467 +624,61 @@ async def recommend_job(user_info: UserInfo):
 @router.post("/recommend-job-smart")
 async def smart_recommend_job(user_info: UserInfo):
     """
-    AI-powered smart job recommendation using Llama model via Groq
+    Smart job recommendation: jobs are ranked locally against the user's text,
+    and the LLM adds a one-line match reason to the top picks
     """
-    try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        user_text = user_info.user_info.lower()
-        
-        # Step 1: Use AI to analyze user intent and extract key information
-        intent_analysis = await analyze_user_intent_with_ai(user_text)
-        
-        # Step 2: Get relevant jobs based on AI analysis
-        jobs = await get_jobs_based_on_ai_analysis(cursor, intent_analysis, user_text)
-        
-        if not jobs:
-            conn.close()
-            return {"best_job": None, "alternative_jobs": [], "message": "No relevant jobs found. Please try a different search."}
-        
-        # Step 3: Use AI to score and rank jobs
-        scored_jobs = await score_jobs_with_ai(jobs, user_text, intent_analysis)
-        
-        conn.close()
-        
-        if not scored_jobs:
-            return {"best_job": None, "alternative_jobs": [], "message": "No relevant jobs found. Please try a different search."}
+    return await run_smart_recommendation(user_info)
 
-        # Format the best job and alternatives
-        best_job_formatted = format_job_response(scored_jobs[0][1], scored_jobs[0][0])
-        alternative_jobs_formatted = [
-            format_job_response(job_data[1], job_data[0]) for job_data in scored_jobs[1:6]
-        ]
-        
-        return {
-            "best_job": best_job_formatted,
-            "alternative_jobs": alternative_jobs_formatted,
-            "ai_analysis": intent_analysis
-        }
-        
-    except Exception as e:
-        print(f"Error in AI-powered recommendation: {str(e)}")
-        # Fallback to the original smart recommendation
-        return await smart_recommend_job_fallback(user_info)
+@router.post("/recommend-job-smart/stream")
+async def smart_recommend_job_stream(user_info: UserInfo):
+    """
+    Server-Sent Events variant of /recommend-job-smart: the locally ranked
+    candidates are sent as soon as they are known, the explained result last
+    """
+    return sse_response(lambda emit: run_smart_recommendation(user_info, emit))
 
-async def analyze_user_intent_with_ai(user_text: str) -> dict:
+async def run_smart_recommendation(user_info: UserInfo, emit=None):
     """
-    Use Llama to analyze user intent and extract key job search criteria with precise categorization
+    Smart recommendation pipeline; emit(event, data) receives progress when streaming.
+    Jobs are ranked locally over every active job (services.job_matching); the
+    LLM is only asked to explain the final picks.
     """
     try:
-        system_prompt = """You are an expert job search analyst. Analyze the user's job search request and extract key information with PRECISE job categorization.
+        user_text = user_info.user_info
 
-        Return your analysis in JSON format with these fields:
-        {
-            "job_roles": ["list of EXACT job titles/roles the user is looking for"],
-            "skills": ["list of specific technical/professional skills mentioned"],
-            "industries": ["list of industries mentioned or strongly implied"],
-            "experience_level": "entry/junior/mid/senior/expert",
-            "location_preferences": ["list of locations if mentioned"],
-            "job_types": ["full-time/part-time/contract/freelance"],
-            "salary_expectations": "any salary mentions or 'not_mentioned'",
-            "key_requirements": ["list of important requirements"],
-            "career_goals": "brief description of what user wants to achieve",
-            "search_intent": "job_search/career_change/skill_development/specific_company",
-            "primary_category": "one primary job category: software_engineer/data_analyst/sales/marketing/teacher/healthcare/finance/delivery/customer_service/management/other"
-        }
-        
-        IMPORTANT RULES:
-        1. If user mentions "software engineer" or "developer" or "programming", set primary_category to "software_engineer"
-        2. If user mentions "analyst" or "data", set primary_category to "data_analyst"  
-        3. If user mentions "sales" or "business development", set primary_category to "sales"
-        4. If user mentions "teacher" or "education", set primary_category to "teacher"
-        5. If user mentions "delivery" or "driver", set primary_category to "delivery"
-        6. Be VERY specific about job_roles - don't include generic terms
-        7. Distinguish clearly between different job categories to avoid mismatches
-        
-        If information is not clear or missing, use reasonable defaults based on context but be conservative."""
+        if emit:
+            emit("progress", {"stage": "ranking_jobs"})
+        ranked = await asyncio.to_thread(
+            rank_jobs, user_text, max_experience=experience_ceiling(user_text), top_k=SMART_RECOMMENDATION_TOP_K
+        )
+        scored_jobs = await asyncio.to_thread(load_jobs, ranked)
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Analyze this job search request: {user_text}"}
-        ]
-        
-        response = llama_chat_completion(messages, temperature=0.1, max_tokens=800)
-        analysis = json.loads(response)
-        
-        # Additional validation and cleanup
-        if not analysis.get("primary_category"):
-            # Determine primary category from job_roles if not set
-            job_roles = analysis.get("job_roles", [])
-            for role in job_roles:
-                role_lower = role.lower()
-                if any(term in role_lower for term in ['software', 'developer', 'engineer', 'programmer']):
-                    analysis["primary_category"] = "software_engineer"
-                    break
-                elif any(term in role_lower for term in ['analyst', 'data']):
-                    analysis["primary_category"] = "data_analyst"
-                    break
-                elif 'sales' in role_lower:
-                    analysis["primary_category"] = "sales"
-                    break
-                elif any(term in role_lower for term in ['teacher', 'education']):
-                    analysis["primary_category"] = "teacher"
-                    break
-                elif any(term in role_lower for term in ['delivery', 'driver']):
-                    analysis["primary_category"] = "delivery"
-                    break
-            
-            if not analysis.get("primary_category"):
-                analysis["primary_category"] = "other"
-        
-        return analysis
-        
-    except Exception as e:
-        print(f"Error in AI intent analysis: {str(e)}")
-        # Fallback analysis with basic categorization
-        user_lower = user_text.lower()
-        primary_category = "other"
-        
-        if any(term in user_lower for term in ['software', 'developer', 'engineer', 'programmer', 'coding']):
-            primary_category = "software_engineer"
-        elif any(term in user_lower for term in ['analyst', 'data']):
-            primary_category = "data_analyst"
-        elif 'sales' in user_lower:
-            primary_category = "sales"
-        elif any(term in user_lower for term in ['teacher', 'education']):
-            primary_category = "teacher"
-        elif any(term in user_lower for term in ['delivery', 'driver']):
-            primary_category = "delivery"
-        
-        return {
-            "job_roles": [user_text],
-            "skills": user_text.split(),
-            "industries": [],
-            "experience_level": "entry",
-            "location_preferences": [],
-            "job_types": ["full-time"],
-            "salary_expectations": "not_mentioned",
-            "key_requirements": [],
-            "career_goals": "Find relevant job opportunities",
-            "search_intent": "job_search",
-            "primary_category": primary_category
-        }
+        if not scored_jobs:
+            return {"best_job": None, "alternative_jobs": [], "message": "No relevant jobs found. Please try a different search."}
 
-async def get_jobs_based_on_ai_analysis(cursor, intent_analysis: dict, user_text: str) -> list:
-    """
-    Query database for jobs based on AI analysis with robust filtering
-    """
-    # Define job category exclusions to prevent mismatches
-    job_category_exclusions = {
-        'software': ['telecaller', 'telemarketing', 'call center', 'sales', 'delivery', 'driver', 'cook', 'cleaner', 'guard', 'security'],
-        'engineer': ['telecaller', 'telemarketing', 'call center', 'sales', 'delivery', 'driver', 'cook', 'cleaner'],
-        'developer': ['telecaller', 'telemarketing', 'call center', 'sales', 'delivery', 'driver', 'cook', 'cleaner'],
-        'analyst': ['telecaller', 'telemarketing', 'delivery', 'driver', 'cook', 'cleaner', 'guard'],
-        'teacher': ['telecaller', 'telemarketing', 'delivery', 'driver', 'software', 'developer'],
-        'healthcare': ['telecaller', 'software', 'developer', 'delivery', 'driver'],
-        'finance': ['delivery', 'driver', 'cook', 'cleaner']
-    }
-    
-    # Build dynamic query conditions based on AI analysis
-    conditions = []
-    exclusion_conditions = []
-    params = []
-    
-    # Get primary job roles for more precise matching
-    primary_roles = intent_analysis.get("job_roles", [])
-    primary_skills = intent_analysis.get("skills", [])
-    
-    # Job roles and titles - More precise matching
-    if primary_roles:
-        role_conditions = []
-        for role in primary_roles:
-            role_lower = role.lower()
-            # Primary match in job title (most important)
-            role_conditions.append("(job_title LIKE ? OR title LIKE ?)")
-            params.extend([f"%{role}%", f"%{role}%"])
-            
-            # Add exclusions for this role category
-            for category, exclusions in job_category_exclusions.items():
-                if category in role_lower:
-                    for exclusion in exclusions:
-                        exclusion_conditions.append("job_title NOT LIKE ?")
-                        exclusion_conditions.append("title NOT LIKE ?")
-                        params.extend([f"%{exclusion}%", f"%{exclusion}%"])
-        
-        if role_conditions:
-            conditions.append(f"({' OR '.join(role_conditions)})")
-    
-    # Skills - Focus on job title and skills_required field
-    if primary_skills:
-        skill_conditions = []
-        for skill in primary_skills:
-            if len(skill) > 2:  # Avoid short words
-                skill_lower = skill.lower()
-                # Primary match in job title and skills
-                skill_conditions.append("(job_title LIKE ? OR skills_required LIKE ?)")
-                params.extend([f"%{skill}%", f"%{skill}%"])
-                
-                # Add exclusions for this skill category
-                for category, exclusions in job_category_exclusions.items():
-                    if category in skill_lower:
-                        for exclusion in exclusions:
-                            exclusion_conditions.append("job_title NOT LIKE ?")
-                            exclusion_conditions.append("title NOT LIKE ?")
-                            params.extend([f"%{exclusion}%", f"%{exclusion}%"])
-        
-        if skill_conditions:
-            conditions.append(f"({' OR '.join(skill_conditions)})")
-    
-    # Industries - More precise industry matching
-    if intent_analysis.get("industries"):
-        industry_conditions = []
-        for industry in intent_analysis["industries"]:
-            industry_conditions.append("(industry LIKE ? OR sector LIKE ?)")
-            params.extend([f"%{industry}%", f"%{industry}%"])
-        if industry_conditions:
-            conditions.append(f"({' OR '.join(industry_conditions)})")
-    
-    # Location
-    if intent_analysis.get("location_preferences"):
-        location_conditions = []
-        for location in intent_analysis["location_preferences"]:
-            location_conditions.append("location LIKE ?")
-            params.append(f"%{location}%")
-        if location_conditions:
-            conditions.append(f"({' OR '.join(location_conditions)})")
-    
-    # Experience level mapping
-    experience_mapping = {
-        "entry": "0",
-        "junior": "12",
-        "mid": "24",
-        "senior": "60",
-        "expert": "120"
-    }
-    experience_level = experience_mapping.get(intent_analysis.get("experience_level", "entry"), "0")
-    
-    # Build the final query with robust filtering
-    base_query = """
-        SELECT id, job_title, company, location, salary_range, description,
-               industry, sector, job_type, employment_type, experience_required, 
-               skills_required, posted_date, application_deadline, tags, source, 
-               is_active, created_at, title, company_contact, pay, apply_url
-        FROM job_postings 
-        WHERE is_active = 1
-    """
-    
-    # Add positive conditions (what we want)
-    if conditions:
-        base_query += " AND (" + " OR ".join(conditions) + ")"
-    
-    # Add exclusion conditions (what we don't want)
-    if exclusion_conditions:
-        base_query += " AND (" + " AND ".join(exclusion_conditions) + ")"
-    
-    # Add experience filter
-    base_query += " AND (experience_required <= ? OR experience_required IS NULL)"
-    params.append(str(int(experience_level) + 24))  # Allow some flexibility
-    
-    # If no specific conditions, fall back to broad search with strong exclusions
-    if not conditions:
-        # Extract key terms from user text for fallback
-        user_words = [word for word in user_text.lower().split() if len(word) > 2]
-        if user_words:
-            fallback_conditions = []
-            for word in user_words[:3]:  # Use top 3 words
-                fallback_conditions.append("(job_title LIKE ? OR description LIKE ?)")
-                params.extend([f"%{word}%", f"%{word}%"])
-            
-            if fallback_conditions:
-                base_query = base_query.replace("WHERE is_active = 1", 
-                    f"WHERE is_active = 1 AND ({' OR '.join(fallback_conditions)})")
-    
-    # Order by relevance and recency
-    base_query += """ 
-        ORDER BY 
-            CASE 
-                WHEN job_title LIKE ? OR title LIKE ? THEN 3
-                WHEN skills_required LIKE ? THEN 2
-                ELSE 1
-            END DESC,
-            created_at DESC 
-        LIMIT 30
-    """
-    
-    # Add ordering parameters
-    if primary_roles:
-        main_role = primary_roles[0]
-        params.extend([f"%{main_role}%", f"%{main_role}%", f"%{main_role}%"])
-    else:
-        params.extend(['%software%', '%software%', '%software%'])  # Default
-    
-    cursor.execute(base_query, params)
-    return cursor.fetchall()
+        formatted_jobs = [format_job_response(job, score) for score, job in scored_jobs]
+        if emit:
+            emit("progress", {
+                "stage": "candidates_retrieved",
+                "candidates": formatted_jobs,
+                "total_candidates": len(formatted_jobs)
+            })
+            emit("progress", {"stage": "explaining_matches"})
 
-async def score_jobs_with_ai(jobs: list, user_text: str, intent_analysis: dict) -> list:
-    """
-    Use AI to score and rank jobs based on relevance with enhanced category matching
-    """
-    if not jobs:
-        return []
-    
-    try:
-        # Prepare job summaries for AI scoring
-        job_summaries = []
-        primary_category = intent_analysis.get("primary_category", "other")
-        
-        for i, job in enumerate(jobs[:20]):  # Limit to top 20 for AI processing
-            job_summary = {
-                "index": i,
-                "job_title": job[1] or job[18],
-                "company": job[2] or job[19],
-                "location": job[3],
-                "salary": job[4] or job[21],
-                "description": (job[5] or "")[:300],  # Increased for better analysis
-                "industry": job[6],
-                "job_type": job[8],
-                "experience_required": job[10],
-                "skills": job[11]
-            }
-            job_summaries.append(job_summary)
-        
-        # Enhanced AI scoring prompt with category awareness
-        system_prompt = f"""You are an expert job matching specialist. Score each job based on how well it matches the user's requirements.
-
-        CRITICAL MATCHING RULES:
-        1. The user is looking for "{primary_category}" category jobs
-        2. Jobs outside this category should get VERY LOW scores (0-30)
-        3. Exact job title matches should get highest priority
-        4. Consider semantic similarity but prioritize category alignment
-        
-        CATEGORY DEFINITIONS:
-        - software_engineer: Developer, programmer, software engineer, coding roles
-        - data_analyst: Data analyst, business analyst, research analyst
-        - sales: Sales representative, business development, account manager
-        - teacher: Teacher, instructor, trainer, education roles
-        - delivery: Delivery driver, courier, logistics
-        - customer_service: Customer service, call center, telecaller, support
-        
-        Return a JSON object with job scores:
-        {{
-            "scores": {{
-                "0": 85,
-                "1": 72,
-                "2": 90,
-                ...
-            }},
-            "reasoning": {{
-                "0": "Excellent match for skills and experience level",
-                "1": "Good match but location might not be ideal",
-                ...
-            }}
-        }}
-        
-        Score from 0-100 where:
-        - 90-100: Perfect match (exact job title + category match)
-        - 80-89: Excellent match (close job title + category match)
-        - 70-79: Good match (related role in same category)
-        - 60-69: Fair match (loosely related)
-        - 30-59: Poor match (wrong category but some overlap)
-        - 0-29: Very poor match (completely different category)
-        
-        PRIORITIZE: Job title relevance > Category alignment > Skills > Experience > Location"""
+        reasons = await explain_job_matches(user_text, formatted_jobs)
+        for job in formatted_jobs:
+            job["match_reason"] = reasons.get(job["id"], "")
+            job["ai_powered"] = job["id"] in reasons
 
-        user_prompt = f"""
-        User Search: {user_text}
-        User's Target Category: {primary_category}
-        
-        User Intent Analysis: {json.dumps(intent_analysis, indent=2)}
-        
-        Jobs to Score: {json.dumps(job_summaries, indent=2)}
-        
-        Score each job focusing on category alignment and job title relevance. 
-        Be STRICT about category mismatches - if someone wants a software engineer job, don't give high scores to telecaller positions.
-        """
+        return {
+            "best_job": formatted_jobs[0],
+            "alternative_jobs": formatted_jobs[1:]
+        }
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-        
-        response = llama_chat_completion(messages, temperature=0.1, max_tokens=2000)
-        ai_scores = json.loads(response)
-        
-        # Combine AI scores with jobs and add additional category-based filtering
-        scored_jobs = []
-        for i, job in enumerate(jobs[:20]):
-            ai_score = ai_scores.get("scores", {}).get(str(i), 30)  # Lower default score
-            
-            # Additional category validation to prevent mismatches
-            job_title_lower = (job[1] or job[18] or "").lower()
-            job_desc_lower = (job[5] or "").lower()
-            
-            # Apply strict category filtering
-            category_mismatch_penalty = 0
-            if primary_category == "software_engineer":
-                if any(term in job_title_lower for term in ['telecaller', 'call center', 'sales', 'delivery', 'driver', 'cook', 'cleaner']):
-                    category_mismatch_penalty = 50
-            elif primary_category == "data_analyst":
-                if any(term in job_title_lower for term in ['telecaller', 'delivery', 'driver', 'cook', 'cleaner', 'guard']):
-                    category_mismatch_penalty = 50
-            elif primary_category == "sales":
-                if any(term in job_title_lower for term in ['developer', 'engineer', 'programmer', 'analyst']):
-                    category_mismatch_penalty = 30
-            
-            # Apply penalty
-            final_score = max(0, ai_score - category_mismatch_penalty)
-            scored_jobs.append((final_score, job))
-        
-        # Sort by AI score
-        scored_jobs.sort(key=lambda x: x[0], reverse=True)
-        
-        # Add remaining jobs with very low default score
-        for job in jobs[20:]:
-            scored_jobs.append((20, job))  # Very low score for unprocessed jobs
-        
-        # Filter out jobs with very low scores if we have enough good matches
-        high_score_jobs = [job for score, job in scored_jobs if score >= 60]
-        if len(high_score_jobs) >= 5:
-            scored_jobs = [(score, job) for score, job in scored_jobs if score >= 40]
-        
-        return scored_jobs
-        
-    except Exception as e:
-        print(f"Error in AI scoring: {str(e)}")
-        # Fallback to simple scoring with category awareness
-        primary_category = intent_analysis.get("primary_category", "other")
-        fallback_scored = []
-        
-        for job in jobs:
-            job_title_lower = (job[1] or job[18] or "").lower()
-            score = 40  # Base score
-            
-            # Category-based scoring
-            if primary_category == "software_engineer":
-                if any(term in job_title_lower for term in ['software', 'developer', 'engineer', 'programmer']):
-                    score = 70
-                elif any(term in job_title_lower for term in ['telecaller', 'sales', 'delivery']):
-                    score = 10
-            elif primary_category == "data_analyst":
-                if 'analyst' in job_title_lower:
-                    score = 70
-                elif any(term in job_title_lower for term in ['telecaller', 'delivery']):
-                    score = 10
-            
-            fallback_scored.append((score, job))
-        
-        fallback_scored.sort(key=lambda x: x[0], reverse=True)
-        return fallback_scored
-        
-        # Sort by AI score
-        scored_jobs.sort(key=lambda x: x[0], reverse=True)
-        
-        # Add remaining jobs with default score
-        for job in jobs[20:]:
-            scored_jobs.append((30, job))  # Lower default score for unprocessed jobs
-        
-        return scored_jobs
-        
     except Exception as e:
-        print(f"Error in AI scoring: {str(e)}")
-        # Fallback to simple scoring
-        return [(50, job) for job in jobs]
+        print(f"Error in smart recommendation: {str(e)}")
+        # Fallback to the keyword recommendation
+        return await smart_recommend_job_fallback(user_info)
 
 def format_job_response(job_data, score=0):
     """Format job data for API response"""
@@ -930,7 +699,8 @@ def format_job_response(job_data, score=0):
         "company_contact": job_data["company_contact"] or "",
         "apply_url": job_data["apply_url"] or "",
         "relevance_score": score,
-        "ai_powered": True
+        # Ranking is local; only an LLM-written match reason makes a result AI-powered
+        "ai_powered": False
     }
 
 async def smart_recommend_job_fallback(user_info: UserInfo):
@@ -1148,54 +918,60 @@ async def simple_recommend_job(user_info: UserInfo):
     """
     Simple job recommendation without external AI services
     """
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Extract keywords from user info
-    user_text = user_info.user_info.lower()
-    keywords = []
-    
-    # Check for common job-related keywords
-    if any(word in user_text for word in ['software', 'developer', 'programming', 'coding', 'python', 'java', 'web']):
-        keywords.append('Software')
-    if any(word in user_text for word in ['sales', 'marketing', 'business']):
-        keywords.append('Sales')
-    if any(word in user_text for word in ['teacher', 'education', 'tutor']):
-        keywords.append('Education')
-    if any(word in user_text for word in ['nurse', 'doctor', 'medical', 'healthcare']):
-        keywords.append('Healthcare')
-    if any(word in user_text for word in ['engineer', 'technical', 'mechanical']):
-        keywords.append('Engineering')
+    # First stage: embedding neighbours and term matches ranked locally
+    ranked = await asyncio.to_thread(rank_jobs, user_info.user_info, top_k=1)
+    scored_jobs = await asyncio.to_thread(load_jobs, ranked)
+    job = scored_jobs[0][1] if scored_jobs else None
+
+    if job is None:
+        conn = get_db()
+        cursor = conn.cursor()
     
-    # Build query based on keywords
-    if keywords:
-        keyword_conditions = " OR ".join([f"job_title LIKE '%{keyword}%' OR industry LIKE '%{keyword}%'" for keyword in keywords])
-        query = f"""
-            SELECT id, job_title, company, location, salary_range, description,
-                   industry, sector, job_type, employment_type, experience_required, 
-                   skills_required, posted_date, application_deadline, tags, source, 
-                   is_active, created_at, title, company_contact, pay
-            FROM job_postings 
-            WHERE is_active = 1 AND ({keyword_conditions})
-            ORDER BY created_at DESC 
-            LIMIT 1
-        """
-    else:
-        # Default to recent jobs
-        query = """
-            SELECT id, job_title, company, location, salary_range, description,
-                   industry, sector, job_type, employment_type, experience_required, 
-                   skills_required, posted_date, application_deadline, tags, source, 
-                   is_active, created_at, title, company_contact, pay
-            FROM job_postings 
-            WHERE is_active = 1
-            ORDER BY created_at DESC 
-            LIMIT 1
-        """
+        # Extract keywords from user info
+        user_text = user_info.user_info.lower()
+        keywords = []
+    
+        # Check for common job-related keywords
+        if any(word in user_text for word in ['software', 'developer', 'programming', 'coding', 'python', 'java', 'web']):
+            keywords.append('Software')
+        if any(word in user_text for word in ['sales', 'marketing', 'business']):
+            keywords.append('Sales')
+        if any(word in user_text for word in ['teacher', 'education', 'tutor']):
+            keywords.append('Education')
+        if any(word in user_text for word in ['nurse', 'doctor', 'medical', 'healthcare']):
+            keywords.append('Healthcare')
+        if any(word in user_text for word in ['engineer', 'technical', 'mechanical']):
+            keywords.append('Engineering')
+    
+        # Build query based on keywords
+        if keywords:
+            keyword_conditions = " OR ".join([f"job_title LIKE '%{keyword}%' OR industry LIKE '%{keyword}%'" for keyword in keywords])
+            query = f"""
+                SELECT id, job_title, company, location, salary_range, description,
+                       industry, sector, job_type, employment_type, experience_required, 
+                       skills_required, posted_date, application_deadline, tags, source, 
+                       is_active, created_at, title, company_contact, pay
+                FROM job_postings 
+                WHERE is_active = 1 AND ({keyword_conditions})
+                ORDER BY created_at DESC 
+                LIMIT 1
+            """
+        else:
+            # Default to recent jobs
+            query = """
+                SELECT id, job_title, company, location, salary_range, description,
+                       industry, sector, job_type, employment_type, experience_required, 
+                       skills_required, posted_date, application_deadline, tags, source, 
+                       is_active, created_at, title, company_contact, pay
+                FROM job_postings 
+                WHERE is_active = 1
+                ORDER BY created_at DESC 
+                LIMIT 1
+            """
     
-    cursor.execute(query)
-    job = cursor.fetchone()
-    conn.close()
+        cursor.execute(query)
+        job = cursor.fetchone()
+        conn.close()
     
     if job:
         # Use string indices (dict-style access) for job row if cursor.row_factory is set to sqlite3.Row
@@ -1219,152 +995,3 @@ async def simple_recommend_job(user_info: UserInfo):
         }
     else:
         return {"best_job": None, "message": "No matching jobs found"}
-
-@router.get("/jobs/industries")
-async def get_job_industries():
-    """Get all available job industries"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT DISTINCT industry, COUNT(*) as count FROM job_postings WHERE industry IS NOT NULL AND is_active = 1 GROUP BY industry ORDER BY count DESC")
-    industries = cursor.fetchall()
-
-    conn.close()
-
-    return [
-        {
-            "industry": industry["industry"],
-            "count": industry["count"]
-        }
-        for industry in industries
-    ]
-
-@router.get("/jobs/locations")
-async def get_job_locations():
-    """Get all available job locations"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT DISTINCT location, COUNT(*) as count FROM job_postings WHERE location IS NOT NULL AND is_active = 1 GROUP BY location ORDER BY count DESC LIMIT 50")
-    locations = cursor.fetchall()
-
-    conn.close()
-
-    return [
-        {
-            "location": location["location"],
-            "count": location["count"]
-        }
-        for location in locations
-    ]
-
-@router.get("/jobs/sectors")
-async def get_job_sectors():
-    """Get all available job sectors"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT DISTINCT sector, COUNT(*) as count FROM job_postings WHERE sector IS NOT NULL AND is_active = 1 GROUP BY sector ORDER BY count DESC")
-    sectors = cursor.fetchall()
-
-    conn.close()
-
-    return [
-        {
-            "sector": sector["sector"],
-            "count": sector["count"]
-        }
-        for sector in sectors
-    ]
-
-@router.get("/jobs/stats")
-async def get_job_statistics():
-    """Get overall job statistics"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Total jobs
-    cursor.execute("SELECT COUNT(*) as total FROM job_postings WHERE is_active = 1")
-    total_jobs_row = cursor.fetchone()
-    if isinstance(total_jobs_row, dict):
-        total_jobs = total_jobs_row.get("total")
-    else:
-        total_jobs = total_jobs_row[0]
-
-    # Jobs by experience level
-    cursor.execute("SELECT experience_required, COUNT(*) as count FROM job_postings WHERE is_active = 1 GROUP BY experience_required ORDER BY experience_required")
-    exp_levels = cursor.fetchall()
-
-    # Top industries
-    cursor.execute("SELECT industry, COUNT(*) as count FROM job_postings WHERE industry IS NOT NULL AND is_active = 1 GROUP BY industry ORDER BY count DESC LIMIT 10")
-    top_industries = cursor.fetchall()
-
-    # Top locations
-    cursor.execute("SELECT location, COUNT(*) as count FROM job_postings WHERE location IS NOT NULL AND is_active = 1 GROUP BY location ORDER BY count DESC LIMIT 10")
-    top_locations = cursor.fetchall()
-
-    # Average salary from salary_range field (extract numeric values where possible)
-    cursor.execute("SELECT salary_range FROM job_postings WHERE salary_range IS NOT NULL AND salary_range != '' AND is_active = 1")
-    salary_ranges = cursor.fetchall()
-    
-    # Try to extract average salary from salary_range strings
-    total_salary = 0
-    salary_count = 0
-    import re
-    for salary_range in salary_ranges:
-        if isinstance(salary_range, dict):
-            salary_str = salary_range.get("salary_range")
-        else:
-            salary_str = salary_range[0]
-        if not salary_str:
-            continue
-        # Try to extract numbers from salary strings
-        numbers = re.findall(r'\d+', salary_str.replace(',', ''))
-        if numbers:
-            try:
-                if len(numbers) >= 2:
-                    # If we have a range like "30,000 - 50,000"
-                    avg_for_this_job = (int(numbers[0]) + int(numbers[1])) / 2
-                else:
-                    # If we have a single number
-                    avg_for_this_job = int(numbers[0])
-                total_salary += avg_for_this_job
-                salary_count += 1
-            except ValueError:
-                continue
-    
-    avg_salary = total_salary / salary_count if salary_count > 0 else None
-
-    conn.close()
-
-    def get_val(row, key, idx):
-        if isinstance(row, dict):
-            return row.get(key)
-        else:
-            return row[idx]
-
-    return {
-        "total_jobs": total_jobs,
-        "experience_levels": [
-            {
-                "experience_required": get_val(exp, "experience_required", 0),
-                "count": get_val(exp, "count", 1)
-            }
-            for exp in exp_levels
-        ],
-        "top_industries": [
-            {
-                "industry": get_val(ind, "industry", 0),
-                "count": get_val(ind, "count", 1)
-            }
-            for ind in top_industries
-        ],
-        "top_locations": [
-            {
-                "location": get_val(loc, "location", 0),
-                "count": get_val(loc, "count", 1)
-            }
-            for loc in top_locations
-        ],
-        "average_salary": round(avg_salary, 2) if avg_salary else None
-    }
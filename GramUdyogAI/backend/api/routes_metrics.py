@@ -0,0 +1,11 @@
+# api/routes_metrics.py
+from fastapi import APIRouter, Response
+
+from core.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, upstream, database and cache metrics in Prometheus text format"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
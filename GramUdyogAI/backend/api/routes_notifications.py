@@ -1,13 +1,40 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional, Set
 from datetime import datetime
+import asyncio
 import json
 import sqlite3
+import threading
 from pydantic import BaseModel
 from init_db import get_db  # Use canonical get_db
+from core.streaming import format_sse, KEEPALIVE_SECONDS
+from services.user_activity import invalidate_user_activity
+from services.row_mappers import NOTIFICATION_MAPPER
+from core.fast_json import FastJSONResponse
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
+PENDING_TEAM_INVITE_SQL = """
+    SELECT id FROM notifications
+    WHERE user_id = ? AND notification_type = 'team_invite'
+    AND related_id = ? AND is_read = 0
+"""
+MARK_ALL_READ_SQL = "UPDATE notifications SET is_read = 1, updated_at = ? WHERE user_id = ? AND is_read = 0"
+UNREAD_COUNT_SQL = "SELECT COALESCE(SUM(unread), 0) FROM notification_counters WHERE user_id = ?"
+# Answering an invite marks it read; only one concurrent response can match is_read = 0
+INVITE_RESPONSE_SQL = "UPDATE notifications SET metadata = ?, is_read = 1, updated_at = ? WHERE id = ? AND is_read = 0"
+
+
+def notification_list_sql(unread_only: bool = False, by_type: bool = False) -> str:
+    """A user's notifications, newest first; bind user_id, [type,] limit, offset"""
+    query = "SELECT * FROM notifications WHERE user_id = ?"
+    if unread_only:
+        query += " AND is_read = 0"
+    if by_type:
+        query += " AND notification_type = ?"
+    return query + " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+
 # Pydantic models
 class NotificationCreate(BaseModel):
     user_id: int
@@ -39,6 +66,88 @@ class TeamInviteResponse(BaseModel):
     action: str  # 'accept' or 'reject'
     message: Optional[str] = None
 
+class NotificationBroker:
+    """
+    In-process fan-out of notification events to connected SSE clients.
+    Route handlers here are sync and run in the threadpool, so publishing hops
+    onto each subscriber's event loop with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[tuple]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> tuple:
+        subscription = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id: int, subscription: tuple):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id: int) -> bool:
+        with self._lock:
+            return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id: int, event: str, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+notification_broker = NotificationBroker()
+
+# Counter maintenance: every write to notifications adjusts notification_counters
+# in the same transaction so the count endpoints never scan notifications.
+def adjust_notification_counters(cursor, user_id: int, notification_type: str, total_delta: int, unread_delta: int):
+    cursor.execute("""
+        INSERT INTO notification_counters (user_id, notification_type, total, unread)
+        VALUES (?, ?, MAX(0, ?), MAX(0, ?))
+        ON CONFLICT(user_id, notification_type) DO UPDATE SET
+            total = MAX(0, total + ?),
+            unread = MAX(0, unread + ?)
+    """, (user_id, notification_type, total_delta, unread_delta, total_delta, unread_delta))
+
+def read_notification_counts(cursor, user_id: int) -> dict:
+    cursor.execute("SELECT notification_type, total, unread FROM notification_counters WHERE user_id = ?", (user_id,))
+    types = {row["notification_type"]: {"total": row["total"], "unread": row["unread"]} for row in cursor.fetchall()}
+    return {"unread_count": sum(counts["unread"] for counts in types.values()), "types": types}
+
+def publish_notification_counts(user_id: int):
+    """Push the current counters to the user's open streams (no-op without subscribers)"""
+    if not notification_broker.has_subscribers(user_id):
+        return
+    conn = get_db()
+    try:
+        notification_broker.publish(user_id, "counts", read_notification_counts(conn.cursor(), user_id))
+    finally:
+        conn.close()
+
+def publish_notification(user_id: int, notification_id: int):
+    """
+    Push a committed notification and the user's new counters to their open
+    streams (no-op without subscribers). Call only after the insert has committed,
+    so a rolled-back notification is never announced.
+    """
+    if not notification_broker.has_subscribers(user_id):
+        return
+    conn = get_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM notifications WHERE id = ?", (notification_id,))
+        row = cursor.fetchone()
+        if row:
+            notification_broker.publish(user_id, "notification", {"user_id": user_id, **NOTIFICATION_MAPPER(row)})
+        notification_broker.publish(user_id, "counts", read_notification_counts(cursor, user_id))
+    finally:
+        conn.close()
+
 # Helper function to create notification
 def create_notification(
     db,
@@ -50,15 +159,61 @@ def create_notification(
     related_type: Optional[str] = None,
     event_id: Optional[int] = None,
     project_id: Optional[int] = None,
-    metadata: Optional[dict] = None
+    metadata: Optional[dict] = None,
+    commit: bool = True
 ):
+    """
+    Insert a notification and bump its counters, then commit and push it to the
+    user's open streams. Pass commit=False to make it part of the caller's
+    transaction; nothing is pushed then, and the caller must call
+    publish_notification() once its commit has succeeded.
+    """
     cursor = db.cursor()
+    created_at = datetime.utcnow()
     cursor.execute("""
         INSERT INTO notifications (user_id, title, message, notification_type, related_id, related_type, event_id, project_id, metadata, created_at, is_read)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (user_id, title, message, notification_type, related_id, related_type, event_id, project_id, json.dumps(metadata) if metadata else None, datetime.utcnow(), False))
-    db.commit()
-    return cursor.lastrowid
+    """, (user_id, title, message, notification_type, related_id, related_type, event_id, project_id, json.dumps(metadata) if metadata else None, created_at, False))
+    notification_id = cursor.lastrowid
+    adjust_notification_counters(cursor, user_id, notification_type, 1, 1)
+    if commit:
+        db.commit()
+        publish_notification(user_id, notification_id)
+    return notification_id
+
+# Push channel; declared before the /{notification_id} routes
+@router.get("/stream/{user_id}")
+async def stream_notifications(user_id: int):
+    """
+    Server-Sent Events stream of a user's notifications. Sends the current
+    counters on connect, then "notification" events for new notifications and
+    "counts" events whenever the unread/total counters change.
+    """
+    subscription = notification_broker.subscribe(user_id)
+    _, queue = subscription
+
+    async def events():
+        try:
+            conn = get_db()
+            try:
+                yield format_sse("counts", read_notification_counts(conn.cursor(), user_id))
+            finally:
+                conn.close()
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, data)
+        finally:
+            notification_broker.unsubscribe(user_id, subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # CRUD Operations
 @router.get("/", response_model=List[dict])
@@ -75,39 +230,16 @@ def get_notifications(
     try:
         cursor = conn.cursor()
         
-        query = "SELECT * FROM notifications WHERE user_id = ?"
+        query = notification_list_sql(unread_only, bool(notification_type))
         params: list = [user_id]
-        
-        if unread_only:
-            query += " AND is_read = 0"
-        
         if notification_type:
-            query += " AND notification_type = ?"
             params.append(notification_type)
-        
-        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
         cursor.execute(query, params)
         notifications = cursor.fetchall()
         
-        return [
-            {
-                "id": n["id"],
-                "title": n["title"],
-                "message": n["message"],
-                "notification_type": n["notification_type"],
-                "related_id": n["related_id"],
-                "related_type": n["related_type"],
-                "event_id": n["event_id"],
-                "project_id": n["project_id"],
-                "metadata": json.loads(n["metadata"]) if n["metadata"] else None,
-                "is_read": bool(n["is_read"]),
-                "created_at": n["created_at"],
-                "updated_at": n["updated_at"]
-            }
-            for n in notifications
-        ]
+        return FastJSONResponse(NOTIFICATION_MAPPER.many(notifications))
     finally:
         conn.close()
 
@@ -210,6 +342,11 @@ def update_notification(notification_id: int, notification_update: NotificationU
         if notification_update.message is not None:
             update_fields.append("message = ?")
             params.append(notification_update.message)
+        unread_delta = 0
+        read_state_changes = (
+            notification_update.is_read is not None
+            and bool(notification["is_read"]) != notification_update.is_read
+        )
         if notification_update.is_read is not None:
             update_fields.append("is_read = ?")
             params.append(1 if notification_update.is_read else 0)
@@ -222,8 +359,21 @@ def update_notification(notification_id: int, notification_update: NotificationU
         params.append(notification_id)
         
         query = f"UPDATE notifications SET {', '.join(update_fields)} WHERE id = ?"
-        cursor.execute(query, params)
+        if read_state_changes:
+            # Only the request that actually flips is_read moves the counter; a
+            # concurrent mark-read that got there first leaves nothing to adjust
+            cursor.execute(query + " AND is_read = ?", params + [notification["is_read"]])
+            if cursor.rowcount == 1:
+                unread_delta = -1 if notification_update.is_read else 1
+            else:
+                cursor.execute(query, params)
+        else:
+            cursor.execute(query, params)
+        if unread_delta:
+            adjust_notification_counters(cursor, notification["user_id"], notification["notification_type"], 0, unread_delta)
         conn.commit()
+        if unread_delta:
+            publish_notification_counts(notification["user_id"])
         
         # Get updated notification
         cursor.execute("SELECT * FROM notifications WHERE id = ?", (notification_id,))
@@ -253,14 +403,26 @@ def delete_notification(notification_id: int, db = Depends(get_db)):
     conn = get_db()
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM notifications WHERE id = ?", (notification_id,))
-        notification = cursor.fetchone()
-        
-        if not notification:
-            raise HTTPException(status_code=404, detail="Notification not found")
-        
-        cursor.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
+        while True:
+            cursor.execute("SELECT id, user_id, notification_type, is_read FROM notifications WHERE id = ?", (notification_id,))
+            notification = cursor.fetchone()
+            
+            if not notification:
+                raise HTTPException(status_code=404, detail="Notification not found")
+            
+            # Delete only the row as read above, so the unread delta matches what was removed;
+            # a concurrent delete or read-state change makes this a no-op and we look again
+            cursor.execute(
+                "DELETE FROM notifications WHERE id = ? AND is_read = ?", (notification_id, notification["is_read"])
+            )
+            if cursor.rowcount:
+                break
+        adjust_notification_counters(
+            cursor, notification["user_id"], notification["notification_type"],
+            -1, 0 if notification["is_read"] else -1
+        )
         conn.commit()
+        publish_notification_counts(notification["user_id"])
         return {"message": "Notification deleted successfully"}
     finally:
         conn.close()
@@ -271,14 +433,18 @@ def mark_as_read(notification_id: int, db = Depends(get_db)):
     conn = get_db()
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM notifications WHERE id = ?", (notification_id,))
+        cursor.execute("SELECT id, user_id, notification_type FROM notifications WHERE id = ?", (notification_id,))
         notification = cursor.fetchone()
         
         if not notification:
             raise HTTPException(status_code=404, detail="Notification not found")
         
-        cursor.execute("UPDATE notifications SET is_read = 1, updated_at = ? WHERE id = ?", (datetime.utcnow(), notification_id))
+        cursor.execute("UPDATE notifications SET is_read = 1, updated_at = ? WHERE id = ? AND is_read = 0", (datetime.utcnow(), notification_id))
+        if cursor.rowcount:
+            adjust_notification_counters(cursor, notification["user_id"], notification["notification_type"], 0, -1)
         conn.commit()
+        if cursor.rowcount:
+            publish_notification_counts(notification["user_id"])
         
         return {"message": "Notification marked as read"}
     finally:
@@ -290,11 +456,12 @@ def mark_all_as_read(user_id: int, db = Depends(get_db)):
     conn = get_db()
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM notifications WHERE user_id = ? AND is_read = 0", (user_id,))
-        count = cursor.fetchone()[0]
-        
-        cursor.execute("UPDATE notifications SET is_read = 1, updated_at = ? WHERE user_id = ? AND is_read = 0", (datetime.utcnow(), user_id))
+        cursor.execute(MARK_ALL_READ_SQL, (datetime.utcnow(), user_id))
+        count = cursor.rowcount
+        cursor.execute("UPDATE notification_counters SET unread = 0 WHERE user_id = ?", (user_id,))
         conn.commit()
+        if count:
+            publish_notification_counts(user_id)
         
         return {"message": f"Marked {count} notifications as read"}
     finally:
@@ -320,11 +487,7 @@ def send_team_invite(invite: TeamInviteCreate, db = Depends(get_db)):
             raise HTTPException(status_code=404, detail="User or project not found")
         
         # Check if invite already exists
-        cursor.execute("""
-            SELECT id FROM notifications 
-            WHERE user_id = ? AND notification_type = 'team_invite' 
-            AND related_id = ? AND is_read = 0
-        """, (invite.invitee_id, invite.project_id))
+        cursor.execute(PENDING_TEAM_INVITE_SQL, (invite.invitee_id, invite.project_id))
         existing_invite = cursor.fetchone()
         
         if existing_invite:
@@ -389,23 +552,22 @@ def respond_to_team_invite(invite_id: int, response: TeamInviteResponse, db = De
         metadata = json.loads(notification["metadata"]) if notification["metadata"] else {}
         
         if response.action == "accept":
+            # Update notification
+            metadata["status"] = "accepted"
+            cursor.execute(INVITE_RESPONSE_SQL, (json.dumps(metadata), datetime.utcnow(), invite_id))
+            if not cursor.rowcount:
+                raise HTTPException(status_code=404, detail="Team invite not found")
+            
             # Add user to team
             cursor.execute("""
                 INSERT INTO project_team_members (project_id, user_id, role, skills, joined_at, status)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (metadata["project_id"], notification["user_id"], metadata["role"], 
                   json.dumps(metadata["skills"]), datetime.utcnow(), "active"))
-            
-            # Update notification
-            metadata["status"] = "accepted"
-            cursor.execute("""
-                UPDATE notifications 
-                SET metadata = ?, is_read = 1, updated_at = ? 
-                WHERE id = ?
-            """, (json.dumps(metadata), datetime.utcnow(), invite_id))
+            adjust_notification_counters(cursor, notification["user_id"], "team_invite", 0, -1)
             
             # Create notification for inviter
-            create_notification(
+            response_notification_id = create_notification(
                 db=conn,
                 user_id=metadata["inviter_id"],
                 title=f"Team Invite Accepted",
@@ -414,23 +576,26 @@ def respond_to_team_invite(invite_id: int, response: TeamInviteResponse, db = De
                 related_id=metadata["project_id"],
                 related_type="project",
                 project_id=metadata["project_id"],
-                metadata={"status": "accepted", "invitee_id": notification["user_id"]}
+                metadata={"status": "accepted", "invitee_id": notification["user_id"]},
+                commit=False
             )
             
             conn.commit()
+            publish_notification_counts(notification["user_id"])
+            publish_notification(metadata["inviter_id"], response_notification_id)
+            invalidate_user_activity(notification["user_id"])
             return {"message": "Team invite accepted successfully"}
         
         elif response.action == "reject":
             # Update notification
             metadata["status"] = "rejected"
-            cursor.execute("""
-                UPDATE notifications 
-                SET metadata = ?, is_read = 1, updated_at = ? 
-                WHERE id = ?
-            """, (json.dumps(metadata), datetime.utcnow(), invite_id))
+            cursor.execute(INVITE_RESPONSE_SQL, (json.dumps(metadata), datetime.utcnow(), invite_id))
+            if not cursor.rowcount:
+                raise HTTPException(status_code=404, detail="Team invite not found")
+            adjust_notification_counters(cursor, notification["user_id"], "team_invite", 0, -1)
             
             # Create notification for inviter
-            create_notification(
+            response_notification_id = create_notification(
                 db=conn,
                 user_id=metadata["inviter_id"],
                 title=f"Team Invite Declined",
@@ -439,10 +604,13 @@ def respond_to_team_invite(invite_id: int, response: TeamInviteResponse, db = De
                 related_id=metadata["project_id"],
                 related_type="project",
                 project_id=metadata["project_id"],
-                metadata={"status": "rejected", "invitee_id": notification["user_id"]}
+                metadata={"status": "rejected", "invitee_id": notification["user_id"]},
+                commit=False
             )
             
             conn.commit()
+            publish_notification_counts(notification["user_id"])
+            publish_notification(metadata["inviter_id"], response_notification_id)
             return {"message": "Team invite rejected successfully"}
         
         else:
@@ -456,7 +624,7 @@ def get_unread_count(user_id: int, db = Depends(get_db)):
     conn = get_db()
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM notifications WHERE user_id = ? AND is_read = 0", (user_id,))
+        cursor.execute(UNREAD_COUNT_SQL, (user_id,))
         count = cursor.fetchone()[0]
         
         return {"unread_count": count}
@@ -469,21 +637,6 @@ def get_notification_types(user_id: int, db = Depends(get_db)):
     conn = get_db()
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT notification_type, is_read FROM notifications WHERE user_id = ?", (user_id,))
-        notifications = cursor.fetchall()
-        
-        type_counts = {}
-        for notification in notifications:
-            notification_type = notification["notification_type"]
-            is_read = bool(notification["is_read"])
-            
-            if notification_type not in type_counts:
-                type_counts[notification_type] = {"total": 0, "unread": 0}
-            
-            type_counts[notification_type]["total"] += 1
-            if not is_read:
-                type_counts[notification_type]["unread"] += 1
-        
-        return type_counts 
+        return read_notification_counts(cursor, user_id)["types"]
     finally:
         conn.close() 
\ No newline at end of file
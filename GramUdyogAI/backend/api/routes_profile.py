@@ -5,8 +5,11 @@ import sqlite3
 import json
 from datetime import datetime
 import logging
-from api.routes_auth import get_current_user
+from api.routes_auth import get_current_user, invalidate_user_cache
 from core.enhanced_llm import enhance_user_profile, calculate_impact_score
+from services.dashboard_cache import invalidate_dashboard_cache
+from services.tags import sync_tags
+from core.metrics import InstrumentedConnection
 
 # Configure logging with format and stream handler
 logging.basicConfig(
@@ -49,7 +52,7 @@ class AchievementCreate(BaseModel):
     impact_score: int
 
 def get_db():
-    conn = sqlite3.connect('gramudyogai.db')
+    conn = sqlite3.connect('gramudyogai.db', factory=InstrumentedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -58,7 +61,7 @@ async def create_profile(profile_data: ProfileCreate, current_user: Dict[str, An
     conn = None
     try:
         user_id = current_user['id']
-        conn = sqlite3.connect('gramudyogai.db', timeout=10)
+        conn = sqlite3.connect('gramudyogai.db', timeout=10, factory=InstrumentedConnection)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -94,8 +97,10 @@ async def create_profile(profile_data: ProfileCreate, current_user: Dict[str, An
                 profile_data.goals, json.dumps({}), json.dumps({}), json.dumps([]), json.dumps([]), json.dumps([]), json.dumps([]), datetime.now().isoformat(), datetime.now().isoformat()
             ))
             message = "Profile created successfully"
+        sync_tags(cursor, 'profile_skills', user_id, profile_data.skills)
 
         conn.commit()
+        invalidate_dashboard_cache(user_id)
         return {"message": message, "user_id": user_id}
 
     except Exception as e:
@@ -270,6 +275,7 @@ def create_default_profile(user_id: int) -> Dict[str, Any]:
         json.dumps(default_profile["networking_suggestions"]),
         default_profile["created_at"], default_profile["updated_at"]
     ))
+    sync_tags(cursor, 'profile_skills', user_id, default_profile["skills"])
     
     conn.commit()
     conn.close()
@@ -459,7 +465,10 @@ async def update_unified_profile(profile_update: ProfileUpdate, current_user = D
                 WHERE user_id = ?
             '''
             cursor.execute(query, params)
+            if profile_update.skills is not None:
+                sync_tags(cursor, 'profile_skills', user_id, profile_update.skills)
             conn.commit()
+            invalidate_dashboard_cache(user_id)
         # --- Sync name/organization to users table if present ---
         user_update_fields = []
         user_params = []
@@ -476,6 +485,7 @@ async def update_unified_profile(profile_update: ProfileUpdate, current_user = D
             user_query = f"UPDATE users SET {', '.join(user_update_fields)} WHERE id = ?"
             cursor.execute(user_query, user_params)
             conn.commit()
+            invalidate_user_cache(user_id)
         conn.close()
         # Return updated profile
         return await _get_unified_profile_by_user_id(user_id)
@@ -6,6 +6,11 @@ from datetime import datetime
 import json
 import logging
 from api.routes_auth import get_current_user
+from api.routes_notifications import create_notification, publish_notification
+from services.user_activity import invalidate_user_activity
+from services.tags import sync_tags
+from services.row_mappers import PROJECT_MAPPER
+from core.fast_json import FastJSONResponse
 from init_db import get_db
 
 # Configure logging
@@ -14,6 +19,34 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+EXISTING_INVESTMENT_SQL = "SELECT id FROM project_investments WHERE project_id = ? AND investor_id = ?"
+PROJECT_INVESTMENTS_SQL = '''
+    SELECT id, investor_id, investor_name, investor_email, investor_phone,
+           investment_amount, investment_type, equity_percentage, expected_returns,
+           terms_conditions, message, status, invested_at, response_message, response_at
+    FROM project_investments
+    WHERE project_id = ?
+    ORDER BY invested_at DESC
+'''
+INVESTOR_INVESTMENTS_SQL = '''
+    SELECT pi.id, pi.project_id, p.title as project_title, pi.investment_amount,
+           pi.investment_type, pi.equity_percentage, pi.expected_returns,
+           pi.status, pi.invested_at, pi.response_message, pi.response_at
+    FROM project_investments pi
+    JOIN projects p ON pi.project_id = p.id
+    WHERE pi.investor_id = ?
+    ORDER BY pi.invested_at DESC
+'''
+USER_PROJECTS_SQL = """
+    SELECT p.id, p.title, p.description, p.category, p.event_id, p.event_name, p.event_type,
+           p.team_members, p.technologies, p.impact_metrics, p.funding_status, p.funding_amount,
+           p.funding_goal, p.location, p.state, p.created_by, p.created_at, p.completed_at,
+           p.status, p.media, p.testimonials, p.awards, p.tags
+    FROM projects p
+    WHERE p.created_by = ?
+    ORDER BY p.created_at DESC
+"""
+
 # Pydantic models for request validation
 class ProjectCreate(BaseModel):
     title: str
@@ -112,37 +145,9 @@ async def get_projects(
         cursor.execute(query, params)
         projects_data = cursor.fetchall()
         
-        projects = []
-        for row in projects_data:
-            project = {
-                "id": row['id'],
-                "title": row['title'],
-                "description": row['description'],
-                "category": row['category'],
-                "event_id": row['event_id'],
-                "event_name": row['event_name'],
-                "event_type": row['event_type'],
-                "team_members": json.loads(row['team_members'] or '[]'),
-                "technologies": json.loads(row['technologies'] or '[]'),
-                "impact_metrics": json.loads(row['impact_metrics'] or '{}'),
-                "funding_status": row['funding_status'],
-                "funding_amount": row['funding_amount'],
-                "funding_goal": row['funding_goal'],
-                "location": row['location'],
-                "state": row['state'],
-                "created_by": row['created_by'],
-                "created_at": row['created_at'],
-                "completed_at": row['completed_at'],
-                "status": row['status'],
-                "media": json.loads(row['media'] or '{"images": [], "videos": []}'),
-                "testimonials": json.loads(row['testimonials'] or '[]'),
-                "awards": json.loads(row['awards'] or '[]'),
-                "tags": json.loads(row['tags'] or '[]')
-            }
-            projects.append(project)
-        
+        projects = PROJECT_MAPPER.many(projects_data)
         conn.close()
-        return projects
+        return FastJSONResponse(projects)
         
     except Exception as e:
         logger.error(f"Error fetching projects: {e}")
@@ -169,33 +174,7 @@ async def get_project_by_id(project_id: int):
         if not row:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        project = {
-            "id": row['id'],
-            "title": row['title'],
-            "description": row['description'],
-            "category": row['category'],
-            "event_id": row['event_id'],
-            "event_name": row['event_name'],
-            "event_type": row['event_type'],
-            "team_members": json.loads(row['team_members'] or '[]'),
-            "technologies": json.loads(row['technologies'] or '[]'),
-            "impact_metrics": json.loads(row['impact_metrics'] or '{}'),
-            "funding_status": row['funding_status'],
-            "funding_amount": row['funding_amount'],
-            "funding_goal": row['funding_goal'],
-            "location": row['location'],
-            "state": row['state'],
-            "created_by": row['created_by'],
-            "created_at": row['created_at'],
-            "completed_at": row['completed_at'],
-            "status": row['status'],
-            "media": json.loads(row['media'] or '{"images": [], "videos": []}'),
-            "testimonials": json.loads(row['testimonials'] or '[]'),
-            "awards": json.loads(row['awards'] or '[]'),
-            "tags": json.loads(row['tags'] or '[]')
-        }
-        
-        return project
+        return PROJECT_MAPPER(row)
         
     except HTTPException:
         raise
@@ -247,8 +226,10 @@ async def create_project(project: ProjectCreate, current_user: Dict[str, Any] =
         ))
         
         project_id = cursor.lastrowid
+        sync_tags(cursor, 'project_technologies', project_id, project.technologies)
         conn.commit()
         conn.close()
+        invalidate_user_activity(current_user["id"])
         
         return await get_project_by_id(project_id)
         
@@ -344,6 +325,8 @@ async def update_project(project_id: int, project_update: ProjectUpdate, current
             
             query = f"UPDATE projects SET {', '.join(update_fields)} WHERE id = ?"
             cursor.execute(query, params)
+            if project_update.technologies is not None:
+                sync_tags(cursor, 'project_technologies', project_id, project_update.technologies)
             
             conn.commit()
             conn.close()
@@ -437,6 +420,7 @@ async def add_team_member(project_id: int, team_member: ProjectTeamMemberCreate,
         team_member_id = cursor.lastrowid
         conn.commit()
         conn.close()
+        invalidate_user_activity(team_member.user_id)
         
         return {
             "id": team_member_id,
@@ -589,9 +573,10 @@ async def delete_team_member(project_id: int, team_member_id: int, current_user:
             raise HTTPException(status_code=403, detail="Not authorized to remove team members from this project")
         
         # Check if team member exists
-        cursor.execute("SELECT id FROM project_team_members WHERE id = ? AND project_id = ?",
+        cursor.execute("SELECT id, user_id FROM project_team_members WHERE id = ? AND project_id = ?",
                       (team_member_id, project_id))
-        if not cursor.fetchone():
+        member = cursor.fetchone()
+        if not member:
             raise HTTPException(status_code=404, detail="Team member not found")
         
         cursor.execute("DELETE FROM project_team_members WHERE id = ? AND project_id = ?",
@@ -599,6 +584,7 @@ async def delete_team_member(project_id: int, team_member_id: int, current_user:
         
         conn.commit()
         conn.close()
+        invalidate_user_activity(member['user_id'])
         
         return {"message": "Team member removed successfully"}
         
@@ -627,8 +613,7 @@ async def create_investment(
             raise HTTPException(status_code=404, detail="Project not found")
         
         # Check if investor already has an investment for this project
-        cursor.execute("SELECT id FROM project_investments WHERE project_id = ? AND investor_id = ?",
-                      (project_id, current_user["id"]))
+        cursor.execute(EXISTING_INVESTMENT_SQL, (project_id, current_user["id"]))
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail="You have already invested in this project")
         
@@ -658,29 +643,26 @@ async def create_investment(
         investment_id = cursor.lastrowid
         
         # Create notification for project owner
-        cursor.execute('''
-            INSERT INTO notifications (
-                user_id, title, message, notification_type, related_id, related_type,
-                project_id, metadata, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            project['created_by'],
-            'New Investment Proposal',
-            f'{investment.investor_name} wants to invest ₹{investment.investment_amount:,} in your project "{project["title"]}"',
-            'investment_proposal',
-            investment_id,
-            'investment',
-            project_id,
-            json.dumps({
+        notification_id = create_notification(
+            db=conn,
+            user_id=project['created_by'],
+            title='New Investment Proposal',
+            message=f'{investment.investor_name} wants to invest ₹{investment.investment_amount:,} in your project "{project["title"]}"',
+            notification_type='investment_proposal',
+            related_id=investment_id,
+            related_type='investment',
+            project_id=project_id,
+            metadata={
                 'investor_name': investment.investor_name,
                 'amount': investment.investment_amount,
                 'type': investment.investment_type
-            }),
-            datetime.now().isoformat()
-        ))
+            },
+            commit=False
+        )
         
         conn.commit()
         conn.close()
+        publish_notification(project['created_by'], notification_id)
         
         return {"id": investment_id, "message": "Investment proposal submitted successfully"}
         
@@ -707,14 +689,7 @@ async def get_project_investments(
             raise HTTPException(status_code=404, detail="Project not found")
         
         # Everyone can see all investments for a project (public information)
-        cursor.execute('''
-            SELECT id, investor_id, investor_name, investor_email, investor_phone,
-                   investment_amount, investment_type, equity_percentage, expected_returns,
-                   terms_conditions, message, status, invested_at, response_message, response_at
-            FROM project_investments 
-            WHERE project_id = ?
-            ORDER BY invested_at DESC
-        ''', (project_id,))
+        cursor.execute(PROJECT_INVESTMENTS_SQL, (project_id,))
         
         investments_data = cursor.fetchall()
         print(f"DEBUG: Found {len(investments_data)} investments for project {project_id}")
@@ -803,29 +778,26 @@ async def update_investment_status(
         ))
         
         # Create notification for investor
-        cursor.execute('''
-            INSERT INTO notifications (
-                user_id, title, message, notification_type, related_id, related_type,
-                project_id, metadata, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            investment['investor_id'],
-            f'Investment {update_data.status.title()}',
-            f'Your investment proposal of ₹{investment["investment_amount"]:,} for "{project["title"]}" has been {update_data.status}',
-            'investment_update',
-            investment_id,
-            'investment',
-            project_id,
-            json.dumps({
+        notification_id = create_notification(
+            db=conn,
+            user_id=investment['investor_id'],
+            title=f'Investment {update_data.status.title()}',
+            message=f'Your investment proposal of ₹{investment["investment_amount"]:,} for "{project["title"]}" has been {update_data.status}',
+            notification_type='investment_update',
+            related_id=investment_id,
+            related_type='investment',
+            project_id=project_id,
+            metadata={
                 'status': update_data.status,
                 'amount': investment['investment_amount'],
                 'type': investment['investment_type']
-            }),
-            datetime.now().isoformat()
-        ))
+            },
+            commit=False
+        )
         
         conn.commit()
         conn.close()
+        publish_notification(investment['investor_id'], notification_id)
         
         return {"message": f"Investment status updated to {update_data.status}"}
         
@@ -842,15 +814,7 @@ async def get_my_investments(current_user: Dict[str, Any] = Depends(get_current_
         conn = get_db()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT pi.id, pi.project_id, p.title as project_title, pi.investment_amount,
-                   pi.investment_type, pi.equity_percentage, pi.expected_returns,
-                   pi.status, pi.invested_at, pi.response_message, pi.response_at
-            FROM project_investments pi
-            JOIN projects p ON pi.project_id = p.id
-            WHERE pi.investor_id = ?
-            ORDER BY pi.invested_at DESC
-        ''', (current_user["id"],))
+        cursor.execute(INVESTOR_INVESTMENTS_SQL, (current_user["id"],))
         
         investments_data = cursor.fetchall()
         conn.close()
@@ -887,46 +851,11 @@ async def get_user_projects(user_id: int):
         cursor = conn.cursor()
         
         # Get projects created by user
-        cursor.execute("""
-            SELECT p.id, p.title, p.description, p.category, p.event_id, p.event_name, p.event_type,
-                   p.team_members, p.technologies, p.impact_metrics, p.funding_status, p.funding_amount,
-                   p.funding_goal, p.location, p.state, p.created_by, p.created_at, p.completed_at,
-                   p.status, p.media, p.testimonials, p.awards, p.tags
-            FROM projects p
-            WHERE p.created_by = ?
-            ORDER BY p.created_at DESC
-        """, (user_id,))
-        
-        projects = []
-        for row in cursor.fetchall():
-            project = {
-                "id": row['id'],
-                "title": row['title'],
-                "description": row['description'],
-                "category": row['category'],
-                "event_id": row['event_id'],
-                "event_name": row['event_name'],
-                "event_type": row['event_type'],
-                "team_members": json.loads(row['team_members']) if row['team_members'] else [],
-                "technologies": json.loads(row['technologies']) if row['technologies'] else [],
-                "impact_metrics": json.loads(row['impact_metrics']) if row['impact_metrics'] else {},
-                "funding_status": row['funding_status'],
-                "funding_amount": row['funding_amount'],
-                "funding_goal": row['funding_goal'],
-                "location": row['location'],
-                "state": row['state'],
-                "created_by": row['created_by'],
-                "created_at": row['created_at'],
-                "completed_at": row['completed_at'],
-                "status": row['status'],
-                "media": json.loads(row['media']) if row['media'] else [],
-                "testimonials": json.loads(row['testimonials']) if row['testimonials'] else [],
-                "awards": json.loads(row['awards']) if row['awards'] else [],
-                "tags": json.loads(row['tags']) if row['tags'] else []
-            }
-            projects.append(project)
+        cursor.execute(USER_PROJECTS_SQL, (user_id,))
         
-        return projects
+        projects = PROJECT_MAPPER.many(cursor.fetchall())
+        conn.close()
+        return FastJSONResponse(projects)
         
     except Exception as e:
         logger.error(f"Error fetching user projects: {e}")
@@ -1,6 +1,6 @@
 # api/routes_scheme.py
 import sqlite3
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List
@@ -10,8 +10,11 @@ from core.scheme_recommender import (
     get_relevant_scheme_names,
     load_selected_schemes,
     explain_schemes,
+    list_schemes,
+    scheme_data_version,
 )
 from core.translation import llama_translate_string as translate_text
+from core.streaming import sse_response, token_emitter
 #from core.government_api import router as government_router
 
 from fastapi.responses import JSONResponse
@@ -19,6 +22,7 @@ from fastapi.encoders import jsonable_encoder
 import os
 import logging
 from init_db import get_db
+from services.http_cache import catalog_response
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
@@ -41,6 +45,11 @@ class SchemeResponse(BaseModel):
     relevant_schemes: List[str]
     explanation: List[SchemeExplanation]
 
+@router.get("/schemes")
+async def get_schemes(request: Request):
+    """List every available scheme (name, location, tags, description)"""
+    return catalog_response(request, scheme_data_version(), list_schemes)
+
 @router.post("/schemes", response_model=SchemeResponse)
 async def recommend_schemes(data: UserRequest):
     all_names = await get_all_scheme_names()
@@ -52,6 +61,23 @@ async def recommend_schemes(data: UserRequest):
         "explanation": explanation
     }
 
+@router.post("/schemes/stream")
+async def recommend_schemes_stream(data: UserRequest):
+    """Server-Sent Events variant of /schemes: stage events, the selected scheme names, then explanation tokens"""
+    async def produce(emit):
+        emit("progress", {"stage": "selecting_schemes"})
+        all_names = await get_all_scheme_names()
+        relevant_names = await get_relevant_scheme_names(data.occupation, all_names)
+        emit("progress", {"stage": "schemes_selected", "relevant_schemes": relevant_names})
+        selected_schemes = await load_selected_schemes(relevant_names)
+        emit("progress", {"stage": "explaining_schemes"})
+        explanation = await explain_schemes(data.occupation, selected_schemes, on_token=token_emitter(emit))
+        return {
+            "relevant_schemes": relevant_names,
+            "explanation": explanation
+        }
+    return sse_response(produce)
+
 @router.get("/schemes/search")
 async def search_schemes(query: str, limit: int = 10):
     """Search schemes by name, description, or target group (for AI assistant and frontend helpers). Fully implemented."""
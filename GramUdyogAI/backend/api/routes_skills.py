@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List
@@ -11,12 +11,10 @@ from core.government_api import (
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 import os
-from core.skill_tutorial import generate_visual_summary_json
-from init_db import get_db
-from datetime import datetime
-import json
+from services import visual_summaries as visual_summary_service
+from core.youtube_cache import get_youtube_cache_metrics
+from core.fast_json import FastJSONResponse
 from core.audio_generation import TextToSpeech
-import sqlite3
 class VisualSummaryRequest(BaseModel):
     topic: str
     context: str
@@ -24,12 +22,6 @@ class VisualSummaryRequest(BaseModel):
     generateAudio: bool = False  # Whether to generate all audio upfront
     audioOnDemand: bool = False  # Whether to allow on-demand audio generation
 
-class VisualSummaryDB(BaseModel):
-    id: int
-    topic: str
-    summary_data: dict
-    created_at: str
-
 class AudioUpdateRequest(BaseModel):
     summary_id: int
     section_index: int
@@ -71,6 +63,11 @@ async def get_audio_file(audio_name: str):
 
     return FileResponse(audio_path, media_type="audio/wav")
 
+@router.get("/youtube-metrics")
+async def youtube_metrics():
+    """YouTube search cache hit rate and remaining daily API quota"""
+    return get_youtube_cache_metrics()
+
 @router.post("/visual-summary")
 async def create_visual_summary(request: VisualSummaryRequest):
 
@@ -81,47 +78,13 @@ async def create_visual_summary(request: VisualSummaryRequest):
     print(f"Audio On Demand: {request.audioOnDemand}")
     
     try:
-        # Create tables if they don't exist
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Generate summary
-        summary = generate_visual_summary_json(
+        return await visual_summary_service.create_visual_summary(
             topic=request.topic,
-            rag=request.context,
+            context=request.context,
             language=request.language,
             generate_audio=request.generateAudio
         )
         
-        print(f"\nGenerated Summary: {json.dumps(summary.model_dump(), indent=2)}")
-        
-        # Store main summary
-        cursor.execute(
-            "INSERT INTO visual_summaries (topic, summary_data) VALUES (?, ?)",
-            (request.topic, summary.model_dump_json())
-        )
-        
-        summary_id = cursor.lastrowid
-        print(f"\nCreated summary with ID: {summary_id}")
-        
-        # Store translation if not English
-        if request.language != "en":
-            cursor.execute(
-                "INSERT INTO summary_translations (summary_id, language, translated_data) VALUES (?, ?, ?)",
-                (summary_id, request.language, json.dumps(summary.model_dump()))
-            )
-            print(f"Stored translation for language: {request.language}")
-        
-        conn.commit()
-        conn.close()
-        
-        return {
-            "id": summary_id,
-            "topic": request.topic,
-            "summary_data": summary.model_dump(),
-            "created_at": datetime.now().isoformat()
-        }
-        
     except Exception as e:
         print(f"\n!!! Error in create_visual_summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -132,83 +95,32 @@ async def update_summary_audio(request: AudioUpdateRequest):
     print(f"Summary ID: {request.summary_id}")
     print(f"Section Index: {request.section_index}")
     print(f"Audio URL: {request.audio_url}")
-    
+
     try:
-        conn = sqlite3.connect("gramudyogai.db")
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Get current summary data
-        cursor.execute("SELECT summary_data FROM visual_summaries WHERE id = ?", (request.summary_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            raise HTTPException(status_code=404, detail="Summary not found")
-            
-        summary_data = json.loads(result[0])
-        print(f"\nCurrent summary data: {json.dumps(summary_data, indent=2)}")
-        
-        # Update audio URL for the specific section
-        if 'sections' in summary_data and len(summary_data['sections']) > request.section_index:
-            summary_data['sections'][request.section_index]['audioUrl'] = request.audio_url
-            
-            # Update the database
-            cursor.execute(
-                "UPDATE visual_summaries SET summary_data = ? WHERE id = ?",
-                (json.dumps(summary_data), request.summary_id)
-            )
-            conn.commit()
-            print(f"\nUpdated summary data: {json.dumps(summary_data, indent=2)}")
-            
-            return {"message": "Audio URL updated successfully"}
-            
-        raise HTTPException(status_code=400, detail="Invalid section index")
-        
+        updated = visual_summary_service.update_section_audio(
+            request.summary_id, request.section_index, request.audio_url
+        )
     except Exception as e:
         print(f"\n!!! Error in update_summary_audio: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    if not updated:
+        raise HTTPException(status_code=400, detail="Invalid section index")
+    return {"message": "Audio URL updated successfully"}
 
 @router.get("/visual-summary/{summary_id}")
 async def get_visual_summary(summary_id: int):
-    conn = sqlite3.connect("gramudyogai.db")
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT * FROM visual_summaries WHERE id = ?",
-        (summary_id,)
-    )
-    
-    result = cursor.fetchone()
-    conn.close()
-    
-    if not result:
+    summary = visual_summary_service.load_visual_summary(summary_id)
+    if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
-        
-    return VisualSummaryDB(
-        id=result[0],
-        topic=result[1],
-        summary_data=json.loads(result[2]),
-        created_at=result[3]
-    )
+    return summary
 
 @router.get("/visual-summaries")
-async def list_visual_summaries():
-    conn = sqlite3.connect("gramudyogai.db")
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM visual_summaries ORDER BY created_at DESC")
-    results = cursor.fetchall()
-    conn.close()
-    
-    return [
-        VisualSummaryDB(
-            id=row[0],
-            topic=row[1],
-            summary_data=json.loads(row[2]),
-            created_at=row[3]
-        ) for row in results
-    ]
\ No newline at end of file
+async def list_visual_summaries(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Id, topic and creation time of stored summaries, newest first; open one with /visual-summary/{id}"""
+    return FastJSONResponse(visual_summary_service.list_visual_summaries(limit, offset))
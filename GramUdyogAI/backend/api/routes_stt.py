@@ -1,55 +1,39 @@
 from fastapi import APIRouter, UploadFile, Form, Request
 from fastapi.responses import JSONResponse
-from core.stt import transcribe_audio_and_extract_profile, normalize_language
-import tempfile
-import os
-from groq import Groq
+from core.stt import (
+    transcribe_audio_and_extract_profile,
+    transcribe_audio as transcribe_upload,
+    transcribe_audio_chunked,
+    extract_profile_from_transcript,
+)
 from core.enhanced_llm import voice_update_profile
 import json
 
 router = APIRouter()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
 @router.post("/speech-to-profile")
-async def speech_to_profile(audio: UploadFile, language: str = Form("en")):
+async def speech_to_profile(audio: UploadFile, language: str = Form("en"), chunked: bool = Form(False)):
     try:
-        profile_data = transcribe_audio_and_extract_profile(audio.file, language)
+        if chunked:
+            transcription = await transcribe_audio_chunked(audio.file, language, audio.filename)
+            profile_data = extract_profile_from_transcript(transcription["text"])
+        else:
+            profile_data = transcribe_audio_and_extract_profile(audio.file, language, audio.filename)
         print(f"Extracted profile data: {profile_data}")
         return JSONResponse(content=profile_data)
     except Exception as e:
         print(f"Error processing audio file: {e}")
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
-import shutil
-
 @router.post("/transcribe")
-async def transcribe_audio(audio: UploadFile, language: str = Form("en")):
-    """Simple audio transcription endpoint for general use"""
+async def transcribe_audio(audio: UploadFile, language: str = Form("en"), chunked: bool = Form(False)):
+    """Simple audio transcription endpoint for general use.
+    With chunked=true, long recordings are split on silence and transcribed in parallel."""
     try:
-        # Ensure file pointer is at the start
-        audio.file.seek(0)
-        # Save uploaded file to a temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-            shutil.copyfileobj(audio.file, tmp)
-            tmp_path = tmp.name
-        
-        # Normalize language code
-        language_code = normalize_language(language)
-        
-        # Transcribe using Groq Whisper
-        with open(tmp_path, "rb") as f:
-            transcription = client.audio.transcriptions.create(
-                file=(tmp_path, f.read()),
-                model="whisper-large-v3",
-                language=language_code,
-                response_format="json",
-                temperature=0.5
-            )
-        
-        # Clean up temp file
-        os.unlink(tmp_path)
-        
-        return JSONResponse(content={"text": transcription.text})
+        if chunked:
+            return JSONResponse(content=await transcribe_audio_chunked(audio.file, language, audio.filename))
+        result = transcribe_upload(audio.file, language, audio.filename)
+        return JSONResponse(content={"text": result["text"]})
     except Exception as e:
         print(f"Error transcribing audio: {e}")
         return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -5,8 +5,10 @@ import sqlite3
 from datetime import datetime
 import json
 import logging
-from api.routes_auth import get_current_user
+from api.routes_auth import get_current_user, invalidate_user_cache
 from init_db import get_db
+from core.metrics import InstrumentedConnection
+from services.user_activity import get_user_counts, get_user_feed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,7 +33,7 @@ class UserProfileUpdate(BaseModel):
 
 def get_db():
     """Get database connection with row factory for dictionary access"""
-    conn = sqlite3.connect('gramudyogai.db')
+    conn = sqlite3.connect('gramudyogai.db', factory=InstrumentedConnection)
     conn.row_factory = sqlite3.Row  # This makes rows accessible by column name
     return conn
 
@@ -197,6 +199,7 @@ async def update_user(user_id: int, user_update: UserUpdate, current_user: Dict[
             
             conn.commit()
             conn.close()
+            invalidate_user_cache(user_id)
             
             return await get_user_by_id(user_id)
         else:
@@ -233,6 +236,7 @@ async def delete_user(user_id: int, current_user: Dict[str, Any] = Depends(get_c
         
         conn.commit()
         conn.close()
+        invalidate_user_cache(user_id)
         
         return {"message": "User deactivated successfully"}
         
@@ -246,34 +250,11 @@ async def delete_user(user_id: int, current_user: Dict[str, Any] = Depends(get_c
 async def get_user_stats(user_id: int):
     """Get user statistics and metrics"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Get user's projects count
-        cursor.execute("SELECT COUNT(*) as count FROM projects WHERE created_by = ?", (user_id,))
-        projects_count = cursor.fetchone()['count']
-        
-        # Get user's events count (as organizer)
-        cursor.execute("SELECT COUNT(*) as count FROM events WHERE created_by = ?", (user_id,))
-        events_count = cursor.fetchone()['count']
-        
-        # Get user's event participations
-        cursor.execute("SELECT COUNT(*) as count FROM event_participants WHERE user_id = ?", (user_id,))
-        participations_count = cursor.fetchone()['count']
-        
-        # Get user's team memberships
-        cursor.execute("SELECT COUNT(*) as count FROM project_team_members WHERE user_id = ?", (user_id,))
-        team_memberships_count = cursor.fetchone()['count']
-        
-        conn.close()
-        
+        counts = get_user_counts(user_id)
         return {
             "user_id": user_id,
-            "projects_created": projects_count,
-            "events_organized": events_count,
-            "events_participated": participations_count,
-            "team_memberships": team_memberships_count,
-            "total_activities": projects_count + events_count + participations_count + team_memberships_count
+            **counts,
+            "total_activities": sum(counts.values())
         }
         
     except Exception as e:
@@ -285,15 +266,14 @@ async def get_user_stats(user_id: int):
 async def get_user_achievements(user_id: int):
     """Get user achievements based on their activities"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        counts = get_user_counts(user_id)
+        projects_count = counts['projects_created']
+        events_count = counts['events_organized']
+        participations_count = counts['events_participated']
+        team_memberships_count = counts['team_memberships']
         
         achievements = []
         
-        # Get projects created achievements
-        cursor.execute("SELECT COUNT(*) as count FROM projects WHERE created_by = ?", (user_id,))
-        projects_count = cursor.fetchone()['count']
-        
         if projects_count >= 1:
             achievements.append({
                 "id": 1,
@@ -314,10 +294,6 @@ async def get_user_achievements(user_id: int):
                 "badge_color": "gold"
             })
         
-        # Get events organized achievements
-        cursor.execute("SELECT COUNT(*) as count FROM events WHERE created_by = ?", (user_id,))
-        events_count = cursor.fetchone()['count']
-        
         if events_count >= 1:
             achievements.append({
                 "id": 3,
@@ -328,10 +304,6 @@ async def get_user_achievements(user_id: int):
                 "badge_color": "green"
             })
         
-        # Get participation achievements
-        cursor.execute("SELECT COUNT(*) as count FROM event_participants WHERE user_id = ?", (user_id,))
-        participations_count = cursor.fetchone()['count']
-        
         if participations_count >= 1:
             achievements.append({
                 "id": 4,
@@ -342,10 +314,6 @@ async def get_user_achievements(user_id: int):
                 "badge_color": "purple"
             })
         
-        # Get team membership achievements
-        cursor.execute("SELECT COUNT(*) as count FROM project_team_members WHERE user_id = ?", (user_id,))
-        team_memberships_count = cursor.fetchone()['count']
-        
         if team_memberships_count >= 1:
             achievements.append({
                 "id": 5,
@@ -367,73 +335,7 @@ async def get_user_achievements(user_id: int):
 async def get_user_activities(user_id: int, limit: int = Query(10, ge=1, le=50)):
     """Get user recent activities"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        activities = []
-        
-        # Get recent projects
-        cursor.execute("""
-            SELECT 'project_created' as type, title, description, created_at, id
-            FROM projects 
-            WHERE created_by = ? 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        """, (user_id, limit // 2))
-        
-        for row in cursor.fetchall():
-            activities.append({
-                "id": f"project_{row['id']}",
-                "type": "project_created",
-                "title": f"Created project: {row['title']}",
-                "description": row['description'][:100] + "..." if len(row['description']) > 100 else row['description'],
-                "date": row['created_at'],
-                "impact_score": 50
-            })
-        
-        # Get recent events
-        cursor.execute("""
-            SELECT 'event_created' as type, title, description, created_at, id
-            FROM events 
-            WHERE created_by = ? 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        """, (user_id, limit // 2))
-        
-        for row in cursor.fetchall():
-            activities.append({
-                "id": f"event_{row['id']}",
-                "type": "event_created",
-                "title": f"Organized event: {row['title']}",
-                "description": row['description'][:100] + "..." if len(row['description']) > 100 else row['description'],
-                "date": row['created_at'],
-                "impact_score": 30
-            })
-        
-        # Get recent event participations
-        cursor.execute("""
-            SELECT 'event_participated' as type, e.title, e.description, ep.joined_at, e.id
-            FROM event_participants ep
-            JOIN events e ON ep.event_id = e.id
-            WHERE ep.user_id = ? 
-            ORDER BY ep.joined_at DESC 
-            LIMIT ?
-        """, (user_id, limit // 2))
-        
-        for row in cursor.fetchall():
-            activities.append({
-                "id": f"participation_{row['id']}",
-                "type": "event_participated",
-                "title": f"Participated in: {row['title']}",
-                "description": row['description'][:100] + "..." if len(row['description']) > 100 else row['description'],
-                "date": row['joined_at'],
-                "impact_score": 20
-            })
-        
-        # Sort all activities by date
-        activities.sort(key=lambda x: x['date'], reverse=True)
-        
-        return activities[:limit]
+        return get_user_feed(user_id, limit)
         
     except Exception as e:
         logger.error(f"Error fetching user activities: {e}")
@@ -457,6 +359,8 @@ async def get_user_recommendations(user_id: int):
         """, (user_id,))
         
         profile = cursor.fetchone()
+        conn.close()
+        counts = get_user_counts(user_id)
         
         if profile:
             # Check profile completeness
@@ -485,10 +389,7 @@ async def get_user_recommendations(user_id: int):
                 })
         
         # Get project recommendations based on user's skills/interests
-        cursor.execute("SELECT COUNT(*) as count FROM projects WHERE created_by = ?", (user_id,))
-        projects_count = cursor.fetchone()['count']
-        
-        if projects_count == 0:
+        if counts['projects_created'] == 0:
             recommendations.append({
                 "id": 2,
                 "type": "project",
@@ -499,10 +400,7 @@ async def get_user_recommendations(user_id: int):
             })
         
         # Get event recommendations
-        cursor.execute("SELECT COUNT(*) as count FROM event_participants WHERE user_id = ?", (user_id,))
-        participations_count = cursor.fetchone()['count']
-        
-        if participations_count == 0:
+        if counts['events_participated'] == 0:
             recommendations.append({
                 "id": 3,
                 "type": "event",
@@ -538,12 +436,14 @@ async def get_user_networking_suggestions(user_id: int):
         
         suggestions = []
         
-        # Get user's location for local networking
+        # Location and skills for local and skill-based networking
         cursor.execute("""
-            SELECT location, state FROM unified_profiles WHERE user_id = ?
+            SELECT location, state, skills FROM unified_profiles WHERE user_id = ?
         """, (user_id,))
         
         profile = cursor.fetchone()
+        conn.close()
+        counts = get_user_counts(user_id)
         
         if profile and profile['location']:
             suggestions.append({
@@ -553,15 +453,9 @@ async def get_user_networking_suggestions(user_id: int):
                 "type": "local_networking"
             })
         
-        # Get user's skills for skill-based networking
-        cursor.execute("""
-            SELECT skills FROM unified_profiles WHERE user_id = ?
-        """, (user_id,))
-        
-        skills_row = cursor.fetchone()
-        if skills_row and skills_row['skills']:
+        if profile and profile['skills']:
             try:
-                skills = json.loads(skills_row['skills'])
+                skills = json.loads(profile['skills'])
                 if skills:
                     suggestions.append({
                         "id": 2,
@@ -572,10 +466,7 @@ async def get_user_networking_suggestions(user_id: int):
             except json.JSONDecodeError:
                 pass
         
-        # Get event participation count for suggestions
-        cursor.execute("SELECT COUNT(*) as count FROM event_participants WHERE user_id = ?", (user_id,))
-        participations_count = cursor.fetchone()['count']
-        
+        participations_count = counts['events_participated']
         if participations_count == 0:
             suggestions.append({
                 "id": 3,
@@ -591,11 +482,8 @@ async def get_user_networking_suggestions(user_id: int):
                 "type": "network_expansion"
             })
         
-        # Get projects count for collaboration suggestions
-        cursor.execute("SELECT COUNT(*) as count FROM projects WHERE created_by = ?", (user_id,))
-        projects_count = cursor.fetchone()['count']
-        
-        if projects_count == 0:
+        # Collaboration suggestions
+        if counts['projects_created'] == 0:
             suggestions.append({
                 "id": 5,
                 "title": "Start a collaborative project",
@@ -11,7 +11,7 @@ class YoutubeSummaryRequest(BaseModel):
 @router.post("/youtube-audio-summary")
 async def youtube_audio_summary(request: YoutubeSummaryRequest):
     try:
-        result = summarize_youtube_video(request.youtube_url, request.language)
+        result = await summarize_youtube_video(request.youtube_url, request.language)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
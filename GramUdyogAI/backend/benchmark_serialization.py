@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Compare the cost of turning list-endpoint rows into a JSON response body
+before and after the row mappers / FastJSONResponse change.
+
+For each table a temporary database is filled with synthetic rows, then the
+rows are serialized the old way (a dict literal with inline json.loads per
+row, FastAPI's jsonable_encoder and json.dumps; events also looked up the
+organizer name and social posts one event at a time) and the new way
+(services.row_mappers + core.fast_json.dumps). Both paths start from the same
+fetched rows, so the query itself is not measured.
+
+    python benchmark_serialization.py
+    python benchmark_serialization.py --rows 5000 --repeat 5
+
+Prints milliseconds per 1,000 rows for each path.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from core.fast_json import dumps, orjson
+from init_db import get_db, init_database, migrate_database_schema
+from services.events import get_user_name_by_id, serialize_events
+from services.row_mappers import (
+    COURSE_MAPPER, JOB_MAPPER, NOTIFICATION_MAPPER, PROJECT_MAPPER, VISUAL_SUMMARY_MAPPER,
+)
+
+WORDS = ("solar", "tailoring", "dairy", "welding", "python", "retail", "farming", "nursing", "driving", "excel")
+
+
+def words(count):
+    return " ".join(random.choice(WORDS) for _ in range(count))
+
+
+def tags(count):
+    return json.dumps(random.sample(WORDS, count))
+
+
+def timestamp(i):
+    return (datetime(2024, 1, 1) + timedelta(minutes=i)).isoformat()
+
+
+def populate(conn, rows):
+    now = datetime.now().isoformat()
+    conn.executemany(
+        "INSERT INTO users (phone, password_hash, user_type, name, created_at, updated_at) VALUES (?, 'x', 'individual', ?, ?, ?)",
+        [(f"9{i:09d}", f"User {i}", now, now) for i in range(50)]
+    )
+    conn.executemany('''
+        INSERT INTO job_postings (job_title, company_name, company, location, salary_range, description,
+            industry, sector, job_type, employment_type, experience_required, skills_required,
+            posted_date, tags, is_active, created_at, apply_url)
+        VALUES (?, ?, ?, ?, '10000-15000', ?, 'Retail', 'Services', 'Full-time', 'Permanent', '0-2', ?, ?, ?, 1, ?, ?)
+    ''', [
+        (f"{words(2)} associate", "Acme", "Acme", "Pune, Maharashtra", words(60), tags(4),
+         timestamp(i), tags(3), timestamp(i), f"https://example.com/jobs/{i}")
+        for i in range(rows)
+    ])
+    conn.executemany('''
+        INSERT INTO courses (name, link, category, description, tags, created_at)
+        VALUES (?, ?, 'Agriculture', ?, ?, ?)
+    ''', [(words(3), f"https://example.com/courses/{i}", words(40), tags(4), timestamp(i)) for i in range(rows)])
+    conn.executemany('''
+        INSERT INTO events (title, description, event_type, category, location, state, start_date, end_date,
+            max_participants, organizer_id, organizer_type, created_by, skills_required, tags, status,
+            marketing_highlights, sections, created_at, updated_at)
+        VALUES (?, ?, 'workshop', 'Skills', 'Pune', 'Maharashtra', ?, ?, 100, ?, 'individual', ?, ?, ?, 'active',
+            ?, ?, ?, ?)
+    ''', [
+        (words(3), words(60), timestamp(i), timestamp(i + 60), i % 50 + 1, i % 50 + 1, tags(3), tags(3),
+         json.dumps([words(8), words(8)]), json.dumps([{"title": words(2), "content": words(30)}]),
+         timestamp(i), timestamp(i))
+        for i in range(rows)
+    ])
+    conn.executemany('''
+        INSERT INTO social_media_posts (event_id, platform, content, scheduled_at, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [
+        (i // 2 + 1, random.choice(("twitter", "linkedin")), words(25), timestamp(i), now)
+        for i in range(rows * 2)
+    ])
+    conn.executemany('''
+        INSERT INTO projects (title, description, category, event_id, event_name, event_type, team_members,
+            technologies, location, state, created_by, created_at, tags)
+        VALUES (?, ?, 'Agriculture', 1, 'Expo', 'workshop', ?, ?, 'Pune', 'Maharashtra', ?, ?, ?)
+    ''', [
+        (words(3), words(60), json.dumps([{"name": f"User {i}", "role": "Lead"}]), tags(3), i % 50 + 1,
+         timestamp(i), tags(3))
+        for i in range(rows)
+    ])
+    conn.executemany('''
+        INSERT INTO notifications (user_id, title, message, notification_type, related_id, metadata)
+        VALUES (1, ?, ?, 'team_invite', ?, ?)
+    ''', [(words(4), words(20), i, json.dumps({"project_id": i, "role": "member"})) for i in range(rows)])
+    conn.executemany(
+        "INSERT INTO visual_summaries (topic, summary_data) VALUES (?, ?)",
+        [(words(2), json.dumps({
+            "title": words(4),
+            "sections": [{"heading": words(3), "text": words(40), "image_prompt": words(10)} for _ in range(4)]
+        })) for _ in range(rows)]
+    )
+    conn.commit()
+
+
+# The per-row code the list endpoints used before the mappers
+
+def legacy_job(job):
+    return {
+        "id": job["id"],
+        "job_title": job["job_title"] or job["title"],
+        "company_name": job["company"] if job["company"] else "",
+        "location": job["location"],
+        "salary_range": job["salary_range"] or job["pay"] or "",
+        "description": job["description"],
+        "industry": job["industry"],
+        "sector": job["sector"],
+        "job_type": job["job_type"],
+        "employment_type": job["employment_type"],
+        "experience_required": job["experience_required"],
+        "skills_required": json.loads(job["skills_required"]) if job["skills_required"] else [],
+        "posted_date": job["posted_date"],
+        "application_deadline": job["application_deadline"],
+        "tags": json.loads(job["tags"]) if job["tags"] else [],
+        "source": job["source"],
+        "is_active": job["is_active"],
+        "created_at": job["created_at"],
+        "apply_url": job["apply_url"],
+        "title": job["job_title"] or job["title"],
+        "company": job["company"] if job["company"] else "",
+        "company_contact": job["company_contact"] if job["company_contact"] else "",
+        "pay": job["salary_range"] or job["pay"] or ""
+    }
+
+
+def legacy_course(course):
+    return {
+        "id": course['id'],
+        "name": course['name'],
+        "link": course['link'],
+        "category": course['category'],
+        "skill_level": course['skill_level'],
+        "duration": course['duration'],
+        "provider": course['provider'],
+        "description": course['description'],
+        "tags": json.loads(course['tags'] or '[]'),
+        "source": course['source'],
+        "is_active": bool(course['is_active']),
+        "created_at": course['created_at'],
+    }
+
+
+def legacy_project(row):
+    return {
+        "id": row['id'],
+        "title": row['title'],
+        "description": row['description'],
+        "category": row['category'],
+        "event_id": row['event_id'],
+        "event_name": row['event_name'],
+        "event_type": row['event_type'],
+        "team_members": json.loads(row['team_members'] or '[]'),
+        "technologies": json.loads(row['technologies'] or '[]'),
+        "impact_metrics": json.loads(row['impact_metrics'] or '{}'),
+        "funding_status": row['funding_status'],
+        "funding_amount": row['funding_amount'],
+        "funding_goal": row['funding_goal'],
+        "location": row['location'],
+        "state": row['state'],
+        "created_by": row['created_by'],
+        "created_at": row['created_at'],
+        "completed_at": row['completed_at'],
+        "status": row['status'],
+        "media": json.loads(row['media'] or '{"images": [], "videos": []}'),
+        "testimonials": json.loads(row['testimonials'] or '[]'),
+        "awards": json.loads(row['awards'] or '[]'),
+        "tags": json.loads(row['tags'] or '[]')
+    }
+
+
+def legacy_events(cursor, rows):
+    events = []
+    for row in rows:
+        def safe_json_loads(data, default=None):
+            if data is None:
+                return default
+            try:
+                if isinstance(data, str):
+                    return json.loads(data)
+                elif isinstance(data, (list, dict)):
+                    return data
+                else:
+                    return default
+            except (json.JSONDecodeError, TypeError):
+                return default
+
+        event = {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "event_type": row["event_type"],
+            "category": row["category"],
+            "location": row["location"],
+            "state": row["state"],
+            "start_date": row["start_date"],
+            "end_date": row["end_date"],
+            "max_participants": row["max_participants"],
+            "current_participants": row["current_participants"],
+            "budget": row["budget"],
+            "prize_pool": row["prize_pool"],
+            "organizer": {
+                "id": row["organizer_id"],
+                "type": row["organizer_type"],
+                "name": get_user_name_by_id(row["organizer_id"])
+            },
+            "skills_required": safe_json_loads(row["skills_required"], []),
+            "tags": safe_json_loads(row["tags"], []),
+            "status": row["status"],
+            "impact_metrics": safe_json_loads(row["impact_metrics"], {
+                "participants_target": 0,
+                "skills_developed": 0,
+                "projects_created": 0,
+                "employment_generated": 0
+            }),
+            "marketing_highlights": safe_json_loads(row["marketing_highlights"], []),
+            "success_metrics": safe_json_loads(row["success_metrics"], []),
+            "sections": safe_json_loads(row["sections"], []),
+            "social_media_posts": [],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+        cursor.execute("SELECT * FROM social_media_posts WHERE event_id = ?", (event["id"],))
+        event["social_media_posts"] = [
+            {
+                "id": post["id"],
+                "platform": post["platform"],
+                "content": post["content"],
+                "image_url": post["image_url"],
+                "scheduled_at": post["scheduled_at"],
+                "status": post["status"]
+            }
+            for post in cursor.fetchall()
+        ]
+        events.append(event)
+    return events
+
+
+def legacy_notification(n):
+    return {
+        "id": n["id"],
+        "title": n["title"],
+        "message": n["message"],
+        "notification_type": n["notification_type"],
+        "related_id": n["related_id"],
+        "related_type": n["related_type"],
+        "event_id": n["event_id"],
+        "project_id": n["project_id"],
+        "metadata": json.loads(n["metadata"]) if n["metadata"] else None,
+        "is_read": bool(n["is_read"]),
+        "created_at": n["created_at"],
+        "updated_at": n["updated_at"]
+    }
+
+
+class VisualSummaryDB(BaseModel):
+    id: int
+    topic: str
+    summary_data: dict
+    created_at: str
+
+
+def legacy_visual_summary(row):
+    return VisualSummaryDB(id=row[0], topic=row[1], summary_data=json.loads(row[2]), created_at=row[3])
+
+
+def legacy_render(content):
+    """What FastAPI did with a returned list/dict: jsonable_encoder, then JSONResponse.render"""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+# (name, query, old body builder, new body builder); builders take (cursor, rows)
+CASES = [
+    ("jobs", "SELECT * FROM job_postings",
+     lambda cursor, rows: legacy_render({"jobs": [legacy_job(row) for row in rows]}),
+     lambda cursor, rows: dumps({"jobs": JOB_MAPPER.many(rows)})),
+    ("courses", "SELECT * FROM courses",
+     lambda cursor, rows: legacy_render({"courses": [legacy_course(row) for row in rows]}),
+     lambda cursor, rows: dumps({"courses": COURSE_MAPPER.many(rows)})),
+    ("events", "SELECT * FROM events",
+     lambda cursor, rows: legacy_render(legacy_events(cursor, rows)),
+     lambda cursor, rows: dumps(serialize_events(cursor, rows))),
+    ("projects", "SELECT * FROM projects",
+     lambda cursor, rows: legacy_render([legacy_project(row) for row in rows]),
+     lambda cursor, rows: dumps(PROJECT_MAPPER.many(rows))),
+    ("notifications", "SELECT * FROM notifications",
+     lambda cursor, rows: legacy_render([legacy_notification(row) for row in rows]),
+     lambda cursor, rows: dumps(NOTIFICATION_MAPPER.many(rows))),
+    ("visual summaries", "SELECT id, topic, summary_data, created_at FROM visual_summaries",
+     lambda cursor, rows: legacy_render([legacy_visual_summary(row) for row in rows]),
+     lambda cursor, rows: dumps(VISUAL_SUMMARY_MAPPER.many(rows))),
+]
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="rows per table (default 2000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path, best is reported (default 3)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # init_db always opens gramudyogai.db in the working directory
+        try:
+            init_database()
+            migrate_database_schema()
+            conn = get_db()
+            populate(conn, args.rows)
+
+            print(f"{args.rows} rows per table, encoder: {'orjson' if orjson else 'json (orjson not installed)'}")
+            print(f"{'endpoint':<18}{'before ms/1k':>14}{'after ms/1k':>14}{'speedup':>10}")
+            for name, query, before, after in CASES:
+                cursor = conn.cursor()
+                rows = cursor.execute(query).fetchall()
+                old = best_of(args.repeat, lambda: before(cursor, rows))
+                new = best_of(args.repeat, lambda: after(cursor, rows))
+                per_1k = 1000 * 1000 / len(rows)
+                print(f"{name:<18}{old * per_1k:>14.1f}{new * per_1k:>14.1f}{old / new:>9.1f}x")
+            conn.close()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
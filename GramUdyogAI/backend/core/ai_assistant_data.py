@@ -6,7 +6,8 @@ import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from init_db import get_db
-from api.routes_events import get_user_name_by_id
+from services.events import serialize_events
+from services.row_mappers import parse_json
 from init_db import get_db
 async def get_recent_events(args: str, limit: int = 5) -> List[Dict[str, Any]]:
     """Get recent events based on user query"""
@@ -32,15 +33,6 @@ async def get_recent_events(args: str, limit: int = 5) -> List[Dict[str, Any]]:
         
         events = []
         for row in events_data:
-            # Safe JSON parsing
-            def safe_json_loads(data, default=None):
-                if data is None:
-                    return default
-                try:
-                    return json.loads(data) if isinstance(data, str) else data
-                except:
-                    return default
-            
             event = {
                 "id": row["id"],
                 "title": row["title"],
@@ -81,14 +73,6 @@ async def get_featured_projects(args: str, limit: int = 5) -> List[Dict[str, Any
         
         projects = []
         for row in projects_data:
-            def safe_json_loads(data, default=None):
-                if data is None:
-                    return default
-                try:
-                    return json.loads(data) if isinstance(data, str) else data
-                except:
-                    return default
-            
             project = {
                 "id": row["id"],
                 "title": row["title"],
@@ -96,7 +80,7 @@ async def get_featured_projects(args: str, limit: int = 5) -> List[Dict[str, Any
                 "creator": "Project Team",  # Could be enhanced with actual creator data
                 "status": row["status"],  # status
                 "investment_needed": row["funding_status"] if row["funding_status"] else "Not specified",  # funding_status
-                "tags": safe_json_loads(row["technologies"], []),  # technologies
+                "tags": parse_json(row["technologies"], []),  # technologies
             }
             projects.append(project)
         
@@ -171,15 +155,6 @@ async def get_user_profile_summary(user_id: Optional[int] = None) -> Dict[str, A
                 "achievements": []
             }
         
-        # Parse skills
-        def safe_json_loads(data, default=None):
-            if data is None:
-                return default
-            try:
-                return json.loads(data) if isinstance(data, str) else data
-            except:
-                return default
-        
         # Get achievements
         cursor.execute("SELECT title FROM achievements WHERE user_id = ? ORDER BY date DESC LIMIT 5", (user_id,))
         achievements_data = cursor.fetchall()
@@ -189,7 +164,7 @@ async def get_user_profile_summary(user_id: Optional[int] = None) -> Dict[str, A
             "name": profile_data["name"],  # name
             "experience": profile_data["experience"],  # experience
             "goals": profile_data["goals"],  # goals
-            "skills": safe_json_loads(profile_data["skills"], []),  # skills
+            "skills": parse_json(profile_data["skills"], []),  # skills
             "achievements": achievements
         }
     except Exception as e:
@@ -215,69 +190,7 @@ async def get_event_by_id(event_id: int):
             print("Event not found")
             return None
         
-        # Safe JSON parsing function
-        def safe_json_loads(data, default=None):
-            if data is None:
-                return default
-            try:
-                if isinstance(data, str):
-                    return json.loads(data)
-                elif isinstance(data, (list, dict)):
-                    return data
-                else:
-                    return default
-            except (json.JSONDecodeError, TypeError):
-                return default
-
-        event = {
-            "id": row["id"],
-            "title": row["title"],
-            "description": row["description"],
-            "event_type": row["event_type"],
-            "category": row["category"],
-            "location": row["location"],
-            "state": row["state"],
-            "start_date": row["start_date"],
-            "end_date": row["end_date"],
-            "max_participants": row["max_participants"],
-            "current_participants": row["current_participants"],
-            "budget": row["budget"],
-            "prize_pool": row["prize_pool"],
-            "organizer": {
-                "id": row["organizer_id"],
-                "type": row["organizer_type"],
-                "name": get_user_name_by_id(row["organizer_id"])
-            },
-            "skills_required": safe_json_loads(row["skills_required"], []),
-            "tags": safe_json_loads(row["tags"], []),
-            "status": row["status"],
-            "impact_metrics": safe_json_loads(row["impact_metrics"], {
-                "participants_target": 0,
-                "skills_developed": 0,
-                "projects_created": 0,
-                "employment_generated": 0
-            }),
-            "marketing_highlights": safe_json_loads(row["marketing_highlights"], []),
-            "success_metrics": safe_json_loads(row["success_metrics"], []),
-            "sections": safe_json_loads(row["sections"], []),
-            "social_media_posts": [],
-            "created_at": row["created_at"],
-            "updated_at": row["updated_at"]
-        }
-        # Fetch social media posts
-        cursor.execute("SELECT * FROM social_media_posts WHERE event_id = ?", (event_id,))
-        posts_data = cursor.fetchall()
-        event["social_media_posts"] = [
-            {
-                "id": post[0],
-                "platform": post[2],
-                "content": post[3],
-                "image_url": post[4],
-                "scheduled_at": post[5],
-                "status": post[6]
-            }
-            for post in posts_data
-        ]
+        event = serialize_events(cursor, [row])[0]
         
         conn.close()
         return event
@@ -317,74 +230,7 @@ async def get_events(
         cursor.execute(query, params)
         events_data = cursor.fetchall()
         
-        events = []
-        for row in events_data:
-            # Safe JSON parsing function
-            def safe_json_loads(data, default=None):
-                if data is None:
-                    return default
-                try:
-                    if isinstance(data, str):
-                        return json.loads(data)
-                    elif isinstance(data, (list, dict)):
-                        return data
-                    else:
-                        return default
-                except (json.JSONDecodeError, TypeError):
-                    return default
-
-            event = {
-                "id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "event_type": row[3],
-                "category": row[4],
-                "location": row[5],
-                "state": row[6],
-                "start_date": row[7],
-                "end_date": row[8],
-                "max_participants": row[9],
-                "current_participants": row[10],
-                "budget": row[11],
-                "prize_pool": row[12],
-                "organizer": {
-                    "id": row[13],
-                    "type": row[14],
-                    "name": get_user_name_by_id(row[13])
-                },
-                "skills_required": safe_json_loads(row[16], []),
-                "tags": safe_json_loads(row[17], []),
-                "status": row[18],
-                "impact_metrics": safe_json_loads(row[19], {
-                    "participants_target": 0,
-                    "skills_developed": 0,
-                    "projects_created": 0,
-                    "employment_generated": 0
-                }),
-                "marketing_highlights": safe_json_loads(row[20], []),
-                "success_metrics": safe_json_loads(row[21], []),
-                "sections": safe_json_loads(row[22], []),
-                "social_media_posts": [],
-                "created_at": row[23],
-                "updated_at": row[24]
-            }
-            
-            # Fetch social media posts for this event
-            cursor.execute("SELECT * FROM social_media_posts WHERE event_id = ?", (event["id"],))
-            posts_data = cursor.fetchall()
-            event["social_media_posts"] = [
-                {
-                    "id": post["id"],
-                    "platform": post["platform"],
-                    "content": post["content"],
-                    "image_url": post["image_url"],
-                    "scheduled_at": post["scheduled_at"],
-                    "status": post["status"]
-                }
-                for post in posts_data
-            ]
-            
-            events.append(event)
+        events = serialize_events(cursor, events_data)
         
         conn.close()
         return events
@@ -401,18 +247,6 @@ async def search_projects(query: str, limit: int = 10):
         like_query = f"%{query}%"
         cursor.execute(sql, (like_query, like_query, like_query, limit))
         projects_data = cursor.fetchall()
-        def safe_json_loads(data, default=None):
-            if data is None:
-                return default
-            try:
-                if isinstance(data, str):
-                    return json.loads(data)
-                elif isinstance(data, (list, dict)):
-                    return data
-                else:
-                    return default
-            except (json.JSONDecodeError, TypeError):
-                return default
         projects = []
         for row in projects_data:
             project = {
@@ -423,9 +257,9 @@ async def search_projects(query: str, limit: int = 10):
                 "event_id": row["event_id"],
                 "event_name": row["event_name"],
                 "event_type": row["event_type"],
-                "team_members": safe_json_loads(row["team_members"], []),
-                "technologies": safe_json_loads(row["technologies"], []),
-                "impact_metrics": safe_json_loads(row["impact_metrics"], {}),
+                "team_members": parse_json(row["team_members"], []),
+                "technologies": parse_json(row["technologies"], []),
+                "impact_metrics": parse_json(row["impact_metrics"], {}),
                 "funding_status": row["funding_status"],
                 "funding_amount": row["funding_amount"],
                 "funding_goal": row["funding_goal"],
@@ -435,10 +269,10 @@ async def search_projects(query: str, limit: int = 10):
                 "created_at": row["created_at"],
                 "completed_at": row["completed_at"],
                 "status": row["status"],
-                "media": safe_json_loads(row["media"], {}),
-                "testimonials": safe_json_loads(row["testimonials"], []),
-                "awards": safe_json_loads(row["awards"], []),
-                "tags": safe_json_loads(row["tags"], [])
+                "media": parse_json(row["media"], {}),
+                "testimonials": parse_json(row["testimonials"], []),
+                "awards": parse_json(row["awards"], []),
+                "tags": parse_json(row["tags"], [])
             }
             projects.append(project)
         conn.close()
@@ -657,15 +491,10 @@ async def recommend_job(user_info: UserInfo):
         print(f"Error in smart job recommendation: {e}")
         # Fallback to the original recommendation logic
         try:
-            from core.job_recommender import get_all_job_names, get_relevant_jobs, load_selected_jobs, find_best_job
-            all_job_names = await get_all_job_names()
-            relevant_job_names = await get_relevant_jobs(user_info.user_info, all_job_names)
-            print('Got relevant job names:', relevant_job_names)
-            relevant_jobs = await load_selected_jobs(relevant_job_names.get('relevant_jobs', []) if isinstance(relevant_job_names, dict) else relevant_job_names)
-            best_job = await find_best_job(user_info.user_info, relevant_jobs)
-            print(best_job)
-            if best_job:
-                return [best_job]
+            from core.job_recommender import recommend_jobs
+            jobs = await recommend_jobs(user_info.user_info)
+            if jobs:
+                return jobs
             else:
                 return await get_jobs(limit=5)
         except Exception as fallback_error:
@@ -709,7 +538,7 @@ class YoutubeSummaryRequest(BaseModel):
 async def youtube_audio_summary(request: YoutubeSummaryRequest):
     try:
         from core.youtube_summary import summarize_youtube_video
-        result = summarize_youtube_video(request.youtube_url, request.language)
+        result = await summarize_youtube_video(request.youtube_url, request.language)
         return result
     except Exception as e:
         print(f"Error summarizing YouTube video: {e}")
@@ -728,13 +557,6 @@ async def get_profile(user_id: Optional[int] = None) -> Dict[str, Any]:
         profile_data = cursor.fetchone()
         if not profile_data:
             return await get_user_profile_summary()
-        def safe_json_loads(data, default=None):
-            if data is None:
-                return default
-            try:
-                return json.loads(data) if isinstance(data, str) else data
-            except:
-                return default
         return {
             "user_id": profile_data["user_id"],
             "user_type": profile_data["user_type"],
@@ -742,14 +564,14 @@ async def get_profile(user_id: Optional[int] = None) -> Dict[str, Any]:
             "organization": profile_data["organization"],
             "location": profile_data["location"],
             "state": profile_data["state"],
-            "skills": safe_json_loads(profile_data["skills"], []),
+            "skills": parse_json(profile_data["skills"], []),
             "experience": profile_data["experience"],
             "goals": profile_data["goals"],
-            "impact_metrics": safe_json_loads(profile_data["impact_metrics"], {}),
-            "achievements": safe_json_loads(profile_data["achievements"], []),
-            "recent_activities": safe_json_loads(profile_data["recent_activities"], []),
-            "recommendations": safe_json_loads(profile_data["recommendations"], []),
-            "networking_suggestions": safe_json_loads(profile_data["networking_suggestions"], []),
+            "impact_metrics": parse_json(profile_data["impact_metrics"], {}),
+            "achievements": parse_json(profile_data["achievements"], []),
+            "recent_activities": parse_json(profile_data["recent_activities"], []),
+            "recommendations": parse_json(profile_data["recommendations"], []),
+            "networking_suggestions": parse_json(profile_data["networking_suggestions"], []),
             "created_at": profile_data["created_at"],
             "updated_at": profile_data["updated_at"],
         }
@@ -1123,267 +945,10 @@ async def enhanced_fallback_recommendation(query: str, courses_context: list):
         "search_method": "Enhanced keyword matching with semantic grouping"
     }
 
-from api.routes_jobs import analyze_user_intent_with_ai, get_jobs_based_on_ai_analysis, score_jobs_with_ai, format_job_response
+from api.routes_jobs import run_smart_recommendation
 async def smart_recommend_job(user_info: UserInfo):
     """
-    AI-powered smart job recommendation using Llama model via Groq
-    """
-    try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        user_text = user_info.user_info.lower()
-        
-        # Step 1: Use AI to analyze user intent and extract key information
-        intent_analysis = await analyze_user_intent_with_ai(user_text)
-        
-        # Step 2: Get relevant jobs based on AI analysis
-        jobs = await get_jobs_based_on_ai_analysis(cursor, intent_analysis, user_text)
-        
-        if not jobs:
-            conn.close()
-            return {"best_job": None, "alternative_jobs": [], "message": "No relevant jobs found. Please try a different search."}
-        
-        # Step 3: Use AI to score and rank jobs
-        scored_jobs = await score_jobs_with_ai(jobs, user_text, intent_analysis)
-        
-        conn.close()
-        
-        if not scored_jobs:
-            return {"best_job": None, "alternative_jobs": [], "message": "No relevant jobs found. Please try a different search."}
-
-        # Format the best job and alternatives
-        best_job_formatted = format_job_response(scored_jobs[0][1], scored_jobs[0][0])
-        alternative_jobs_formatted = [
-            format_job_response(job_data[1], job_data[0]) for job_data in scored_jobs[1:6]
-        ]
-        stuff =  {
-            "best_job": best_job_formatted,
-            "alternative_jobs": alternative_jobs_formatted,
-            "ai_analysis": intent_analysis
-        }
-        print(stuff)
-        return stuff
-        
-    except Exception as e:
-        print(f"Error in AI-powered recommendation: {str(e)}")
-        # Fallback to the original smart recommendation
-        return await smart_recommend_job_fallback(user_info)
-
-
-async def smart_recommend_job_fallback(user_info: UserInfo):
-    """
-    Fallback to original smart recommendation if AI fails
+    Job recommendation for the assistant: the same local ranking, with LLM
+    explanations of the picks, as /recommend-job-smart
     """
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    user_text = user_info.user_info.lower()
-    
-    # Add delivery/logistics to skill categories
-    skill_keywords = {
-        'delivery': ['delivery', 'driver', 'courier', 'logistics', 'transport', 'fleet', 'dispatch', 'shipping', 'swiggy', 'zomato', 'dunzo'],
-        'software': ['software', 'developer', 'programming', 'coding', 'python', 'java', 'javascript', 'react', 'node', 'web', 'app', 'frontend', 'backend', 'fullstack', 'mobile', 'android', 'ios'],
-        'sales': ['sales', 'marketing', 'business', 'customer', 'client', 'revenue', 'target', 'account', 'relationship', 'telesales'],
-        'healthcare': ['nurse', 'doctor', 'medical', 'healthcare', 'hospital', 'clinic', 'patient', 'pharmacy', 'therapy'],
-        'education': ['teacher', 'education', 'tutor', 'instructor', 'training', 'academic', 'professor', 'coach', 'school'],
-        'engineering': ['engineer', 'technical', 'mechanical', 'civil', 'electrical', 'design', 'manufacturing', 'quality'],
-        'finance': ['finance', 'accounting', 'bank', 'investment', 'analyst', 'financial', 'audit', 'tax', 'insurance', 'advisor'],
-        'management': ['manager', 'management', 'supervisor', 'lead', 'director', 'coordinator', 'admin', 'executive'],
-        'operations': ['operations', 'logistics', 'supply', 'warehouse', 'procurement', 'planning'],
-        'design': ['design', 'creative', 'graphics', 'ui', 'ux', 'visual', 'artist', 'architect'],
-        'hospitality': ['hotel', 'restaurant', 'hospitality', 'chef', 'food', 'service', 'tourism'],
-        'manufacturing': ['manufacturing', 'production', 'factory', 'assembly', 'quality', 'maintenance'],
-        'retail': ['retail', 'store', 'cashier', 'merchandise', 'inventory', 'shop'],
-        'analyst': ['analyst', 'research', 'data', 'insights']
-    }
-    
-    # Score jobs based on user input - improved algorithm
-    user_skills = []
-    user_categories = []
-    
-    # Extract keywords from user query
-    user_words = [word for word in user_text.split() if len(word) > 2 and word not in ['the', 'and', 'for', 'job', 'work', 'looking', 'want', 'i']]
-
-    for category, keywords in skill_keywords.items():
-        matches = sum(1 for keyword in keywords if keyword in user_words)
-        if matches > 0:
-            user_skills.extend([kw for kw in keywords if kw in user_words])
-            user_categories.append(category)
-
-    # If no categories matched, use the user's words as skills
-    if not user_skills:
-        user_skills.extend(user_words)
-
-    # Extract experience level with better detection
-    experience_level = "0"
-    if any(word in user_text for word in ['senior', 'experienced', '5+', 'five', 'lead', 'principal', 'expert']):
-        experience_level = "60"
-    elif any(word in user_text for word in ['mid', 'intermediate', '2-5', 'few years', '3 year', '4 year']):
-        experience_level = "24"
-    elif any(word in user_text for word in ['junior', 'fresher', 'entry', 'new', 'graduate', 'beginner']):
-        experience_level = "0"
-    
-    # Build diversified query based on user input
-    if user_skills:
-        # Create a comprehensive search that includes direct keyword matching
-        skill_conditions = []
-        
-        # Add skill-based conditions
-        for skill in set(user_skills): # Use set to avoid duplicate conditions
-            skill_conditions.append(f"(job_title LIKE '%{skill}%' OR description LIKE '%{skill}%' OR industry LIKE '%{skill}%' OR tags LIKE '%{skill}%')")
-        
-        if skill_conditions:
-            query = f"""
-                SELECT id, job_title, company_name, location, salary_range, description,
-                       industry, sector, job_type, employment_type, experience_required, 
-                       skills_required, posted_date, application_deadline, tags, source, 
-                       is_active, created_at, title, company, company_contact, pay, apply_url,
-                       -- Scoring for relevance
-                       (CASE 
-                            WHEN experience_required <= ? THEN 3
-                            WHEN experience_required <= ? THEN 2 
-                            ELSE 1 
-                       END) as exp_score
-                FROM job_postings 
-                WHERE is_active = 1 
-                AND ({' OR '.join(skill_conditions)})
-                ORDER BY exp_score DESC, created_at DESC
-                LIMIT 30
-            """
-            params = [experience_level, str(int(experience_level) + 24)]
-        else:
-            # Fallback to general search if no skill conditions were generated
-            query = """
-                SELECT id, job_title, company_name, location, salary_range, description,
-                       industry, sector, job_type, employment_type, experience_required, 
-                       skills_required, posted_date, application_deadline, tags, source, 
-                       is_active, created_at, title, company, company_contact, pay, apply_url,
-                       1 as exp_score
-                FROM job_postings 
-                WHERE is_active = 1
-                ORDER BY created_at DESC 
-                LIMIT 15
-            """
-            params = []
-        
-    else:
-        # Default query for diverse recent jobs when no specific input
-        query = """
-            SELECT id, job_title, company_name, location, salary_range, description,
-                   industry, sector, job_type, employment_type, experience_required, 
-                   skills_required, posted_date, application_deadline, tags, source, 
-                   is_active, created_at, title, company, company_contact, pay, apply_url,
-                   1 as exp_score
-            FROM job_postings 
-            WHERE is_active = 1
-            AND industry IS NOT NULL
-            ORDER BY 
-                CASE 
-                    WHEN industry IN ('Information Technology', 'Software', 'Healthcare', 'Education', 'Finance') THEN 1
-                    ELSE 0
-                END DESC,
-                created_at DESC 
-            LIMIT 15
-        """
-        params = []
-    
-    cursor.execute(query, params)
-    jobs = cursor.fetchall()
-    conn.close()
-    
-    if jobs:
-        # Score and rank jobs based on relevance with diversity
-        scored_jobs = []
-        for job in jobs:
-            score = 0
-            # Use string keys for dict-like access, with safety for both Row and dict types
-            def safe_get(j, key):
-                if isinstance(j, dict):
-                    return j.get(key, "")
-                try:
-                    return j[key]
-                except (KeyError, IndexError, TypeError):
-                    return ""
-            job_title_lower = (safe_get(job, "job_title") or safe_get(job, "title") or "").lower()
-            description_lower = (safe_get(job, "description") or "").lower()
-            industry_lower = (safe_get(job, "industry") or "").lower()
-            tags_lower = (safe_get(job, "tags") or "").lower()
-            job_text = f"{job_title_lower} {description_lower} {industry_lower} {tags_lower}"
-            
-            # Direct exact phrase matching gets highest score
-            if user_text in job_text:
-                score += 20
-            
-            # Score based on individual user input keywords
-            for word in user_words:
-                if word in job_text:
-                    score += 5
-            
-            # Boost for exact job title matches
-            if any(word in job_title_lower for word in user_words):
-                score += 10
-
-            # Boost for matching category keywords
-            for cat in user_categories:
-                for keyword in skill_keywords.get(cat, []):
-                    if keyword in job_text:
-                        score += 2
-            
-            # Negative score for mismatches
-            if "analyst" in user_categories and "delivery" in job_title_lower:
-                score -= 10
-            if "delivery" in user_categories and "analyst" in job_title_lower:
-                score -= 10
-
-            scored_jobs.append((score, job))
-        
-        # Sort by score and get best jobs
-        scored_jobs.sort(key=lambda x: x[0], reverse=True)
-        
-        # Remove duplicates by job_title and company_name
-        seen_jobs = set()
-        unique_scored_jobs = []
-        for score, job in scored_jobs:
-            # Use string keys if possible, fallback to index if not a dict
-            if isinstance(job, dict):
-                job_title = job.get("job_title") or job.get("title")
-                company_name = job.get("company_name") or job.get("company")
-            else:
-                # Fallback for Row or tuple-like
-                try:
-                    job_title = job["job_title"] if "job_title" in job.keys() else job["title"]
-                except Exception:
-                    job_title = job[1] if len(job) > 1 else (job[18] if len(job) > 18 else None)
-                try:
-                    company_name = job["company_name"] if "company_name" in job.keys() else job["company"]
-                except Exception:
-                    company_name = job[2] if len(job) > 2 else (job[19] if len(job) > 19 else None)
-            job_key = (job_title, company_name)
-            if job_key not in seen_jobs:
-                seen_jobs.add(job_key)
-                unique_scored_jobs.append((score, job))
-        
-        # Filter out jobs with a score of 0 unless we have very few results
-        final_jobs = [job for score, job in unique_scored_jobs if score > 0]
-        if len(final_jobs) < 5:
-             final_jobs = [job for score, job in unique_scored_jobs][:10]
-
-
-        if not final_jobs:
-            return {"best_job": None, "alternative_jobs": [], "message": "No relevant jobs found. Please try a different search."}
-
-        best_job_data = unique_scored_jobs[0]
-        best_job_formatted = format_job_response(best_job_data[1], best_job_data[0])
-
-        alternative_jobs_formatted = [
-            format_job_response(job_data[1], job_data[0]) for job_data in unique_scored_jobs[1:6]
-        ]
-        
-        return {
-            "best_job": best_job_formatted,
-            "alternative_jobs": alternative_jobs_formatted
-        }
-    else:
-        return {"best_job": None, "alternative_jobs": [], "message": "No matching jobs found. Try different keywords or check back later for new opportunities."}
-
+    return await run_smart_recommendation(user_info)
@@ -1,22 +1,73 @@
 import io
 import json
+import re
+import struct
+import asyncio
 import requests
 import os
 import pathlib
 import hashlib
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 import numpy as np
 from scipy.io.wavfile import write as scipy_wav_write
 from dotenv import load_dotenv, find_dotenv
+from core.metrics import track_upstream
 
 # Load environment variables
 load_dotenv(find_dotenv())
 
+# Sentence terminators for Latin and Indic scripts (danda / double danda)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?\u0964\u0965])\s+')
+MAX_CHUNK_CHARS = 240
+
+def split_text_for_tts(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Split text into sentence-sized pieces no longer than max_chars"""
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        # Hard-wrap very long sentences on word boundaries
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+def wav_stream_header(sampling_rate: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """WAV header for a stream of unknown length (sizes set to the maximum)"""
+    byte_rate = sampling_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sampling_rate, byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+def to_pcm16(raw_audio: np.ndarray) -> bytes:
+    """Encode float32 samples in [-1, 1] as little-endian 16-bit PCM"""
+    return (np.clip(raw_audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
 class TextToSpeech:
     def __init__(self):
         self.url = "https://infer.e2enetworks.net/project/p-5485/v1/indic_tts/infer"
         self.default_sampling_rate = 22050
         self.token = os.getenv("E2E_TIR_ACCESS_TOKEN")
+        # Reuse one keep-alive connection pool across requests
+        self.session = requests.Session()
         
         # Handle missing token gracefully
         if not self.token:
@@ -68,9 +119,55 @@ class TextToSpeech:
             'content-type': 'application/json'
         }
 
+    def synthesize(self, text: str, speaker: str = "male", language: str = "en") -> np.ndarray:
+        """Call the TTS API and return the raw float32 samples"""
+        if not self.token:
+            raise Exception("Audio generation disabled - E2E_TIR_ACCESS_TOKEN not set")
+
+        payload = json.dumps(self._create_payload(text, speaker, language))
+        with track_upstream("tts", "synthesize"):
+            response = self.session.post(self.url, headers=self._get_headers(), data=payload)
+
+            if response.status_code != 200:
+                error_msg = f"API request failed with status {response.status_code}: {response.text}"
+                print(error_msg)
+                raise Exception(error_msg)
+
+        audio_arr = json.loads(response.text)["outputs"][0]["data"]
+        return np.array(audio_arr, dtype=np.float32)
+
+    async def stream_audio(self, text: str, speaker: str = "male", language: str = "en",
+                           max_in_flight: int = 3) -> AsyncIterator[bytes]:
+        """
+        Stream a WAV file while it is being synthesized.
+        The text is split into sentence-sized chunks which are synthesized
+        concurrently (up to max_in_flight at a time) and emitted in order as
+        soon as each one is ready, so playback can start after the first chunk.
+        """
+        chunks = split_text_for_tts(text)
+        yield wav_stream_header(self.default_sampling_rate)
+        if not chunks:
+            return
+
+        pending = []
+        next_chunk = 0
+        try:
+            while next_chunk < len(chunks) or pending:
+                # Keep the pipeline full
+                while next_chunk < len(chunks) and len(pending) < max_in_flight:
+                    pending.append(asyncio.create_task(
+                        asyncio.to_thread(self.synthesize, chunks[next_chunk], speaker, language)
+                    ))
+                    next_chunk += 1
+                raw_audio = await pending.pop(0)
+                yield to_pcm16(raw_audio)
+        finally:
+            for task in pending:
+                task.cancel()
+
     def generate_audio(self, text: str, output_path: Optional[str] = None, 
                       speaker: str = "male", language: str = "en") -> Optional[bytes]:
-        """Generate audio from text and optionally save to file"""
+        """Generate audio from text, save it to file and return the WAV bytes"""
         print(f"\n=== Generating Audio ===")
         print(f"Text: {text[:100]}...")
         print(f"Language: {language}")
@@ -98,26 +195,20 @@ class TextToSpeech:
             if os.path.exists(output_path):
                 print(f"Audio already exists at {output_path}")
                 with open(output_path, 'rb') as f:
-                    return None  # File exists, no need to return bytes
+                    return f.read()
             
             # Generate audio
-            payload = json.dumps(self._create_payload(text, speaker, language))
             print("\nSending request to TTS API...")
-            response = requests.post(self.url, headers=self._get_headers(), data=payload)
-            
-            if response.status_code != 200:
-                error_msg = f"API request failed with status {response.status_code}: {response.text}"
-                print(error_msg)
-                raise Exception(error_msg)
-
-            print("Processing API response...")
-            audio_arr = json.loads(response.text)["outputs"][0]["data"]
-            raw_audio = np.array(audio_arr, dtype=np.float32)
+            raw_audio = self.synthesize(text, speaker, language)
             
             # Save to file
             print(f"Saving audio to {output_path}")
-            scipy_wav_write(output_path, self.default_sampling_rate, raw_audio)
-            return None  # File saved successfully
+            buffer = io.BytesIO()
+            scipy_wav_write(buffer, self.default_sampling_rate, raw_audio)
+            audio_bytes = buffer.getvalue()
+            with open(output_path, 'wb') as f:
+                f.write(audio_bytes)
+            return audio_bytes
 
         except Exception as e:
             print(f"Error generating audio: {str(e)}")
@@ -0,0 +1,146 @@
+"""
+audio_segmentation.py: Lightweight, local voice-activity detection used to split
+long recordings on silence before they are sent to Whisper.
+
+Audio is decoded to mono float32 samples (WAV via scipy, anything else via an
+ffmpeg pipe when available), framed, and classified as speech/silence using
+short-time energy against an adaptive noise floor. Cut points are placed in the
+longest silences so that every segment stays under the upload/latency budget.
+"""
+import io
+import shutil
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from scipy.io import wavfile
+from scipy.ndimage import binary_closing
+
+TARGET_SAMPLE_RATE = 16000  # Whisper resamples to 16 kHz anyway
+FRAME_MS = 30
+MIN_SILENCE_MS = 400
+MAX_SEGMENT_SECONDS = 30.0
+MIN_SEGMENT_SECONDS = 1.0
+PADDING_MS = 150
+# Frames louder than this (dBFS) are taken as content, never as background
+# noise, so a recording with few or no pauses cannot lift the noise floor to
+# speech level; with no quieter frames at all, the default floor is used
+NOISE_CEILING_DB = -40.0
+DEFAULT_NOISE_FLOOR_DB = -60.0
+
+
+@dataclass
+class AudioSegment:
+    start: float  # seconds
+    end: float  # seconds
+    samples: np.ndarray
+
+    def to_wav_bytes(self, sample_rate: int = TARGET_SAMPLE_RATE) -> bytes:
+        buffer = io.BytesIO()
+        wavfile.write(buffer, sample_rate, (np.clip(self.samples, -1.0, 1.0) * 32767).astype(np.int16))
+        return buffer.getvalue()
+
+
+def _to_float_mono(samples: np.ndarray) -> np.ndarray:
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    if np.issubdtype(samples.dtype, np.integer):
+        samples = samples.astype(np.float32) / np.iinfo(samples.dtype).max
+    return samples.astype(np.float32)
+
+
+def _resample(samples: np.ndarray, rate: int) -> np.ndarray:
+    if rate == TARGET_SAMPLE_RATE:
+        return samples
+    from scipy.signal import resample_poly
+    gcd = np.gcd(rate, TARGET_SAMPLE_RATE)
+    return resample_poly(samples, TARGET_SAMPLE_RATE // gcd, rate // gcd).astype(np.float32)
+
+
+def decode_audio(data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode an uploaded recording to 16 kHz mono float32 samples.
+    Returns None when the container cannot be decoded locally.
+    """
+    if data[:4] == b"RIFF":
+        try:
+            rate, samples = wavfile.read(io.BytesIO(data))
+            return _resample(_to_float_mono(samples), rate)
+        except Exception as e:
+            print(f"WAV decode failed: {e}")
+
+    # Browser recordings are usually webm/ogg; decode through an ffmpeg pipe
+    if not shutil.which("ffmpeg"):
+        return None
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+             "-f", "s16le", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "pipe:1"],
+            input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60, check=True
+        )
+    except Exception as e:
+        print(f"ffmpeg decode failed: {e}")
+        return None
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32767
+
+
+def detect_speech_frames(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Return a boolean speech mask with one entry per FRAME_MS frame"""
+    frame_len = int(sample_rate * FRAME_MS / 1000)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+    frames = samples[: n_frames * frame_len].reshape(n_frames, frame_len)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+    # Adaptive threshold: a few dB above the noise floor, capped below the loud parts
+    quiet = energy_db[energy_db < NOISE_CEILING_DB]
+    noise_floor = np.percentile(quiet, 10) if quiet.size else DEFAULT_NOISE_FLOOR_DB
+    speech_level = np.percentile(energy_db, 90)
+    threshold = max(noise_floor + 6.0, speech_level - 30.0)
+    speech = energy_db > threshold
+
+    # Bridge short pauses between words so only real silences split speech
+    bridge = max(1, int(MIN_SILENCE_MS / FRAME_MS))
+    return binary_closing(speech, structure=np.ones(bridge, dtype=bool))
+
+
+def segment_on_silence(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE,
+                       max_segment_seconds: float = MAX_SEGMENT_SECONDS) -> List[AudioSegment]:
+    """Split samples into speech segments no longer than max_segment_seconds"""
+    speech = detect_speech_frames(samples, sample_rate)
+    frame_len = int(sample_rate * FRAME_MS / 1000)
+    padding = int(sample_rate * PADDING_MS / 1000)
+    max_len = int(max_segment_seconds * sample_rate)
+    min_len = int(MIN_SEGMENT_SECONDS * sample_rate)
+
+    # Contiguous speech regions in sample offsets
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+    regions = [(start * frame_len, end * frame_len) for start, end in zip(edges[::2], edges[1::2])]
+
+    # Merge neighbouring regions while they fit in one segment
+    merged = []
+    for start, end in regions:
+        if merged and end - merged[-1][0] <= max_len:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    segments = []
+    for start, end in merged:
+        start = max(0, start - padding)
+        end = min(len(samples), end + padding)
+        # A single uninterrupted region longer than the budget is cut at its quietest frame
+        while end - start > max_len:
+            window = samples[start + min_len: start + max_len]
+            cut_frames = len(window) // frame_len
+            if cut_frames == 0:
+                break
+            frame_energy = np.mean(window[: cut_frames * frame_len].reshape(cut_frames, frame_len) ** 2, axis=1)
+            cut = start + min_len + int(np.argmin(frame_energy)) * frame_len
+            segments.append(AudioSegment(start / sample_rate, cut / sample_rate, samples[start:cut]))
+            start = cut
+        if end - start >= frame_len:
+            segments.append(AudioSegment(start / sample_rate, end / sample_rate, samples[start:end]))
+    return segments
@@ -3,14 +3,17 @@ import os
 from dotenv import load_dotenv
 from pydantic import BaseModel, ValidationError
 from typing import List
+import asyncio
 import json
+from core.streaming import stream_chat_completion, strip_json_fences
+from core.metrics import instrument_groq
 
 # load_dotenv()
 
 # os.environ.pop("GROQ_API_KEY", None)
 # load_dotenv("./.env")
 api_key=os.getenv("GROQ_API_KEY")
-groq_client = Groq(api_key=api_key)
+groq_client = instrument_groq(Groq(api_key=api_key), "business_suggestion")
 
 class DetailedStep(BaseModel):
     step_number: int
@@ -100,11 +103,12 @@ Return ONLY valid JSON in this exact format:
   ]
 }}"""
 
-async def get_business_suggestions(prompt):
+async def get_business_suggestions(prompt, on_token=None):
+    """Generate suggestions for prompt; on_token receives the raw output incrementally when streaming"""
     try:
         print(f"Sending prompt to Groq API (length: {len(prompt)} chars)")
         
-        response = groq_client.chat.completions.create(
+        completion_args = dict(
             model="llama3-8b-8192",
             messages=[
                 {"role": "system", "content": "You are a business consultant. Respond only with valid JSON format. Do not include any text outside of the JSON structure."},
@@ -113,19 +117,17 @@ async def get_business_suggestions(prompt):
             max_tokens=4000,
             temperature=0.7
         )
-        
-        content = response.choices[0].message.content
+        if on_token is not None:
+            content = await stream_chat_completion(groq_client, on_token, **completion_args)
+        else:
+            response = await asyncio.to_thread(groq_client.chat.completions.create, **completion_args)
+            content = response.choices[0].message.content
         print(f"Received response from Groq (length: {len(content)} chars)")
         print(f"Raw response: {content[:500]}...")  # Print first 500 chars
         
         try:
             # Clean the response to extract JSON
-            content = content.strip()
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.endswith('```'):
-                content = content[:-3]
-            content = content.strip()
+            content = strip_json_fences(content)
             
             parsed = json.loads(content)
             if isinstance(parsed, list):
@@ -0,0 +1,136 @@
+"""
+compression.py: gzip/brotli compression of complete responses.
+
+CompressionMiddleware compresses a response body of a text-like type once it
+reaches RESPONSE_COMPRESSION_MIN_BYTES and the client accepts it, preferring
+brotli (when the brotli package is installed) over gzip. Only single-chunk
+bodies are compressed; streamed responses (SSE, files) pass through untouched.
+
+A compressed response's ETag gets the encoding appended ("abc" -> "abc-gzip"),
+so every encoding keeps its own strong validator; base_etag() maps a
+validator sent back in If-None-Match to the route's original ETag.
+"""
+import gzip
+import os
+from typing import Optional, Set
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+STREAMING_TYPES = ("text/event-stream",)
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Codings listed in an Accept-Encoding header, minus those with q=0"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output (and so its size) identical for identical bodies
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}{ETAG_SUFFIXES[encoding]}"'
+
+
+def base_etag(tag: str) -> str:
+    """Opaque part of a validator, without W/, quotes or an encoding suffix"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ETAG_SUFFIXES.values():
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = RESPONSE_COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        held_start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal held_start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if ("content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES)
+                        or content_type.startswith(STREAMING_TYPES)):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether to compress
+                    held_start = message
+                return
+            if passthrough or held_start is None:
+                await send(message)
+                return
+
+            start, held_start = held_start, None
+            body = message.get("body", b"")
+            if (message["type"] != "http.response.body" or message.get("more_body", False)
+                    or len(body) < self.minimum_size):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = MutableHeaders(raw=list(start["headers"]))
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["etag"] = encoded_etag(headers["etag"], encoding)
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -4,11 +4,12 @@ from groq import Groq
 from pydantic import BaseModel
 from datetime import datetime
 import json
+from core.metrics import instrument_groq
 
 # Set up the client with error handling
 groq = None
 try:
-    groq = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    groq = instrument_groq(Groq(api_key=os.getenv("GROQ_API_KEY")), "enhanced_llm")
 except Exception as e:
     print(f"Warning: Failed to initialize Groq client: {e}")
 
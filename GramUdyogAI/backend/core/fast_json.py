@@ -0,0 +1,50 @@
+"""
+fast_json.py: orjson-backed JSON responses for the large list endpoints.
+
+FastJSONResponse is the app's default response class. List endpoints build
+their rows with the mappers in services/row_mappers.py (plain dicts of JSON
+types) and return FastJSONResponse(content) themselves, which also skips
+FastAPI's jsonable_encoder pass over every value and any per-row
+response_model validation. Without orjson installed the stdlib encoder is used,
+so the app still runs, just slower.
+"""
+import json
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def _default(value: Any):
+    """Types the encoders do not know natively"""
+    if hasattr(value, "model_dump"):  # Pydantic models
+        return value.model_dump()
+    if hasattr(value, "keys"):  # sqlite3.Row
+        return {key: value[key] for key in value.keys()}
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    if hasattr(value, "isoformat"):  # dates for the stdlib fallback
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
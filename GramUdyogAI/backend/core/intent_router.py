@@ -0,0 +1,304 @@
+"""
+intent_router.py: Local fast path for the AI assistant's function selection.
+
+Requests are classified against labelled example utterances with a
+nearest-centroid model over all-MiniLM-L6-v2 sentence embeddings (or a keyword
+model when sentence-transformers is not installed). High-confidence requests
+are routed immediately, with their arguments (a scheme occupation, a skill, a
+URL) extracted locally; ambiguous ones, and confident ones whose arguments
+cannot be extracted, fall through to the LLM selector in
+llm_function_selector.py. Every decision is logged to intent_routing_log so the
+example set can be grown from real traffic via the intent_examples table.
+"""
+import logging
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.llm_function_selector import select_function_and_args, parse_visual_summary_arguments
+from init_db import get_db
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# Minimum cosine similarity to the winning centroid, and minimum lead over the runner-up
+EMBEDDING_CONFIDENCE_THRESHOLD = 0.55
+EMBEDDING_MARGIN_THRESHOLD = 0.08
+KEYWORD_CONFIDENCE_THRESHOLD = 0.75
+
+# product_recommendation needs marketplace keywords extracted from the request,
+# which only the LLM does well, so it is never routed locally.
+LOCAL_ROUTABLE = {
+    "recommend_job", "scheme_recommendation", "business_suggestion", "course_recommendation",
+    "skill_tutorial", "event_management", "project_showcase", "youtube_summary",
+    "profile_management", "visual_summary",
+}
+
+# Handlers that take the whole request: job matching scores the sentence itself,
+# and the event, project and profile handlers pull names out of it by pattern.
+FREE_TEXT_INTENTS = {"recommend_job", "event_management", "project_showcase", "profile_management"}
+# Handlers that work without a subject (schemes default to a generic occupation);
+# the rest go to the LLM when no subject can be extracted locally.
+SUBJECT_OPTIONAL_INTENTS = {"scheme_recommendation"}
+
+# The subject of a request usually follows one of these cues:
+# "subsidy for dairy farmers", "teach me how to do embroidery", "start with sewing skills"
+SUBJECT_CUE = re.compile(
+    r"\b(?:how to(?: do| make)?|to learn|learn(?:ing)?|study|about|on|regarding|for|with|from|of)\s+(.+)$",
+    re.IGNORECASE
+)
+SUBJECT_STOPWORDS = {
+    "a", "an", "the", "my", "me", "i", "some", "any", "our", "this", "that", "please", "it",
+    "which", "what", "can", "help", "us", "you", "to", "do", "get", "want", "need",
+}
+# Leading words dropped from a subject: cues that follow the first one ("learn about
+# tailoring"), and request nouns that only introduce it ("schemes for farmers")
+SUBJECT_CUE_WORDS = {
+    "how", "learn", "learning", "study", "about", "on", "regarding", "for", "with", "from", "of",
+}
+REQUEST_NOUNS = {
+    "scheme", "schemes", "yojana", "subsidy", "subsidies", "loan", "loans", "government",
+    "course", "courses", "training", "class", "classes", "tutorial", "tutorials", "video", "videos",
+    "job", "jobs", "business", "idea", "ideas", "information", "details",
+}
+URL_PATTERN = re.compile(r"https?://\S+")
+
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "recommend_job": [
+        "find me a job", "I am looking for work near my village", "any jobs for a tailor",
+        "job openings for drivers in Pune", "I need employment", "show me part-time jobs",
+        "what work can I get with my skills", "career opportunities for freshers",
+    ],
+    "scheme_recommendation": [
+        "which government schemes can help me", "subsidy for dairy farmers",
+        "financial aid for women entrepreneurs", "government loan scheme for my shop",
+        "schemes for weavers", "is there any yojana for poultry farming",
+    ],
+    "business_suggestion": [
+        "give me business ideas", "what business can I start with sewing skills",
+        "I want to start a small business", "low investment business ideas for village",
+        "how can I earn money from cooking at home", "entrepreneurship ideas for farmers",
+    ],
+    "course_recommendation": [
+        "suggest a course to learn computers", "training programs for electricians",
+        "I want to study digital marketing", "online courses for beginners",
+        "which certification should I do", "courses for skill development",
+    ],
+    "skill_tutorial": [
+        "teach me how to do embroidery", "tutorial for mobile repairing",
+        "how do I learn pottery", "videos to learn carpentry", "show me how to stitch a blouse",
+    ],
+    "event_management": [
+        "upcoming events near me", "show hackathons", "any workshops this month",
+        "networking events for entrepreneurs", "details of the event rural innovation hackathon",
+        "seminars and conferences",
+    ],
+    "project_showcase": [
+        "show me projects", "projects looking for investment", "featured projects from hackathons",
+        "I want to see agriculture projects", "collaborate on a project",
+    ],
+    "youtube_summary": [
+        "summarize this youtube video", "give me a summary of https://www.youtube.com/watch?v=abc",
+        "explain this video in short", "audio summary of a youtube link",
+    ],
+    "profile_management": [
+        "show my profile", "open my dashboard", "update my profile details",
+        "what is in my account", "show profile of user ramesh",
+    ],
+    "visual_summary": [
+        "make a visual summary on organic farming", "create a visual summary about goat rearing in hindi",
+        "visual explanation of drip irrigation", "give me a picture summary of beekeeping",
+    ],
+}
+
+# Keyword fallback used when sentence-transformers is unavailable
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "recommend_job": ["job", "jobs", "work", "employment", "vacancy", "hiring", "career", "naukri"],
+    "scheme_recommendation": ["scheme", "schemes", "subsidy", "yojana", "government", "loan", "grant", "financial aid"],
+    "business_suggestion": ["business", "startup", "entrepreneur", "earn money", "start a", "idea"],
+    "course_recommendation": ["course", "courses", "training", "certification", "study", "learn"],
+    "skill_tutorial": ["tutorial", "how to", "teach me", "videos to learn"],
+    "event_management": ["event", "events", "hackathon", "workshop", "seminar", "conference"],
+    "project_showcase": ["project", "projects", "showcase", "invest", "investment"],
+    "youtube_summary": ["youtube", "youtu.be", "video summary", "summarize this video"],
+    "profile_management": ["profile", "dashboard", "my account"],
+    "visual_summary": ["visual summary", "visual", "picture summary", "infographic"],
+}
+
+_model_lock = threading.Lock()
+_centroids: Optional[Tuple[List[str], np.ndarray]] = None
+_embedding_model = None
+_embeddings_unavailable = False
+
+
+def _get_embedding_model():
+    """Reuse the course recommender's model when it is already loaded, otherwise load lazily"""
+    global _embedding_model, _embeddings_unavailable
+    if _embedding_model is not None or _embeddings_unavailable:
+        return _embedding_model
+    course_module = sys.modules.get("core.course_recommender")
+    if course_module is not None and getattr(course_module, "embedding_model", None) is not None:
+        _embedding_model = course_module.embedding_model
+        return _embedding_model
+    try:
+        from sentence_transformers import SentenceTransformer
+        _embedding_model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    except Exception as e:
+        logger.warning(f"Intent router falling back to keywords, embeddings unavailable: {e}")
+        _embeddings_unavailable = True
+    return _embedding_model
+
+
+def load_examples() -> Dict[str, List[str]]:
+    """Built-in examples plus any labelled utterances added to intent_examples"""
+    examples = {intent: list(utterances) for intent, utterances in INTENT_EXAMPLES.items()}
+    try:
+        conn = get_db()
+        rows = conn.execute("SELECT text, function_name FROM intent_examples").fetchall()
+        conn.close()
+        for row in rows:
+            examples.setdefault(row["function_name"], []).append(row["text"])
+    except Exception as e:
+        logger.warning(f"Could not load extra intent examples: {e}")
+    return examples
+
+
+def _build_centroids(model) -> Tuple[List[str], np.ndarray]:
+    examples = load_examples()
+    intents = sorted(examples)
+    centroids = []
+    for intent in intents:
+        vectors = model.encode(examples[intent], normalize_embeddings=True)
+        centroid = np.mean(vectors, axis=0)
+        centroids.append(centroid / (np.linalg.norm(centroid) + 1e-12))
+    return intents, np.array(centroids, dtype=np.float32)
+
+
+def reload_examples():
+    """Drop the cached centroids so newly labelled examples are picked up"""
+    global _centroids
+    with _model_lock:
+        _centroids = None
+
+
+def _classify_with_embeddings(model, text: str) -> Tuple[str, float, float]:
+    global _centroids
+    with _model_lock:
+        if _centroids is None:
+            _centroids = _build_centroids(model)
+        intents, centroids = _centroids
+    query = model.encode(text, normalize_embeddings=True).astype(np.float32)
+    scores = centroids @ query
+    order = np.argsort(scores)[::-1]
+    best, runner_up = float(scores[order[0]]), float(scores[order[1]]) if len(order) > 1 else 0.0
+    return intents[order[0]], best, best - runner_up
+
+
+def _classify_with_keywords(text: str) -> Tuple[Optional[str], float]:
+    lowered = text.lower()
+    hits = {
+        intent: sum(1 for kw in keywords if re.search(rf"\b{re.escape(kw)}\b", lowered))
+        for intent, keywords in INTENT_KEYWORDS.items()
+    }
+    total = sum(hits.values())
+    if not total:
+        return None, 0.0
+    intent = max(hits, key=hits.get)
+    return intent, hits[intent] / total
+
+
+def classify_intent(text: str) -> Tuple[Optional[str], float, bool]:
+    """Return (intent, confidence, confident) for an English request"""
+    model = _get_embedding_model()
+    if model is not None:
+        intent, score, margin = _classify_with_embeddings(model, text)
+        confident = score >= EMBEDDING_CONFIDENCE_THRESHOLD and margin >= EMBEDDING_MARGIN_THRESHOLD
+        return intent, score, confident
+    intent, score = _classify_with_keywords(text)
+    return intent, score, intent is not None and score >= KEYWORD_CONFIDENCE_THRESHOLD
+
+
+def _log_decision(text: str, function_name: Optional[str], local_intent: Optional[str],
+                  confidence: float, source: str):
+    logger.info(
+        f"Intent routing: source={source} function={function_name} "
+        f"local_intent={local_intent} confidence={confidence:.3f}"
+    )
+    try:
+        conn = get_db()
+        conn.execute(
+            "INSERT INTO intent_routing_log (text, function_name, local_intent, confidence, source) VALUES (?, ?, ?, ?, ?)",
+            (text, function_name, local_intent, round(confidence, 4), source)
+        )
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logger.warning(f"Could not record intent routing decision: {e}")
+
+
+def extract_subject(text: str) -> str:
+    """The object of a request ("dairy farmers" in "subsidy for dairy farmers"), or "" if none is found"""
+    match = SUBJECT_CUE.search(text)
+    if not match:
+        return ""
+    words = re.sub(r"[^\w\s\-']", " ", match.group(1)).split()
+    while words:
+        if words[0].lower() in SUBJECT_STOPWORDS or words[0].lower() in SUBJECT_CUE_WORDS:
+            words.pop(0)
+            continue
+        nouns = 0
+        while nouns < len(words) and words[nouns].lower() in REQUEST_NOUNS:
+            nouns += 1
+        if not nouns or nouns == len(words) or words[nouns].lower() not in SUBJECT_CUE_WORDS:
+            break
+        del words[:nouns]
+    while words and words[-1].lower() in SUBJECT_STOPWORDS:
+        words.pop()
+    if all(word.lower() in REQUEST_NOUNS for word in words):
+        return ""  # "tell me about schemes" names the request, not its subject
+    return " ".join(words)
+
+
+def extract_local_arguments(intent: str, user_text_en: str):
+    """
+    Arguments for a locally routed intent, shaped like the LLM selector's, or
+    None when they cannot be extracted and the request should go to the LLM.
+    """
+    if intent == "visual_summary":
+        return parse_visual_summary_arguments(user_text_en)
+    if intent in FREE_TEXT_INTENTS:
+        return user_text_en
+    if intent == "youtube_summary":
+        url = URL_PATTERN.search(user_text_en)
+        if url:
+            return url.group(0)
+    subject = extract_subject(user_text_en)
+    if subject or intent in SUBJECT_OPTIONAL_INTENTS:
+        return subject
+    return None
+
+
+def route_request(user_text_en: str):
+    """
+    Pick the assistant function for a request. Returns (function_name, arguments)
+    exactly like select_function_and_args, using the LLM only when the local
+    classifier is not confident.
+    """
+    try:
+        intent, confidence, confident = classify_intent(user_text_en)
+    except Exception as e:
+        logger.warning(f"Local intent classification failed: {e}")
+        intent, confidence, confident = None, 0.0, False
+
+    if confident and intent in LOCAL_ROUTABLE:
+        arguments = extract_local_arguments(intent, user_text_en)
+        if arguments is not None:
+            _log_decision(user_text_en, intent, intent, confidence, "local")
+            return intent, arguments
+
+    function_name, arguments = select_function_and_args(user_text_en)
+    _log_decision(user_text_en, function_name, intent, confidence, "llm")
+    return function_name, arguments
@@ -1,17 +1,13 @@
+import asyncio
 import json
 from typing import List, Dict, Optional
-from groq import Groq
-from dotenv import load_dotenv, find_dotenv
-import os
-import sqlite3
 from pydantic import BaseModel
 
-# Load environment variables from the .env file
-# load_dotenv(find_dotenv())
-api_key = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=api_key)
+from core.translation import llama_chat_completion
+from services.job_matching import rank_jobs, load_jobs, experience_ceiling
 
-DATABASE_PATH = "gramudyogai.db"  # Path to your SQLite database
+# Jobs the LLM is asked to explain; ranking itself never goes through the LLM
+EXPLAIN_TOP_N = 6
 
 
 # Pydantic Models for Validation
@@ -35,133 +31,74 @@ class JobRecommendationResponse(BaseModel):
     best_job: JobDetails
 
 
-async def get_all_job_names() -> List[str]:
+def job_details(row, score: float = 0) -> Dict:
+    """Job dict in the shape the dashboard and assistant render"""
+    description = row["description"] or ""
+    return {
+        "id": row["id"],
+        "job_title": row["job_title"] or row["title"],
+        "title": row["job_title"] or row["title"],  # For backward compatibility
+        "description": description[:500] + "..." if len(description) > 500 else description,
+        "company_name": row["company_name"] or row["company"],
+        "company": row["company_name"] or row["company"],  # For backward compatibility
+        "location": row["location"],
+        "salary_range": row["salary_range"] or row["pay"],
+        "pay": row["salary_range"] or row["pay"],  # For backward compatibility
+        "created_at": row["created_at"],
+        "industry": row["industry"],
+        "sector": row["sector"],
+        "job_type": row["job_type"],
+        "employment_type": row["employment_type"],
+        "experience_required": row["experience_required"],
+        "skills_required": json.loads(row["skills_required"]) if row["skills_required"] else [],
+        "relevance_score": score
+    }
+
+
+async def recommend_jobs(user_info: str, top_k: int = 5) -> List[Dict]:
     """
-    Fetch all job names from the database.
+    Rank all active jobs locally against the user's description (skills,
+    roles, industries and locations found in the text) and return the top_k,
+    best first.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT DISTINCT COALESCE(job_title, title) FROM job_postings WHERE is_active = 1 LIMIT 20")
-    job_names = [row[0] for row in cursor.fetchall()]
-
-    conn.close()
-    return job_names
-
-
-async def get_relevant_jobs(user_info: str, job_names: List[str]) -> List[str]:
-    """
-    Use Groq to select the most relevant jobs for the user based on their information.
-    """
-    prompt = (
-        f"You are helping a user find the best job based on their information: '{user_info}'.\n\n"
-        f"Below is a list of available job titles:\n"
-        f"{json.dumps(job_names, indent=2)}\n\n"
-        f"From this list, STRICTLY select only 3 jobs that are most relevant to the user's information.\n\n"
-        f"Important instructions:\n"
-        f"- ONLY select jobs from the provided list.\n"
-        f"- DO NOT suggest new jobs or modify job titles.\n"
-        f"- The names in your response MUST match exactly how they appear in the original list (case-sensitive, no typos, no changes).\n"
-        f"- Return only the names of the 3 relevant jobs strictly as a JSON list, with key 'relevant_jobs'.\n"
+    ranked = await asyncio.to_thread(
+        rank_jobs, user_info, max_experience=experience_ceiling(user_info), top_k=top_k
     )
-    response = client.chat.completions.create(
-        model="llama3-8b-8192",
-        messages=[
-            {"role": "system", "content": "You are a smart assistant that selects relevant jobs based on user information. Respond only with a JSON list of job titles from the provided list, without any modifications."},
-            {"role": "user", "content": prompt}
-        ],
-        response_format={"type": "json_object"}
-    )
-    content = response.choices[0].message.content
-    try:
-        return json.loads(content)
-    except:
-        return []
+    scored_rows = await asyncio.to_thread(load_jobs, ranked)
+    return [job_details(row, score) for score, row in scored_rows]
 
 
-async def load_selected_jobs(selected_names: List[str]) -> List[Dict]:
+async def explain_job_matches(user_info: str, jobs: List[Dict]) -> Dict[int, str]:
     """
-    Load the details of the selected jobs from the database.
+    One LLM call explaining why each of the (already ranked) jobs suits the
+    user. Returns {job_id: reason}; empty when the LLM is unavailable, in which
+    case the ranking is still served.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    placeholders = ",".join("?" for _ in selected_names)
-    query = f"""
-        SELECT id, COALESCE(job_title, title) as job_title, description, 
-               COALESCE(company_name, company) as company_name, location, 
-               COALESCE(salary_range, pay) as salary_range, 
-               created_at, industry, sector, job_type, employment_type, 
-               experience_required, skills_required
-        FROM job_postings 
-        WHERE (job_title IN ({placeholders}) OR title IN ({placeholders})) AND is_active = 1
-    """
-    cursor.execute(query, selected_names + selected_names)  # Double the params for both conditions
-    rows = cursor.fetchall()
-
-    conn.close()
-
-    jobs = [
+    if not jobs:
+        return {}
+    summaries = [
         {
-            "id": row[0],
-            "job_title": row[1],
-            "title": row[1],  # For backward compatibility
-            "description": row[2][:500] + "..." if len(row[2]) > 500 else row[2],  # Limit description length
-            "company_name": row[3],
-            "company": row[3],  # For backward compatibility
-            "location": row[4],
-            "salary_range": row[5],
-            "pay": row[5],  # For backward compatibility
-            "created_at": row[6],
-            "industry": row[7],
-            "sector": row[8],
-            "job_type": row[9],
-            "employment_type": row[10],
-            "experience_required": row[11],
-            "skills_required": json.loads(row[12]) if row[12] else []
+            "id": job["id"],
+            "job_title": job.get("job_title"),
+            "company": job.get("company_name"),
+            "location": job.get("location"),
+            "industry": job.get("industry"),
+            "skills": job.get("skills_required"),
         }
-        for row in rows
+        for job in jobs[:EXPLAIN_TOP_N]
     ]
-
-    return jobs
-
-
-async def find_best_job(user_info: str, selected_jobs: List[Dict]) -> Dict:
-    """
-    Use simple keyword matching to find the best job instead of LLM
-    """
-    if not selected_jobs:
+    messages = [
+        {"role": "system", "content": (
+            "You explain job recommendations to job seekers. The jobs are already chosen and ranked; "
+            "do not re-rank or drop any. For each job write one short sentence on why it fits the user. "
+            'Respond in JSON: {"reasons": {"<job id>": "<sentence>"}}'
+        )},
+        {"role": "user", "content": f"User: {user_info}\n\nJobs: {json.dumps(summaries)}"}
+    ]
+    try:
+        response = await asyncio.to_thread(llama_chat_completion, messages, temperature=0.3, max_tokens=800)
+        reasons = json.loads(response).get("reasons", {})
+        return {int(job_id): str(reason) for job_id, reason in reasons.items() if str(job_id).isdigit()}
+    except Exception as e:
+        print(f"Error explaining job matches: {e}")
         return {}
-    
-    user_keywords = user_info.lower().split()
-    best_job = None
-    best_score = 0
-    
-    for job in selected_jobs:
-        score = 0
-        job_text = f"{job.get('job_title', '')} {job.get('description', '')} {job.get('industry', '')}".lower()
-        
-        # Score based on keyword matches
-        for keyword in user_keywords:
-            if keyword in job_text:
-                score += 1
-        
-        # Boost score for exact matches in job title
-        job_title = job.get('job_title', '').lower()
-        for keyword in user_keywords:
-            if keyword in job_title:
-                score += 2
-        
-        if score > best_score:
-            best_score = score
-            best_job = job
-    
-    # If no keyword matches, return the first job
-    if not best_job and selected_jobs:
-        best_job = selected_jobs[0]
-    
-    return best_job or {}
-
-
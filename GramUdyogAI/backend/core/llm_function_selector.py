@@ -1,6 +1,7 @@
 import os
 import json
 from groq import Groq
+from core.metrics import instrument_groq
 from pydantic import BaseModel, ValidationError
 
 # Define the Pydantic model
@@ -9,13 +10,42 @@ class FunctionSelectionResponse(BaseModel):
     arguments: str
 
 api_key = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=api_key)
+client = instrument_groq(Groq(api_key=api_key), "function_selection")
 
 """
 llm_function_selector.py: Selects which backend function to call and what arguments to use, based on user natural language input.
 This module does NOT execute the function itself (e.g., course recommender), it only selects which function and arguments to use.
 """
 
+def parse_visual_summary_arguments(arguments: str) -> dict:
+    """Heuristic: try to extract topic, context, and language from the arguments string"""
+    import re
+    topic = ""
+    context = ""
+    language = "en"
+    # Try to extract language (Hindi, etc.)
+    lang_match = re.search(r"in ([A-Za-z]+)", arguments, re.IGNORECASE)
+    if lang_match:
+        lang_word = lang_match.group(1).lower()
+        lang_map = {"hindi": "hi", "english": "en", "marathi": "mr", "bengali": "bn", "tamil": "ta", "telugu": "te", "gujarati": "gu", "punjabi": "pa", "kannada": "kn", "malayalam": "ml", "odia": "or", "assamese": "as", "urdu": "ur"}
+        language = lang_map.get(lang_word, lang_word)
+        arguments = re.sub(r"in [A-Za-z]+", "", arguments, flags=re.IGNORECASE).strip()
+    # Try to split topic/context by 'on', 'about', or 'regarding'
+    topic_match = re.search(r"(?:on|about|regarding) ([^,]+)", arguments, re.IGNORECASE)
+    if topic_match:
+        topic = topic_match.group(1).strip()
+    else:
+        topic = arguments.strip()
+    # Try to extract context after a comma or 'for'
+    context_match = re.search(r",(.*)$", arguments)
+    if context_match:
+        context = context_match.group(1).strip()
+    else:
+        context_for = re.search(r"for (.+)$", arguments)
+        if context_for:
+            context = context_for.group(1).strip()
+    return {"topic": topic, "context": context, "language": language}
+
 def select_function_and_args(user_text_en: str):
     """
     Given a user request in English, use the LLM to select the best function and extract arguments.
@@ -78,33 +108,7 @@ User request: "{user_text_en}"
         arguments = response_data.get("arguments", "")
         # Special handling for visual_summary: extract topic, context, language if possible
         if function_name == "visual_summary":
-            # Heuristic: try to extract topic, context, and language from the arguments string
-            import re
-            topic = ""
-            context = ""
-            language = "en"
-            # Try to extract language (Hindi, etc.)
-            lang_match = re.search(r"in ([A-Za-z]+)", arguments, re.IGNORECASE)
-            if lang_match:
-                lang_word = lang_match.group(1).lower()
-                lang_map = {"hindi": "hi", "english": "en", "marathi": "mr", "bengali": "bn", "tamil": "ta", "telugu": "te", "gujarati": "gu", "punjabi": "pa", "kannada": "kn", "malayalam": "ml", "odia": "or", "assamese": "as", "urdu": "ur"}
-                language = lang_map.get(lang_word, lang_word)
-                arguments = re.sub(r"in [A-Za-z]+", "", arguments, flags=re.IGNORECASE).strip()
-            # Try to split topic/context by 'on', 'about', or 'regarding'
-            topic_match = re.search(r"(?:on|about|regarding) ([^,]+)", arguments, re.IGNORECASE)
-            if topic_match:
-                topic = topic_match.group(1).strip()
-            else:
-                topic = arguments.strip()
-            # Try to extract context after a comma or 'for'
-            context_match = re.search(r",(.*)$", arguments)
-            if context_match:
-                context = context_match.group(1).strip()
-            else:
-                context_for = re.search(r"for (.+)$", arguments)
-                if context_for:
-                    context = context_for.group(1).strip()
-            arguments = {"topic": topic, "context": context, "language": language}
+            arguments = parse_visual_summary_arguments(arguments)
         # If arguments is a dict/object, convert to string for other functions
         elif isinstance(arguments, dict):
             if function_name == "business_suggestion":
@@ -2,9 +2,10 @@ from groq import Groq
 import os
 from typing import List, Dict
 from dotenv import load_dotenv
+from core.metrics import instrument_groq
 
 # load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+client = instrument_groq(Groq(api_key=os.getenv("GROQ_API_KEY")), "course_recommendation")
 
 async def get_course_recommendations(user: Dict, courses: List[Dict]) -> List[Dict]:
     # Create prompt with user profile and courses
@@ -0,0 +1,384 @@
+"""
+metrics.py: request, upstream, database and cache instrumentation, exported in
+Prometheus text format at /metrics (api/routes_metrics.py).
+
+- MetricsMiddleware times every request per route template and collects a
+  breakdown of where its time went (DB queries, each upstream operation).
+  A request sent with "X-Server-Timing: 1" gets that breakdown back in a
+  Server-Timing response header.
+- instrument_groq() wraps a Groq client so every chat completion is counted,
+  timed and has its token usage recorded under an operation name
+  (translation, function_selection, ...).
+- track_upstream() times any other outbound call (YouTube, TTS, Whisper).
+- InstrumentedConnection is the sqlite3 connection factory behind get_db();
+  it counts and times every query.
+- record_cache() counts lookups in the in-process caches by result.
+
+Only the standard library is used: the registry below is small and renders
+the text format itself.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import sqlite3
+
+from starlette.datastructures import Headers, MutableHeaders
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+TIMING_REQUEST_HEADER = "x-server-timing"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DB_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[Any, ...], Any] = {}
+        _registry.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}"
+            for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, *labels: Any):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, (list(state[0]), state[1], state[2])) for labels, state in self._values.items()]
+        lines = self.header()
+        for labels, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read at scrape time from a callback returning (label values, value) pairs"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...],
+                 collect: Callable[[], Iterable[Tuple[Tuple[Any, ...], float]]]):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        try:
+            values = list(self.collect())
+        except Exception as e:
+            print(f"Metrics gauge {self.name} failed: {e}")
+            values = []
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}"
+            for labels, value in values
+        ]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in list(_registry):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+HTTP_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries run while serving a request", ("route",), QUERY_COUNT_BUCKETS)
+HTTP_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in database calls while serving a request", ("route",))
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total", "Calls to external services", ("service", "operation", "outcome"))
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external services", ("service", "operation"))
+UPSTREAM_TOKENS = Counter(
+    "upstream_tokens_total", "LLM tokens used", ("service", "operation", "kind"))
+DB_QUERIES = Counter("db_queries_total", "SQLite statements executed")
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "SQLite statement execution time", (), DB_QUERY_BUCKETS)
+CACHE_LOOKUPS = Counter("cache_lookups_total", "In-process cache lookups by result", ("cache", "result"))
+
+# Per-request breakdown: key -> [calls, seconds]. The dict is shared with
+# threads started through asyncio.to_thread, which copy the context.
+_breakdown: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("metrics_breakdown", default=None)
+
+
+def _add_to_breakdown(key: str, seconds: float, calls: int = 1):
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        entry = breakdown.setdefault(key, [0, 0.0])
+        entry[0] += calls
+        entry[1] += seconds
+
+
+def _usage_counts(usage: Any) -> Tuple[Optional[int], Optional[int]]:
+    if usage is None:
+        return None, None
+    if isinstance(usage, dict):
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+
+
+def record_upstream(service: str, operation: str, seconds: float, ok: bool = True, usage: Any = None):
+    UPSTREAM_REQUESTS.inc(service, operation, "ok" if ok else "error")
+    UPSTREAM_LATENCY.observe(seconds, service, operation)
+    prompt_tokens, completion_tokens = _usage_counts(usage)
+    if prompt_tokens:
+        UPSTREAM_TOKENS.inc(service, operation, "prompt", amount=prompt_tokens)
+    if completion_tokens:
+        UPSTREAM_TOKENS.inc(service, operation, "completion", amount=completion_tokens)
+    _add_to_breakdown(f"{service}.{operation}", seconds)
+
+
+@contextmanager
+def track_upstream(service: str, operation: str):
+    """Time the enclosed call to an external service"""
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record_upstream(service, operation, time.perf_counter() - start, ok)
+
+
+def record_cache(cache: str, result: str):
+    """Count a lookup in an in-process cache; result is "hit", "miss" or a cache-specific outcome"""
+    CACHE_LOOKUPS.inc(cache, result)
+
+
+class _TimedCompletions:
+    def __init__(self, completions, operation: str):
+        self._completions = completions
+        self._operation = operation
+
+    def create(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self._completions.create(*args, **kwargs)
+        except Exception:
+            record_upstream("groq", self._operation, time.perf_counter() - start, ok=False)
+            raise
+        if kwargs.get("stream"):
+            return self._timed_stream(response, start)
+        record_upstream("groq", self._operation, time.perf_counter() - start, usage=getattr(response, "usage", None))
+        return response
+
+    def _timed_stream(self, chunks, start: float):
+        """Pass chunks through; the call is recorded once the stream ends"""
+        usage = None
+        ok = True
+        try:
+            for chunk in chunks:
+                # Groq reports usage on the final chunk under x_groq
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None) or usage
+                yield chunk
+        except Exception:
+            ok = False
+            raise
+        finally:
+            record_upstream("groq", self._operation, time.perf_counter() - start, ok, usage)
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class InstrumentedGroq:
+    """A Groq client whose chat completions are recorded under operation; all else passes through"""
+
+    def __init__(self, client, operation: str):
+        self._client = client
+        self.chat = SimpleNamespace(completions=_TimedCompletions(client.chat.completions, operation))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def instrument_groq(client, operation: str):
+    return InstrumentedGroq(client, operation) if client is not None else None
+
+
+class _InstrumentedCursor(sqlite3.Cursor):
+    def _timed(self, method, *args, count: bool = True):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            seconds = time.perf_counter() - start
+            if count:
+                DB_QUERIES.inc()
+                DB_QUERY_LATENCY.observe(seconds)
+            _add_to_breakdown("db", seconds, calls=1 if count else 0)
+
+    def execute(self, *args):
+        return self._timed(super().execute, *args)
+
+    def executemany(self, *args):
+        return self._timed(super().executemany, *args)
+
+    def executescript(self, *args):
+        return self._timed(super().executescript, *args)
+
+    # Rows after the first are produced while fetching, so that time counts too
+    def fetchone(self):
+        return self._timed(super().fetchone, count=False)
+
+    def fetchmany(self, *args):
+        return self._timed(super().fetchmany, *args, count=False)
+
+    def fetchall(self):
+        return self._timed(super().fetchall, count=False)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection factory whose cursors are timed"""
+
+    def cursor(self, factory=_InstrumentedCursor):
+        return super().cursor(factory)
+
+    # The C implementation of Connection.execute() bypasses cursor()
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def executescript(self, *args):
+        return self.cursor().executescript(*args)
+
+
+def server_timing(breakdown: Dict[str, List[float]], total_seconds: float) -> str:
+    metrics = [
+        f'{key};dur={seconds * 1000:.1f};desc="{int(calls)} calls"'
+        for key, (calls, seconds) in sorted(breakdown.items())
+    ]
+    metrics.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(metrics)
+
+
+def route_template(scope) -> str:
+    """
+    Mounted template of the matched route, e.g. "/api/jobs/{job_id}". route.path
+    leaves out the include_router prefix, so the prefix is taken from the
+    request path: the shortest leading part after which the route matches.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    path_regex = getattr(route, "path_regex", None)
+    if template is None or path_regex is None:
+        return "other"
+    path = scope.get("path", "")
+    cut = 0
+    while cut != -1:
+        if path_regex.match(path[cut:]):
+            return path[:cut] + template
+        cut = path.find("/", cut + 1)
+    return template
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        breakdown: Dict[str, List[float]] = {}
+        token = _breakdown.set(breakdown)
+        start = time.perf_counter()
+        want_timing = Headers(scope=scope).get(TIMING_REQUEST_HEADER, "").lower() in ("1", "true")
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if want_timing:
+                    headers = MutableHeaders(raw=list(message["headers"]))
+                    headers.append("Server-Timing", server_timing(breakdown, time.perf_counter() - start))
+                    message = {**message, "headers": headers.raw}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Label by route template (/api/jobs/{job_id}) to keep the series bounded
+            route = route_template(scope)
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, route, status)
+            HTTP_LATENCY.observe(elapsed, method, route)
+            db_calls, db_seconds = breakdown.get("db", (0, 0.0))
+            HTTP_DB_QUERIES.observe(db_calls, route)
+            HTTP_DB_TIME.observe(db_seconds, route)
+            _breakdown.reset(token)
@@ -0,0 +1,81 @@
+"""
+rate_limiter.py: Thread-safe token-bucket limiters. RateLimiter paces concurrent
+workers that call rate-limited upstream APIs (YouTube Data API, Groq, TTS);
+KeyedRateLimiter throttles incoming requests per client key (phone, IP).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` calls per second with bursts of up to `burst`.
+    acquire() blocks the calling thread until a token is available, so it is
+    meant to be used from worker threads (asyncio.to_thread / executors).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens without blocking. Returns 0 on success, else seconds until they are available"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class KeyedRateLimiter:
+    """
+    One token bucket per key, created on first use. The least recently used
+    buckets are dropped beyond max_keys so a flood of distinct keys cannot
+    grow memory without bound.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, RateLimiter]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str) -> float:
+        """Returns 0 when the call is allowed, else seconds to wait before retrying"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = RateLimiter(self.rate, self.burst)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+        return bucket.try_acquire()
@@ -1,16 +1,20 @@
+import asyncio
 import json
 import glob
+import hashlib
 import os
 from typing import List, Dict
 from groq import Groq
 from dotenv import load_dotenv, find_dotenv
 from pydantic import BaseModel
+from core.streaming import stream_chat_completion, strip_json_fences
+from core.metrics import instrument_groq
 
 # Load environment variables from the .env file
 # os.environ.pop("GROQ_API_KEY", None)
 # load_dotenv("./.env")
 api_key = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=api_key)
+client = instrument_groq(Groq(api_key=api_key), "scheme_recommendation")
 
 SCHEME_DIR = "schemes"
 
@@ -25,6 +29,32 @@ async def get_all_scheme_names() -> List[str]:
             continue
     return scheme_names
 
+def list_schemes() -> Dict:
+    """Name, location, tags and description of every scheme file, sorted by name"""
+    schemes = []
+    for file in glob.glob(f"{SCHEME_DIR}/*.json"):
+        try:
+            with open(file, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        schemes.append({
+            "scheme_name": data.get("scheme_name"),
+            "location": data.get("location"),
+            "tags": data.get("tags", []),
+            "description": data.get("description"),
+        })
+    schemes.sort(key=lambda scheme: scheme["scheme_name"] or "")
+    return {"schemes": schemes, "total_count": len(schemes)}
+
+def scheme_data_version() -> str:
+    """Changes whenever a scheme file is added, removed or modified"""
+    entries = sorted(
+        (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+        for entry in os.scandir(SCHEME_DIR) if entry.name.endswith(".json")
+    )
+    return hashlib.sha1(repr(entries).encode("utf-8")).hexdigest()
+
 async def get_relevant_scheme_names(occupation: str, scheme_names: List[str]) -> List[str]:
     prompt = (
         f"You are helping a user who works as a '{occupation}'.\n\n"
@@ -40,7 +70,8 @@ async def get_relevant_scheme_names(occupation: str, scheme_names: List[str]) ->
         f"- Return only the names of only the 3 relevant schemes strictly as a JSON list.\n"
         f"- The JSON list should strictly follow the same format as that of the lists given to you above."
     )
-    response = client.chat.completions.create(
+    response = await asyncio.to_thread(
+        client.chat.completions.create,
         model="llama3-8b-8192",
         messages=[
             {
@@ -83,7 +114,8 @@ class SchemeExplanation(BaseModel):
 class SchemeResponse(BaseModel):
     schemes: List[SchemeExplanation]
 
-async def explain_schemes(occupation: str, selected_schemes: List[Dict]) -> List[Dict]:
+async def explain_schemes(occupation: str, selected_schemes: List[Dict], on_token=None) -> List[Dict]:
+    """Explain the selected schemes; on_token receives the raw output incrementally when streaming"""
     prompt = (
         f"Parse and explain these government schemes for a {occupation}.\n\n"
         f"Input schemes: {json.dumps(selected_schemes, indent=2)}\n\n"
@@ -100,16 +132,22 @@ async def explain_schemes(occupation: str, selected_schemes: List[Dict]) -> List
 
     print(f'Input schemes: {selected_schemes}')
 
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {"role": "system", "content": "You are a JSON API that explains government schemes."},
-            {"role": "user", "content": prompt}
-        ],
-        response_format={"type": "json_object"},
-    )
-
-    result = response.choices[0].message.content
+    messages = [
+        {"role": "system", "content": "You are a JSON API that explains government schemes."},
+        {"role": "user", "content": prompt}
+    ]
+    if on_token is not None:
+        # JSON mode cannot be combined with streaming, so rely on the prompt and strip fences
+        result = await stream_chat_completion(client, on_token, model="llama-3.3-70b-versatile", messages=messages)
+        result = strip_json_fences(result)
+    else:
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
+            model="llama-3.3-70b-versatile",
+            messages=messages,
+            response_format={"type": "json_object"},
+        )
+        result = response.choices[0].message.content
     print(f'Raw LLM response: {result}')
 
     try:
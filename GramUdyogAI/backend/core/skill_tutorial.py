@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 import json
 from groq import Groq
@@ -9,7 +9,13 @@ import time
 import re
 from core.audio_generation import TextToSpeech
 from core.translation import translate_text_safely
+from core.rate_limiter import RateLimiter
+from core.youtube_cache import cached_search
+from core.metrics import instrument_groq
 import requests
+import threading
+import httplib2
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 import asyncio
@@ -25,7 +31,7 @@ youtube_api_key = os.getenv("YOUTUBE_API_KEY")
 client = None
 if groq_api_key:
     try:
-        client = Groq(api_key=groq_api_key)
+        client = instrument_groq(Groq(api_key=groq_api_key), "skill_tutorial")
     except Exception as e:
         print(f"Warning: Failed to initialize Groq client: {e}")
 else:
@@ -43,6 +49,21 @@ else:
 
 LLAMA_MODEL = "llama-3.3-70b-versatile"
 
+# Shared limiters replace the fixed sleeps between sections; every worker
+# thread draws from the same bucket so bursts stay within upstream limits.
+youtube_rate_limiter = RateLimiter(rate=5, burst=5)
+llm_rate_limiter = RateLimiter(rate=10, burst=5)
+MAX_SECTION_WORKERS = 5
+
+# googleapiclient's default httplib2 transport is not thread-safe,
+# so each worker thread executes requests on its own Http instance.
+_thread_local = threading.local()
+
+def _thread_http():
+    if not hasattr(_thread_local, "http"):
+        _thread_local.http = httplib2.Http(timeout=15)
+    return _thread_local.http
+
 # Pydantic models for schema-driven JSON
 class VisualSummarySection(BaseModel):
     title: str
@@ -61,6 +82,7 @@ def llama_chat_completion(messages, temperature=1, max_tokens=1024):
     
     if not any("json" in m["content"].lower() for m in messages):
         messages = [{"role": "system", "content": "Please reply in valid JSON format."}] + messages
+    llm_rate_limiter.acquire()
     response = client.chat.completions.create(
         model=LLAMA_MODEL,
         messages=messages,
@@ -70,6 +92,26 @@ def llama_chat_completion(messages, temperature=1, max_tokens=1024):
     )
     return response.choices[0].message.content
 
+def youtube_search(q: str, **params) -> Optional[dict]:
+    """
+    Run a video search through the persistent result cache and quota meter.
+    Returns None when the quota is exhausted and nothing is cached.
+    """
+    def execute():
+        request = youtube_client.search().list(
+            part="id,snippet",
+            q=q,
+            type="video",
+            videoEmbeddable="true",  # Ensure videos can be embedded
+            videoSyndicated="true",  # Ensure videos are accessible
+            safeSearch="moderate",
+            **params
+        )
+        youtube_rate_limiter.acquire()
+        return request.execute(http=_thread_http())
+
+    return cached_search(q, execute, **params)
+
 def get_skill_tutorials(skill: str) -> List[dict]:
     """
     Get tutorials for a specific skill using YouTube Data API v3
@@ -86,18 +128,15 @@ def get_skill_tutorials(skill: str) -> List[dict]:
         ]
 
     try:
-        # Query YouTube Data API for videos
-        request = youtube_client.search().list(
-            part="id,snippet",
+        # Query YouTube Data API for videos (served from cache when possible)
+        response = youtube_search(
             q=f"{skill} tutorial",
-            type="video",
             maxResults=5,  # Fetch up to 5 videos to choose from
-            videoEmbeddable="true",  # Ensure videos can be embedded
-            videoSyndicated="true",  # Ensure videos are accessible
             order="relevance",  # Prioritize relevance
-            safeSearch="moderate"
         )
-        response = request.execute()
+        if response is None:
+            print(f"YouTube quota exhausted and no cached result for skill: {skill}. Returning fallback search URL.")
+            response = {}
 
         tutorials = []
         for item in response.get("items", []):
@@ -205,22 +244,16 @@ def generate_youtube_url(topic: str, section_content: str) -> str:
     # Use YouTube Data API to search for a specific video
     try:
         print(f"Searching YouTube with query: '{search_query}'")
-        request = youtube_client.search().list(
-            part="id,snippet",
+        response = youtube_search(
             q=search_query,
-            type="video",
             maxResults=3,  # Get top 3 results to choose from
-            videoEmbeddable="true",
-            videoSyndicated="true",
             order="relevance",
-            safeSearch="moderate",
             videoDuration="medium",  # Prefer medium duration videos (4-20 minutes)
             relevanceLanguage="en"  # Prefer English content
         )
-        response = request.execute()
 
         # Filter and select the best video
-        if response.get("items"):
+        if response and response.get("items"):
             for item in response["items"]:
                 video_id = item["id"]["videoId"]
                 title = item["snippet"]["title"].lower()
@@ -323,19 +356,8 @@ def generate_visual_summary_json(topic: str, rag: str, language: str = "en", gen
         else:
             raise ValueError("Empty response from LLM")
         print(f"Initial Summary: {json.dumps(summary.model_dump(), indent=2)}")
-        
-        if language != "en":
-            print(f"\n--- Translating Content to {language} ---")
-            summary.title = translate_text(summary.title, language)
-            print(f"Translated Title: {summary.title}")
-            for idx, section in enumerate(summary.sections):
-                print(f"\nTranslating Section {idx + 1}")
-                section.title = translate_text(section.title, language)
-                section.text = translate_text(section.text, language)
-                print(f"Section {idx + 1} Title: {section.title}")
-                print(f"Section {idx + 1} Text: {section.text}")
     except Exception as e:
-        print(f"\n!!! Error in Summary Generation/Translation: {e}")
+        print(f"\n!!! Error in Summary Generation: {e}")
         summary = VisualSummary(type="summary", title=f"Error generating summary for {topic}", sections=[])
 
     print("\n--- Setting up Asset Generation ---")
@@ -349,29 +371,23 @@ def generate_visual_summary_json(topic: str, rag: str, language: str = "en", gen
     audio_dir.mkdir(exist_ok=True)
     print("Audio directory created/verified")
 
-    # Process each section
-    print("\n=== Processing Sections ===")
-    for idx, section in enumerate(summary.sections):
+    def process_section(idx: int, section: VisualSummarySection):
         print(f"\n--- Processing Section {idx + 1}: '{section.title}' ---")
-        
-        # Assign YouTube video URL using YouTube Data API
-        print("Assigning YouTube Video URL...")
-        
-        # Create a more specific topic for this section by combining main topic with section title
+        # Search on the English text; YouTube relevance is tuned for English queries
         section_specific_topic = f"{topic} {section.title}"
-        print(f"Section-specific topic: '{section_specific_topic}'")
-        
-        # Add some delay between API calls to avoid rate limiting
-        if idx > 0:
-            time.sleep(1)
-        
         youtube_url = generate_youtube_url(section_specific_topic, section.text)
         print(f"YouTube URL for section {idx + 1}: {youtube_url}")
         section.imageUrl = youtube_url  # Store in imageUrl for compatibility
 
-        # Generate audio if requested
+        if language != "en":
+            try:
+                section.title = translate_text(section.title, language)
+                section.text = translate_text(section.text, language)
+            except Exception as e:
+                print(f"!!! Error translating section {idx + 1}: {e}")
+
+        section.audioUrl = ""
         if generate_audio:
-            print("\nGenerating Audio...")
             audio_filename = f"{unique_tag}_section_{idx+1}.wav"
             audio_path = audio_dir / audio_filename
             try:
@@ -382,14 +398,25 @@ def generate_visual_summary_json(topic: str, rag: str, language: str = "en", gen
                     language=language
                 )
                 section.audioUrl = f"/audio/{audio_filename}"
-                print(f"Audio Generation Successful")
-                print(f"Audio URL set: {section.audioUrl}")
+                print(f"Audio URL set for section {idx + 1}: {section.audioUrl}")
             except Exception as e:
-                print(f"!!! Error generating audio: {e}")
-                section.audioUrl = ""
-        else:
-            print("Skipping Audio Generation")
-            section.audioUrl = ""
+                print(f"!!! Error generating audio for section {idx + 1}: {e}")
+
+    # Fan out across sections; the shared rate limiters pace the upstream calls
+    print(f"\n=== Processing {len(summary.sections)} Sections Concurrently ===")
+    with ThreadPoolExecutor(max_workers=MAX_SECTION_WORKERS) as executor:
+        title_future = executor.submit(translate_text, summary.title, language) if language != "en" else None
+        futures = [executor.submit(process_section, idx, section) for idx, section in enumerate(summary.sections)]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"!!! Error processing section: {e}")
+        if title_future:
+            try:
+                summary.title = title_future.result()
+            except Exception as e:
+                print(f"!!! Error translating title: {e}")
 
     print("\n=== Summary Generation Complete ===")
     print(f"Final Summary: {json.dumps(summary.model_dump(), indent=2)}")
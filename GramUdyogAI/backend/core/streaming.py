@@ -0,0 +1,106 @@
+"""
+streaming.py: Server-Sent Events helpers for the slow, LLM-backed endpoints.
+
+A streaming endpoint wraps a producer coroutine that reports what it is doing
+through an emit(event, data) callback. Events are relayed to the client as they
+happen (stage changes, retrieved candidates, incremental LLM tokens) and the
+producer's return value is sent as the final "result" event, so clients on slow
+connections see progress within a second instead of waiting for the full JSON.
+"""
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+# Comment lines keep proxies and mobile networks from closing idle connections
+KEEPALIVE_SECONDS = 15
+
+Emit = Callable[[str, Any], None]
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def strip_json_fences(content: str) -> str:
+    """Remove markdown code fences around a JSON reply produced without JSON mode"""
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]
+    elif content.startswith("```"):
+        content = content[3:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return content.strip()
+
+
+async def stream_chat_completion(client, on_token: Callable[[str], None], **kwargs) -> str:
+    """
+    Run a streaming Groq chat completion in a worker thread, forwarding each
+    text delta to on_token on the event loop. Returns the full response text.
+    """
+    loop = asyncio.get_running_loop()
+
+    def run():
+        parts = []
+        for chunk in client.chat.completions.create(stream=True, **kwargs):
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                loop.call_soon_threadsafe(on_token, delta)
+        return "".join(parts)
+
+    return await asyncio.to_thread(run)
+
+
+def token_emitter(emit: Optional[Emit]) -> Optional[Callable[[str], None]]:
+    """Adapt an emit callback into an on_token callback (None when not streaming)"""
+    if emit is None:
+        return None
+    return lambda text: emit("token", {"text": text})
+
+
+def sse_response(producer: Callable[[Emit], Awaitable[Any]]) -> StreamingResponse:
+    """
+    Stream producer(emit) as Server-Sent Events. Every emit() becomes an event,
+    the return value becomes the final "result" event and failures an "error" event.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(event: str, data: Any = None):
+        queue.put_nowait((event, data))
+
+    async def run():
+        try:
+            emit("result", await producer(emit))
+        except Exception as e:
+            print(f"Streaming request failed: {e}")
+            emit("error", {"detail": getattr(e, "detail", str(e))})
+        finally:
+            queue.put_nowait(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                yield format_sse(*item)
+        finally:
+            # The client went away before the producer finished
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,14 @@
 import os
 from groq import Groq
-import tempfile
 import json
+import difflib
+import asyncio
+from functools import lru_cache
+from core.audio_segmentation import decode_audio, segment_on_silence, TARGET_SAMPLE_RATE
 from dotenv import load_dotenv, find_dotenv
+from core.metrics import instrument_groq, track_upstream
 # load_dotenv(find_dotenv())
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+client = instrument_groq(Groq(api_key=os.getenv("GROQ_API_KEY")), "profile_extraction")
 
 SUPPORTED_LANG_CODES = {
     "bengali": "bn",
@@ -109,21 +113,49 @@ SUPPORTED_LANG_CODES = {
     "telugu": "te",
 }
 
-def normalize_language(lang: str) -> str:
-    if not lang:
-        return "en"
-    lang = lang.strip().lower()
-    # Direct code
+# Native-script names and common spellings that users type or speak
+LANGUAGE_ALIASES = {
+    "हिन्दी": "hi", "हिंदी": "hi", "hindustani": "hi",
+    "বাংলা": "bn", "bangla": "bn",
+    "मराठी": "mr",
+    "తెలుగు": "te",
+    "தமிழ்": "ta", "tamizh": "ta",
+    "ગુજરાતી": "gu",
+    "اردو": "ur",
+    "ಕನ್ನಡ": "kn",
+    "മലയാളം": "ml",
+    "ਪੰਜਾਬੀ": "pa", "panjabi": "pa",
+    "অসমীয়া": "as", "asamiya": "as",
+    "farsi": "fa",
+    "mandarin": "zh",
+}
+
+def _match_language_locally(lang: str):
+    """Map a language name or code to a supported code without any network call"""
+    # Direct code, including regional variants such as "hi-IN" or "en_US"
     if lang in SUPPORTED_LANG_CODES.values():
         return lang
-    # Direct name
+    base = lang.replace("_", "-").split("-")[0]
+    if base in SUPPORTED_LANG_CODES.values():
+        return base
+    # Direct name or alias
     if lang in SUPPORTED_LANG_CODES:
         return SUPPORTED_LANG_CODES[lang]
+    if lang in LANGUAGE_ALIASES:
+        return LANGUAGE_ALIASES[lang]
     # Try to match by partial name
     for k, v in SUPPORTED_LANG_CODES.items():
         if lang in k:
             return v
-    # Use LLM to guess closest supported language code
+    # Fuzzy match to absorb typos and transliteration variants ("hindhi", "tamizh")
+    names = list(SUPPORTED_LANG_CODES) + list(LANGUAGE_ALIASES)
+    close = difflib.get_close_matches(lang, names, n=1, cutoff=0.75)
+    if close:
+        return SUPPORTED_LANG_CODES.get(close[0]) or LANGUAGE_ALIASES[close[0]]
+    return None
+
+@lru_cache(maxsize=256)
+def _guess_language_with_llm(lang: str) -> str:
     prompt = (
         f"Given the user input language '{lang}', map it to one of these supported codes: {list(SUPPORTED_LANG_CODES.values())}. "
         f"Return only the best matching code as a string."
@@ -148,51 +180,93 @@ def normalize_language(lang: str) -> str:
         return code
     return "en"
 
-def transcribe_audio(audio_file, language="en"):
-    # Save uploaded file to a temp file
-    print('Received audio file for transcription')
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-        tmp.write(audio_file.read())
-        tmp_path = tmp.name
-    print('Transcribing audio file:', tmp_path)
-    # Transcribe using Groq Whisper
-    print('Language code received: ', language)
-    language_code = normalize_language(language)
-    print('Mapped language code:', language_code)
-    with open(tmp_path, "rb") as f:
+def normalize_language(lang: str) -> str:
+    if not lang:
+        return "en"
+    lang = lang.strip().lower()
+    code = _match_language_locally(lang)
+    if code:
+        return code
+    # Last resort: use LLM to guess closest supported language code
+    try:
+        return _guess_language_with_llm(lang)
+    except Exception as e:
+        print(f"Language normalization fallback failed: {e}")
+        return "en"
+
+def _transcribe(audio_file, language_code: str, filename: str = "audio.webm") -> str:
+    """Send the upload stream straight to Whisper, without temp-file copies"""
+    if hasattr(audio_file, "seek"):
+        audio_file.seek(0)
+    with track_upstream("groq", "transcription"):
         transcription = client.audio.transcriptions.create(
-            file=(tmp_path, f.read()),
+            file=(filename or "audio.webm", audio_file),
             model="whisper-large-v3",
             language=language_code,
             response_format="json",
             temperature=0.5
         )
-    text = transcription.text
-    print('Transcription result:', text)
-    os.remove(tmp_path)
-    return {"text": text}
+    return transcription.text
 
-def transcribe_audio_and_extract_profile(audio_file, language="en"):
-    # Save uploaded file to a temp file
+def transcribe_audio(audio_file, language="en", filename="audio.webm"):
     print('Received audio file for transcription')
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-        tmp.write(audio_file.read())
-        tmp_path = tmp.name
-    print('Transcribing audio file:', tmp_path)
     # Transcribe using Groq Whisper
     print('Language code received: ', language)
     language_code = normalize_language(language)
     print('Mapped language code:', language_code)
-    with open(tmp_path, "rb") as f:
-        transcription = client.audio.transcriptions.create(
-            file=(tmp_path, f.read()),
-            model="whisper-large-v3",
-            language=language_code,
-            response_format="json",
-            temperature=0.5
-        )
-    text = transcription.text
+    text = _transcribe(audio_file, language_code, filename)
+    print('Transcription result:', text)
+    return {"text": text}
+
+# Concurrent Whisper uploads per chunked request
+MAX_PARALLEL_SEGMENTS = 4
+
+async def transcribe_audio_chunked(audio_file, language="en", filename="audio.webm"):
+    """
+    Split a long recording on silence, transcribe the segments concurrently and
+    stitch the results back together with segment timestamps.
+    Falls back to a single upload when the audio cannot be decoded locally.
+    """
+    language_code = normalize_language(language)
+    if hasattr(audio_file, "seek"):
+        audio_file.seek(0)
+    data = audio_file.read()
+    samples = await asyncio.to_thread(decode_audio, data)
+    segments = await asyncio.to_thread(segment_on_silence, samples) if samples is not None else []
+    if len(segments) <= 1:
+        text = await asyncio.to_thread(_transcribe, data, language_code, filename)
+        duration = round(len(samples) / TARGET_SAMPLE_RATE, 2) if samples is not None else None
+        return {"text": text, "segments": [{"start": 0.0, "end": duration, "text": text}]}
+
+    print(f'Transcribing {len(segments)} segments concurrently')
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_SEGMENTS)
+
+    async def transcribe_segment(idx, segment):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(
+                    _transcribe, segment.to_wav_bytes(), language_code, f"segment_{idx}.wav"
+                )
+            except Exception as e:
+                print(f"Error transcribing segment {idx}: {e}")
+                return None
+
+    texts = await asyncio.gather(*(transcribe_segment(i, seg) for i, seg in enumerate(segments)))
+    if all(text is None for text in texts):
+        raise Exception("Could not transcribe any segment of the recording")
+    stitched = [
+        {"start": round(seg.start, 2), "end": round(seg.end, 2), "text": text.strip()}
+        for seg, text in zip(segments, texts) if text and text.strip()
+    ]
+    text = " ".join(item["text"] for item in stitched)
     print('Transcription result:', text)
+    return {"text": text, "segments": stitched}
+
+def transcribe_audio_and_extract_profile(audio_file, language="en", filename="audio.webm"):
+    text = transcribe_audio(audio_file, language, filename)["text"]
+    return extract_profile_from_transcript(text)
+
+def extract_profile_from_transcript(text: str) -> dict:
 
     # Available options for mapping
     INDIAN_STATES = [
@@ -248,6 +322,4 @@ def transcribe_audio_and_extract_profile(audio_file, language="en"):
     except Exception as e:
         profile_data = {}
         print('Error parsing JSON:', e)
-    # Clean up temp file
-    os.remove(tmp_path)
     return profile_data
@@ -3,11 +3,15 @@ import os
 from dotenv import load_dotenv, find_dotenv
 import json
 import time
+from core.metrics import instrument_groq
 # os.environ.pop("GROQ_API_KEY", None)
 # load_dotenv(find_dotenv())
 api_key = os.getenv("GROQ_API_KEY")
 
-client = Groq(api_key=api_key)
+_groq = Groq(api_key=api_key)
+client = instrument_groq(_groq, "translation")
+chat_client = instrument_groq(_groq, "chat_completion")
+summary_client = instrument_groq(_groq, "short_summary")
 
 LLAMA_MODEL = "llama-3.3-70b-versatile"
 
@@ -15,7 +19,7 @@ def llama_chat_completion(messages, temperature=1, max_tokens=1500):
     # Ensure at least one message contains "json"
     if not any("json" in m["content"].lower() for m in messages):
         messages = [{"role": "system", "content": "Please reply in valid JSON format."}] + messages
-    response = client.chat.completions.create(
+    response = chat_client.chat.completions.create(
         model=LLAMA_MODEL,
         messages=messages,
         temperature=temperature,
@@ -244,7 +248,7 @@ def generate_short_summary(items, user_info, item_type, target_language):
     )
     
     try:
-        response = client.chat.completions.create(
+        response = summary_client.chat.completions.create(
             model="llama-3.3-70b-versatile",
             messages=[
                 {"role": "system", "content": f"You are a helpful assistant that provides brief summaries."},
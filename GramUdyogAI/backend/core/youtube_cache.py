@@ -0,0 +1,158 @@
+"""
+youtube_cache.py: Persistent cache and daily quota meter for YouTube Data API searches.
+
+Every search.list call costs 100 quota units out of a default daily budget of
+10,000. Results are cached in SQLite keyed by the normalized query plus search
+parameters, and each live call reserves its units up front. Once the budget
+(minus a safety reserve) is spent, searches are served from stale cache entries
+or return None so callers fall back to plain search URLs.
+"""
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from zoneinfo import ZoneInfo
+
+from init_db import get_db
+from core.metrics import Gauge, record_cache, track_upstream
+
+SEARCH_COST_UNITS = 100
+DAILY_QUOTA_UNITS = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+QUOTA_RESERVE_UNITS = int(os.getenv("YOUTUBE_QUOTA_RESERVE", "500"))
+CACHE_TTL_SECONDS = int(os.getenv("YOUTUBE_CACHE_TTL_HOURS", "72")) * 3600
+
+# YouTube quotas reset at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stale_hits": 0, "quota_fallbacks": 0, "errors": 0}
+# Stats that are also exported as cache_lookups_total results
+_CACHE_RESULTS = {"hits": "hit", "misses": "miss", "stale_hits": "stale"}
+
+
+def _count(stat: str):
+    with _stats_lock:
+        _stats[stat] += 1
+    if stat in _CACHE_RESULTS:
+        record_cache("youtube_search", _CACHE_RESULTS[stat])
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so equivalent queries share a key"""
+    query = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(query.split())
+
+
+def make_cache_key(query: str, **params) -> str:
+    extras = "&".join(f"{k}={params[k]}" for k in sorted(params))
+    return f"{normalize_query(query)}|{extras}"
+
+
+def _quota_day() -> str:
+    return datetime.now(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+
+def get_units_used(day: Optional[str] = None) -> int:
+    conn = get_db()
+    row = conn.execute(
+        "SELECT units_used FROM youtube_quota_usage WHERE day = ?", (day or _quota_day(),)
+    ).fetchone()
+    conn.close()
+    return row["units_used"] if row else 0
+
+
+def reserve_quota(units: int = SEARCH_COST_UNITS) -> bool:
+    """Atomically reserve units for a live call; False when the budget is exhausted"""
+    day = _quota_day()
+    limit = DAILY_QUOTA_UNITS - QUOTA_RESERVE_UNITS
+    conn = get_db()
+    try:
+        conn.execute("INSERT OR IGNORE INTO youtube_quota_usage (day, units_used) VALUES (?, 0)", (day,))
+        cursor = conn.execute(
+            "UPDATE youtube_quota_usage SET units_used = units_used + ? WHERE day = ? AND units_used + ? <= ?",
+            (units, day, units, limit)
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def _read_cache(key: str):
+    conn = get_db()
+    row = conn.execute(
+        "SELECT response_json, fetched_at FROM youtube_search_cache WHERE query_key = ?", (key,)
+    ).fetchone()
+    conn.close()
+    if not row:
+        return None, None
+    return json.loads(row["response_json"]), row["fetched_at"]
+
+
+def _write_cache(key: str, response: dict):
+    conn = get_db()
+    conn.execute(
+        "INSERT OR REPLACE INTO youtube_search_cache (query_key, response_json, fetched_at) VALUES (?, ?, ?)",
+        (key, json.dumps(response, ensure_ascii=False), time.time())
+    )
+    conn.commit()
+    conn.close()
+
+
+def cached_search(query: str, execute: Callable[[], dict], **params) -> Optional[dict]:
+    """
+    Return the search response for query/params, calling execute() only on a
+    cache miss and only if quota is left. Returns None when nothing can be served.
+    """
+    key = make_cache_key(query, **params)
+    cached, fetched_at = _read_cache(key)
+    if cached is not None and time.time() - fetched_at < CACHE_TTL_SECONDS:
+        _count("hits")
+        return cached
+
+    _count("misses")
+    if not reserve_quota():
+        _count("quota_fallbacks")
+        if cached is not None:
+            _count("stale_hits")
+            print(f"YouTube quota nearly exhausted; serving stale cache for '{query}'")
+            return cached
+        print(f"YouTube quota nearly exhausted; no cached result for '{query}'")
+        return None
+
+    try:
+        with track_upstream("youtube", "search"):
+            response = execute()
+    except Exception:
+        _count("errors")
+        if cached is not None:
+            _count("stale_hits")
+            return cached
+        raise
+    _write_cache(key, response)
+    return response
+
+
+def get_youtube_cache_metrics() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    units_used = get_units_used()
+    return {
+        **stats,
+        "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        "quota_day": _quota_day(),
+        "quota_units_used": units_used,
+        "quota_units_remaining": max(0, DAILY_QUOTA_UNITS - units_used),
+        "quota_daily_limit": DAILY_QUOTA_UNITS,
+        "quota_reserve": QUOTA_RESERVE_UNITS,
+    }
+
+
+Gauge(
+    "youtube_quota_units_remaining", "YouTube Data API quota units left today", (),
+    lambda: [((), max(0, DAILY_QUOTA_UNITS - get_units_used()))]
+)
@@ -1,17 +1,26 @@
 import yt_dlp
 import tempfile
 import os
+import asyncio
 from groq import Groq
 from pydantic import BaseModel, ValidationError
 from core.audio_generation import TextToSpeech
+from init_db import get_db
+from core.metrics import instrument_groq, record_cache, track_upstream
 import json
 import re
 from dotenv import load_dotenv, find_dotenv
 # load_dotenv(find_dotenv())
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-groq_client = Groq(api_key=GROQ_API_KEY)
+groq_client = instrument_groq(Groq(api_key=GROQ_API_KEY), "youtube_summary")
 tts = TextToSpeech()
 
+SUMMARY_MODEL = "llama-3.3-70b-versatile"
+# Rough token budget per map-step chunk (~4 characters per token)
+CHUNK_TOKEN_BUDGET = 3000
+CHARS_PER_TOKEN = 4
+MAX_PARALLEL_CHUNKS = 4
+
 class YoutubeInsight(BaseModel):
     timestamp: str
     text: str
@@ -20,35 +29,135 @@ class YoutubeSummary(BaseModel):
     youtube_url: str
     insights: list[YoutubeInsight]
 
+def extract_video_id(youtube_url: str) -> str:
+    match = re.search(r"(?:v=|youtu\.be/|shorts/|embed/)([A-Za-z0-9_-]{11})", youtube_url)
+    if not match:
+        raise Exception("Invalid YouTube URL")
+    return match.group(1)
+
+def get_cached_transcript(video_id: str):
+    conn = get_db()
+    row = conn.execute(
+        "SELECT transcript FROM youtube_transcripts WHERE video_id = ?", (video_id,)
+    ).fetchone()
+    conn.close()
+    return json.loads(row["transcript"]) if row else None
+
+def set_cached_transcript(video_id: str, transcript: list):
+    conn = get_db()
+    conn.execute(
+        "INSERT OR REPLACE INTO youtube_transcripts (video_id, transcript) VALUES (?, ?)",
+        (video_id, json.dumps(transcript, ensure_ascii=False))
+    )
+    conn.commit()
+    conn.close()
+
+def get_cached_summary(video_id: str, language: str):
+    conn = get_db()
+    row = conn.execute(
+        "SELECT summary_json FROM youtube_summaries WHERE video_id = ? AND language = ?",
+        (video_id, language)
+    ).fetchone()
+    conn.close()
+    return json.loads(row["summary_json"]) if row else None
+
+def set_cached_summary(video_id: str, language: str, summary: dict):
+    conn = get_db()
+    conn.execute(
+        "INSERT OR REPLACE INTO youtube_summaries (video_id, language, summary_json) VALUES (?, ?, ?)",
+        (video_id, language, json.dumps(summary, ensure_ascii=False))
+    )
+    conn.commit()
+    conn.close()
+
 def extract_youtube_transcript(youtube_url):
-    import requests
     from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-    video_id = None
-    # Extract video ID from URL
-    match = re.search(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{11})", youtube_url)
-    if match:
-        video_id = match.group(1)
-    if not video_id:
-        raise Exception("Invalid YouTube URL")
+    video_id = extract_video_id(youtube_url)
+    cached = get_cached_transcript(video_id)
+    if cached is not None:
+        print(f"Transcript cache hit for {video_id}")
+        record_cache("youtube_transcript", "hit")
+        return cached
+    record_cache("youtube_transcript", "miss")
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
+        with track_upstream("youtube", "transcript"):
+            transcript = YouTubeTranscriptApi.get_transcript(video_id)
         # transcript: list of dicts with 'text', 'start', 'duration'
-        return transcript
     except (TranscriptsDisabled, NoTranscriptFound):
         raise Exception("Transcript not available for this video")
+    transcript = [
+        {"text": entry["text"], "start": entry["start"], "duration": entry.get("duration", 0)}
+        for entry in transcript
+    ]
+    set_cached_transcript(video_id, transcript)
+    return transcript
 
-def summarize_youtube_video(youtube_url, language="en"):
-    transcript = extract_youtube_transcript(youtube_url)
-    print(transcript)
-    print(language)
-    # Join transcript into text with timestamps
-    transcript_text = ""
+def format_transcript_lines(transcript) -> list:
+    lines = []
     for entry in transcript:
         mins = int(entry['start'] // 60)
         secs = int(entry['start'] % 60)
-        timestamp = f"{mins:02d}:{secs:02d}"
-        transcript_text += f"[{timestamp}] {entry['text']}\n"
+        lines.append(f"[{mins:02d}:{secs:02d}] {entry['text']}")
+    return lines
 
+def chunk_transcript(lines: list, token_budget: int = CHUNK_TOKEN_BUDGET) -> list:
+    """Group timestamped lines into chunks that fit the per-call token budget"""
+    max_chars = token_budget * CHARS_PER_TOKEN
+    chunks, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def _parse_insights(content) -> list:
+    try:
+        summary_json = json.loads(content)
+        # Validate with Pydantic for safety
+        return [YoutubeInsight(**ins) for ins in summary_json.get("insights", [])]
+    except (ValidationError, Exception) as e:
+        print(f"Error parsing/validating LLM output: {e}")
+        return []
+
+def _complete_json(prompt: str) -> str:
+    response = groq_client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+    )
+    return response.choices[0].message.content
+
+def extract_chunk_insights(chunk_text: str, part: int, total: int) -> list:
+    """Map step: pull candidate insights (in English) out of one transcript chunk"""
+    prompt = (
+        f"You are an assistant that extracts actionable insights from part {part} of {total} of a YouTube video transcript. "
+        f"List the 3-6 most important points in this part, each with the timestamp where it is discussed. "
+        f"Respond ONLY in valid JSON using this schema:\n"
+        f'{{"insights": [{{"timestamp": "mm:ss", "text": "..."}}]}}\n\n'
+        f"Transcript part:\n{chunk_text}"
+    )
+    return _parse_insights(_complete_json(prompt))
+
+def reduce_insights(candidates: list, language: str) -> list:
+    """Reduce step: merge the per-chunk insights into the final 5-10, in the target language"""
+    candidate_text = "\n".join(f"[{ins.timestamp}] {ins.text}" for ins in candidates)
+    prompt = (
+        f"You are an assistant that summarizes YouTube videos into actionable insights with timestamps. "
+        f"Below are candidate insights extracted from consecutive parts of one video. Merge duplicates and "
+        f"select the 5-10 most important points overall, keeping each point's timestamp reference. "
+        f"Summarize in {language} and ensure the output text is in the correct script for that language "
+        f"(e.g., Devanagari for Hindi, Tamil script for Tamil, etc.) so it can be directly used for TTS. "
+        f"Respond ONLY in valid JSON using this schema:\n"
+        f'{{"insights": [{{"timestamp": "mm:ss", "text": "..."}}]}}\n\n'
+        f"Candidate insights:\n{candidate_text}"
+    )
+    return _parse_insights(_complete_json(prompt))
+
+def summarize_transcript_directly(transcript_text: str, language: str) -> list:
     # Summarize using LLM, instructing to use the correct script for the language
     prompt = (
         f"You are an assistant that summarizes YouTube videos into actionable insights with timestamps. "
@@ -59,20 +168,42 @@ def summarize_youtube_video(youtube_url, language="en"):
         f'{{"insights": [{{"timestamp": "mm:ss", "text": "..."}}]}}\n\n'
         f"Transcript:\n{transcript_text}"
     )
-    response = groq_client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[{"role": "user", "content": prompt}],
-        response_format={"type": "json_object"},
-    )
-    content = response.choices[0].message.content
-    print(content)
-    try:
-        summary_json = json.loads(content)
-        # Validate with Pydantic for safety
-        insights = [YoutubeInsight(**ins) for ins in summary_json.get("insights", [])]
-    except (ValidationError, Exception) as e:
-        print(f"Error parsing/validating LLM output: {e}")
-        insights = []
+    return _parse_insights(_complete_json(prompt))
+
+async def summarize_youtube_video(youtube_url, language="en"):
+    video_id = extract_video_id(youtube_url)
+    cached = get_cached_summary(video_id, language)
+    if cached is not None:
+        print(f"Summary cache hit for {video_id} ({language})")
+        record_cache("youtube_summary", "hit")
+        return {**cached, "youtube_url": youtube_url}
+    record_cache("youtube_summary", "miss")
+
+    transcript = await asyncio.to_thread(extract_youtube_transcript, youtube_url)
+    chunks = chunk_transcript(format_transcript_lines(transcript))
+    print(f"Summarizing {video_id} in {language}: {len(chunks)} transcript chunk(s)")
+
+    if len(chunks) <= 1:
+        insights = await asyncio.to_thread(summarize_transcript_directly, chunks[0] if chunks else "", language)
+    else:
+        # Map: extract candidate insights from every chunk concurrently
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_CHUNKS)
+
+        async def map_chunk(idx, chunk_text):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(extract_chunk_insights, chunk_text, idx + 1, len(chunks))
+                except Exception as e:
+                    print(f"Error extracting insights from chunk {idx + 1}: {e}")
+                    return []
+
+        partials = await asyncio.gather(*(map_chunk(i, c) for i, c in enumerate(chunks)))
+        candidates = [ins for part in partials for ins in part]
+        if not candidates:
+            # Nothing to reduce; asking the LLM anyway would only invent insights
+            raise Exception("Could not extract insights from any part of the transcript")
+        # Reduce: pick the final insights and write them in the target language
+        insights = await asyncio.to_thread(reduce_insights, candidates, language)
 
     # Generate audio for each insight
     audio_files = []
@@ -82,12 +213,16 @@ def summarize_youtube_video(youtube_url, language="en"):
         audio_path = os.path.join("audio", language, audio_filename)
         os.makedirs(os.path.dirname(audio_path), exist_ok=True)
         try:
-            tts.generate_audio(text=text, output_path=audio_path, language=language)
+            await asyncio.to_thread(tts.generate_audio, text=text, output_path=audio_path, language=language)
             audio_files.append({"timestamp": insight.timestamp, "text": text, "audio": audio_filename})
         except Exception as e:
             audio_files.append({"timestamp": insight.timestamp, "text": text, "audio": None, "error": str(e)})
 
-    return {
+    result = {
         "youtube_url": youtube_url,
         "insights": audio_files
     }
+    # Only cache complete summaries so failed runs are retried
+    if insights and all(item.get("audio") for item in audio_files):
+        set_cached_summary(video_id, language, result)
+    return result
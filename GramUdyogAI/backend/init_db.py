@@ -3,13 +3,118 @@ from datetime import datetime, timedelta
 import json
 import logging
 
+from core.metrics import InstrumentedConnection
+
 logger = logging.getLogger(__name__)
 
 def get_db():
-    conn = sqlite3.connect('gramudyogai.db')
+    conn = sqlite3.connect('gramudyogai.db', factory=InstrumentedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
+# Normalized (entity_id, tag) side tables mirroring JSON list columns:
+# table -> (source table, entity id column, JSON column). services.tags keeps
+# them in sync on write and answers skill/tag filters from them.
+TAG_TABLES = {
+    'job_skills': ('job_postings', 'id', 'skills_required'),
+    'job_tags': ('job_postings', 'id', 'tags'),
+    'course_tags': ('courses', 'id', 'tags'),
+    'event_skills': ('events', 'id', 'skills_required'),
+    'profile_skills': ('unified_profiles', 'user_id', 'skills'),
+    'project_technologies': ('projects', 'id', 'technologies'),
+}
+
+# visual_summary_sections column -> key of a section in a visual summary's JSON;
+# summary_data keeps only the summary's own fields once its sections are split out
+SUMMARY_SECTION_FIELDS = {
+    'title': 'title',
+    'text': 'text',
+    'image_url': 'imageUrl',
+    'audio_url': 'audioUrl',
+}
+
+# Tables behind the HTTP-cached catalog endpoints (services/http_cache.py):
+# triggers bump their row in data_versions on every insert, update or delete
+VERSIONED_TABLES = ('job_postings', 'courses')
+
+# Declarative index manifest: (index name, table, columns). Applied on every
+# start by init_database() and migrate_database_schema(); indexes whose table or
+# columns do not exist yet are skipped until a later migration adds them.
+# Project_Deliverable/Testing/tests/test_query_plans.py checks that the hot
+# queries actually use these.
+INDEX_MANIFEST = [
+    # Jobs and courses
+    ('idx_job_title', 'job_postings', ('job_title',)),
+    ('idx_job_title_legacy', 'job_postings', ('title',)),
+    ('idx_job_company', 'job_postings', ('company',)),
+    ('idx_job_location', 'job_postings', ('location',)),
+    ('idx_job_industry', 'job_postings', ('industry',)),
+    ('idx_job_status', 'job_postings', ('job_status',)),
+    ('idx_course_name', 'courses', ('name',)),
+    ('idx_course_category', 'courses', ('category',)),
+    ('idx_course_enrollment_user', 'course_enrollments', ('user_id',)),
+    ('idx_job_application_user', 'job_applications', ('user_id',)),
+    # Users and content
+    ('idx_user_skill', 'user_skills', ('user_id',)),
+    ('idx_skill_name', 'user_skills', ('skill_name',)),
+    ('idx_achievement_user', 'achievements', ('user_id',)),
+    ('idx_summary_lang', 'summary_translations', ('language',)),
+    ('idx_audio_lang', 'audio_files', ('language',)),
+    ('idx_visual_summary_created', 'visual_summaries', ('created_at', 'id', 'topic')),
+    # Events and participants
+    ('idx_event_organizer', 'events', ('organizer_id', 'organizer_type')),
+    ('idx_event_status_start', 'events', ('status', 'start_date')),
+    ('idx_event_status_end', 'events', ('status', 'end_date')),
+    ('idx_event_type', 'events', ('event_type',)),
+    ('idx_event_creator_created', 'events', ('created_by', 'created_at')),
+    ('idx_participant_user_joined', 'event_participants', ('user_id', 'joined_at')),
+    # Projects and investments
+    ('idx_project_event', 'projects', ('event_id',)),
+    ('idx_project_creator_created', 'projects', ('created_by', 'created_at')),
+    ('idx_team_project', 'project_team_members', ('project_id',)),
+    ('idx_team_member_user', 'project_team_members', ('user_id',)),
+    ('idx_social_event', 'social_media_posts', ('event_id',)),
+    ('idx_investment_project_invested', 'project_investments', ('project_id', 'invested_at')),
+    ('idx_investment_investor_invested', 'project_investments', ('investor_id', 'invested_at')),
+    ('idx_investment_status', 'project_investments', ('status',)),
+    # Notifications: list by user, optionally unread-only or of one type, newest first
+    ('idx_notification_user_created', 'notifications', ('user_id', 'created_at')),
+    ('idx_notification_user_unread', 'notifications', ('user_id', 'is_read', 'created_at')),
+    ('idx_notification_user_type', 'notifications', ('user_id', 'notification_type', 'created_at')),
+    # Skill/tag side tables: lookups by tag (the primary key covers entity_id)
+    ('idx_job_skills_tag', 'job_skills', ('tag', 'entity_id')),
+    ('idx_job_tags_tag', 'job_tags', ('tag', 'entity_id')),
+    ('idx_course_tags_tag', 'course_tags', ('tag', 'entity_id')),
+    ('idx_event_skills_tag', 'event_skills', ('tag', 'entity_id')),
+    ('idx_profile_skills_tag', 'profile_skills', ('tag', 'entity_id')),
+    ('idx_project_technologies_tag', 'project_technologies', ('tag', 'entity_id')),
+]
+
+# Indexes superseded by a composite index above or by a UNIQUE constraint
+OBSOLETE_INDEXES = [
+    'idx_event_status',
+    'idx_event_created_by',
+    'idx_participant_event',
+    'idx_participant_event_user',
+    'idx_participant_user',
+    'idx_investment_project',
+    'idx_investment_investor',
+    'idx_notification_user',
+]
+
+def apply_index_manifest(cursor):
+    """Create the indexes in INDEX_MANIFEST and drop the ones they supersede"""
+    table_columns = {}
+    for name, table, columns in INDEX_MANIFEST:
+        if table not in table_columns:
+            cursor.execute(f"PRAGMA table_info({table})")
+            table_columns[table] = {col[1] for col in cursor.fetchall()}
+        if not set(columns) <= table_columns[table]:
+            continue
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+    for name in OBSOLETE_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
 def migrate_database_schema():
     """Migrate existing database to new schema if needed"""
     conn = get_db()
@@ -80,10 +185,7 @@ def migrate_database_schema():
             )
             ''')
             
-            # Create indexes for the new table
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_project ON project_investments (project_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_investor ON project_investments (investor_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_status ON project_investments (status)')
+            # Indexes for the new table come from INDEX_MANIFEST below
         else:
             # Table exists, check if it has all required columns
             cursor.execute("PRAGMA table_info(project_investments)")
@@ -121,10 +223,7 @@ def migrate_database_schema():
                 )
                 ''')
                 
-                # Create indexes for the new table
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_project ON project_investments (project_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_investor ON project_investments (investor_id)')
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_status ON project_investments (status)')
+                # Indexes for the new table come from INDEX_MANIFEST below
                 
                 logger.info("Recreated project_investments table with correct schema")
             else:
@@ -161,6 +260,62 @@ def migrate_database_schema():
                 if 'response_at' not in investment_columns:
                     cursor.execute('ALTER TABLE project_investments ADD COLUMN response_at TEXT')
         
+        # event_participants created before UNIQUE(event_id, user_id): drop duplicate
+        # registrations, resync the seat counters and add the unique index
+        cursor.execute("PRAGMA index_list(event_participants)")
+        has_unique_participant = False
+        for index in cursor.fetchall():
+            if index[2]:
+                cursor.execute(f"PRAGMA index_info({index[1]})")
+                if [col[2] for col in cursor.fetchall()] == ['event_id', 'user_id']:
+                    has_unique_participant = True
+        if not has_unique_participant:
+            cursor.execute('''
+                DELETE FROM event_participants WHERE id NOT IN (
+                    SELECT MIN(id) FROM event_participants GROUP BY event_id, user_id
+                )
+            ''')
+            cursor.execute('''
+                UPDATE events SET current_participants = (
+                    SELECT COUNT(*) FROM event_participants WHERE event_id = events.id
+                )
+            ''')
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_participant_unique ON event_participants (event_id, user_id)')
+            logger.info("Added UNIQUE(event_id, user_id) to event_participants")
+
+        # Backfill skill/tag side tables that are still empty
+        from services.tags import rebuild_tag_table
+        for table in TAG_TABLES:
+            cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+            if not cursor.fetchone():
+                rebuild_tag_table(cursor, table)
+
+        # Move sections of visual summaries stored as one JSON blob into visual_summary_sections
+        cursor.execute("SELECT id, summary_data FROM visual_summaries WHERE summary_data LIKE '%\"sections\"%'")
+        legacy_summaries = cursor.fetchall()
+        for summary_id, summary_data in legacy_summaries:
+            try:
+                data = json.loads(summary_data)
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(data, dict) or not isinstance(data.get('sections'), list):
+                continue
+            sections = data.pop('sections')
+            cursor.execute("DELETE FROM visual_summary_sections WHERE summary_id = ?", (summary_id,))
+            cursor.executemany(
+                f"INSERT INTO visual_summary_sections (summary_id, position, {', '.join(SUMMARY_SECTION_FIELDS)}) "
+                f"VALUES (?, ?{', ?' * len(SUMMARY_SECTION_FIELDS)})",
+                [
+                    (summary_id, position, *(str(section.get(key) or '') for key in SUMMARY_SECTION_FIELDS.values()))
+                    for position, section in enumerate(sections) if isinstance(section, dict)
+                ]
+            )
+            cursor.execute("UPDATE visual_summaries SET summary_data = ? WHERE id = ?", (json.dumps(data), summary_id))
+        if legacy_summaries:
+            logger.info(f"Split sections out of {len(legacy_summaries)} visual summaries")
+
+        apply_index_manifest(cursor)
+
         conn.commit()
         logger.info("Database schema migration completed successfully")
         
@@ -231,7 +386,8 @@ CREATE TABLE IF NOT EXISTS events (
         status TEXT DEFAULT 'registered',
         joined_at TEXT NOT NULL,
         FOREIGN KEY (event_id) REFERENCES events (id),
-        FOREIGN KEY (user_id) REFERENCES users (id)
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        UNIQUE(event_id, user_id) -- one registration per user per event
     )''')
 
     cursor.execute('''
@@ -362,6 +518,22 @@ CREATE TABLE IF NOT EXISTS notifications (
 )
 ''')
     
+    # Per-user, per-type notification counters maintained alongside every notification write
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS notification_counters (
+        user_id INTEGER NOT NULL,
+        notification_type TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        unread INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, notification_type)
+    )''')
+    if cursor.execute("SELECT COUNT(*) FROM notification_counters").fetchone()[0] == 0:
+        cursor.execute('''
+            INSERT INTO notification_counters (user_id, notification_type, total, unread)
+            SELECT user_id, notification_type, COUNT(*), SUM(CASE WHEN is_read = 0 THEN 1 ELSE 0 END)
+            FROM notifications GROUP BY user_id, notification_type
+        ''')
+    
     # Skills & Learning Domain
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS visual_summaries (
@@ -381,6 +553,20 @@ CREATE TABLE IF NOT EXISTS notifications (
         FOREIGN KEY (summary_id) REFERENCES visual_summaries(id)
     )''')
 
+    # One row per visual summary section, so updating one section's audio URL
+    # touches a single row instead of rewriting the summary's JSON
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS visual_summary_sections (
+        summary_id INTEGER NOT NULL,
+        position INTEGER NOT NULL, -- index in the summary's sections list
+        title TEXT NOT NULL DEFAULT '',
+        text TEXT NOT NULL DEFAULT '',
+        image_url TEXT NOT NULL DEFAULT '',
+        audio_url TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (summary_id, position),
+        FOREIGN KEY (summary_id) REFERENCES visual_summaries(id)
+    ) WITHOUT ROWID''')
+
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS audio_files (
         text_hash TEXT,
@@ -389,7 +575,77 @@ CREATE TABLE IF NOT EXISTS notifications (
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         PRIMARY KEY (text_hash, language)
     )''')
-    
+
+    # YouTube summary caches
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS youtube_transcripts (
+        video_id TEXT PRIMARY KEY,
+        transcript TEXT NOT NULL, -- JSON array of {text, start, duration}
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS youtube_summaries (
+        video_id TEXT,
+        language TEXT,
+        summary_json TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (video_id, language)
+    )''')
+
+    # YouTube Data API search cache and daily quota accounting
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS youtube_search_cache (
+        query_key TEXT PRIMARY KEY, -- normalized query + search parameters
+        response_json TEXT NOT NULL,
+        fetched_at REAL NOT NULL -- unix timestamp, used for TTL checks
+    )''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS youtube_quota_usage (
+        day TEXT PRIMARY KEY, -- quota day in Pacific time (YYYY-MM-DD)
+        units_used INTEGER NOT NULL DEFAULT 0
+    )''')
+
+    # Per-user dashboard cache; replaces an earlier table keyed on a single global profile id
+    cursor.execute("PRAGMA table_info(dashboard_cache)")
+    dashboard_cache_columns = [col[1] for col in cursor.fetchall()]
+    if dashboard_cache_columns and 'profile_hash' not in dashboard_cache_columns:
+        cursor.execute('DROP TABLE dashboard_cache')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS dashboard_cache (
+        user_id INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        profile_hash TEXT NOT NULL, -- hash of the profile fields the dashboard is built from
+        profile_json TEXT NOT NULL, -- profile used, replayed by the background refresher
+        dashboard_json TEXT, -- NULL once invalidated by a profile change
+        created_at REAL NOT NULL, -- unix timestamp of dashboard_json, used for TTL checks
+        last_requested_at REAL NOT NULL,
+        PRIMARY KEY (user_id, language),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+
+    # AI assistant intent routing: decision log and labelled examples grown from it
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS intent_routing_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text TEXT NOT NULL,
+        function_name TEXT, -- function that was finally called
+        local_intent TEXT, -- best guess of the local classifier
+        confidence REAL,
+        source TEXT NOT NULL, -- local, llm
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS intent_examples (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text TEXT NOT NULL,
+        function_name TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(text, function_name)
+    )''')
+
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS job_postings (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -554,55 +810,42 @@ CREATE TABLE IF NOT EXISTS notifications (
         UNIQUE(project_id, investor_id) -- one investment per investor per project
     )''')
 
-    # Additional indexes for performance
-    # Check if columns exist before creating indexes
-    cursor.execute("PRAGMA table_info(job_postings)")
-    job_columns = [col[1] for col in cursor.fetchall()]
-    
-    if 'job_title' in job_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_title ON job_postings (job_title)')
-    if 'title' in job_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_title_legacy ON job_postings (title)')
-    if 'company' in job_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_company ON job_postings (company)')
-    if 'location' in job_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_location ON job_postings (location)')
-    if 'industry' in job_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_industry ON job_postings (industry)')
-    if 'job_status' in job_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_status ON job_postings (job_status)')
-    
-    # Check if courses table exists and create indexes
-    cursor.execute("PRAGMA table_info(courses)")
-    course_columns = [col[1] for col in cursor.fetchall()]
-    
-    if 'name' in course_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_course_name ON courses (name)')
-    if 'category' in course_columns:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_course_category ON courses (category)')
-    
-    # Other indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_course_enrollment_user ON course_enrollments (user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_application_user ON job_applications (user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_skill ON user_skills (user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_skill_name ON user_skills (skill_name)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_achievement_user ON achievements (user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_summary_lang ON summary_translations (language)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_audio_lang ON audio_files (language)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_organizer ON events (organizer_id, organizer_type)')
-    # Create performance indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_status ON events (status)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_created_by ON events (created_by)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_event_type ON events (event_type)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_participant_event ON event_participants (event_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_participant_user ON event_participants (user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_project_event ON projects (event_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_team_project ON project_team_members (project_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_notification_user ON notifications (user_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_social_event ON social_media_posts (event_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_project ON project_investments (project_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_investor ON project_investments (investor_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_investment_status ON project_investments (status)')
+    # Skill/tag side tables, one row per (entity, normalized tag)
+    for table in TAG_TABLES:
+        cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            entity_id INTEGER NOT NULL,
+            tag TEXT NOT NULL, -- lower-cased, whitespace-collapsed
+            PRIMARY KEY (entity_id, tag)
+        ) WITHOUT ROWID''')
+
+    # Job embedding vectors (services/job_embeddings.py), keyed on the embedded
+    # text so reloaded jobs with new ids reuse them
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS job_embeddings (
+        model TEXT NOT NULL,
+        text_hash TEXT NOT NULL, -- sha256 of the embedded job text
+        vector BLOB NOT NULL, -- float32, normalized
+        PRIMARY KEY (model, text_hash)
+    ) WITHOUT ROWID''')
+
+    # Data versions for VERSIONED_TABLES, the basis of catalog ETags
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''')
+    for table in VERSIONED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO data_versions (table_name) VALUES (?)", (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+            AFTER {event} ON {table}
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+            END''')
+
+    apply_index_manifest(cursor)
 
     conn.commit()
     conn.close()
@@ -671,6 +914,11 @@ def load_skill_india_jobs():
                 logger.error(f"Error inserting job {job.get('job_title', 'Unknown')}: {e}")
                 continue
         
+        # Job ids were reassigned by the reload
+        from services.tags import rebuild_tag_table
+        rebuild_tag_table(cursor, 'job_skills')
+        rebuild_tag_table(cursor, 'job_tags')
+        
         conn.commit()
         conn.close()
         logger.info(f"Successfully loaded {jobs_inserted} jobs from Skill India data")
@@ -779,6 +1027,9 @@ def load_skill_india_courses():
                 logger.error(f"Error inserting course {course.get('name', 'Unknown')}: {e}")
                 continue
         
+        from services.tags import rebuild_tag_table
+        rebuild_tag_table(cursor, 'course_tags')
+        
         conn.commit()
         conn.close()
         logger.info(f"Successfully loaded {courses_inserted} courses from Skill India data")
@@ -1260,6 +1511,10 @@ def seed_db():
             member["role"], member["skills"], now
         ))
 
+    from services.tags import rebuild_tag_table
+    for table in ('event_skills', 'project_technologies'):
+        rebuild_tag_table(cursor, table)
+
     conn.commit()
     conn.close()
     logger.info("Database seeded successfully!")
@@ -25,38 +25,62 @@ except Exception as e:
     logging.error(f"Failed to load Skill India data: {e}")
     # Continue startup even if data loading fails
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from core.fast_json import FastJSONResponse
+from core.compression import CompressionMiddleware
+from core.metrics import MetricsMiddleware
 from api.routes_skills import router as skills_router
 from api.routes_business import router as business_router
 # from api.routes_government import router as government_router  # Commented out as the module does not exist
 from api.routes_scheme import router as scheme_router
-from api.routes_jobs import router as jobs_router
+from api.routes_jobs import router as jobs_router, start_job_embedding_load
 from api.routes_courses import router as courses_router
 from api.translation import router as translation_router
 from api.routes_profile import router as profile_router
 from api.routes_audio import router as audio_router
 from api.routes_stt import router as stt_router
 from api.routes_youtube_summary import router as youtube_summary_router
-from api.routes_dashboard import router as dashboard_router
+from api.routes_dashboard import router as dashboard_router, start_dashboard_refresh_worker
 from api.routes_ai_assistant import router as ai_assistant_router
 # --- ADD THIS IMPORT ---
 from api.routes_course_suggestion import router as course_suggestion_router
-from api.routes_events import router as events_router
+from api.routes_events import router as events_router, start_event_status_scheduler
 from api.routes_projects import router as projects_router
 from api.routes_auth import router as auth_router
 from api.routes_users import router as users_router
 from api.routes_notifications import router as notifications_router
+from api.routes_metrics import router as metrics_router
 
 
-app = FastAPI(title="GramUdyogAI API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background tasks start here, not in router startup hooks, which FastAPI
+    # runs once more for every include_router
+    tasks = [
+        task for task in (
+            start_event_status_scheduler(),
+            start_dashboard_refresh_worker(),
+            start_job_embedding_load(),
+        ) if task is not None
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+
+
+app = FastAPI(title="GramUdyogAI API", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # Mount static files directories
 app.mount("/images", StaticFiles(directory="images"), name="images")
 app.mount("/audio", StaticFiles(directory="audio"), name="audio")
 
 
+# Compress JSON and text responses above RESPONSE_COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -66,6 +90,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency covers CORS and compression too
+app.add_middleware(MetricsMiddleware)
+
 # Include all routers with proper prefixes
 app.include_router(skills_router, prefix="/api", tags=["skills"])
 app.include_router(business_router,tags=["business"])
@@ -86,6 +113,7 @@ app.include_router(projects_router, prefix="/api", tags=["projects"])
 app.include_router(auth_router, prefix="/api", tags=["authentication"])
 app.include_router(users_router, prefix="/api", tags=["users"])
 app.include_router(notifications_router, prefix="/api", tags=["notifications"])
+app.include_router(metrics_router)
 if __name__ == "__main__":
     import uvicorn
     import os
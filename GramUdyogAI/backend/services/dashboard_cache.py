@@ -0,0 +1,121 @@
+"""
+Dashboard cache service: per-user cache for /dashboard-recommendations.
+
+Entries are keyed on (user_id, language) and stamped with a hash of the profile
+fields the recommendations depend on, so a changed profile is a miss even
+before the explicit invalidation from the profile routes lands. Each entry keeps
+the profile it was built from, which lets the background refresher rebuild
+dashboards for recently active users before they are requested.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from core.metrics import record_cache
+from init_db import get_db
+
+DASHBOARD_CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_CACHE_TTL_HOURS", "12")) * 3600
+# Entries older than this fraction of the TTL are refreshed ahead of expiry
+REFRESH_AHEAD_FRACTION = 0.8
+ACTIVE_USER_WINDOW_DAYS = 7
+
+# Profile fields that feed the dashboard LLM prompts
+PROFILE_FIELDS = ("user_type", "location", "state", "skills", "jobTypes", "experience", "goals")
+
+
+def profile_hash(profile: dict, language: str) -> str:
+    relevant = {field: profile.get(field) for field in PROFILE_FIELDS}
+    relevant["language"] = language
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def get_cached_dashboard(user_id: int, language: str, expected_hash: str) -> Optional[dict]:
+    """Return the cached dashboard if it was built from this profile and is still fresh"""
+    conn = get_db()
+    row = conn.execute(
+        "SELECT profile_hash, dashboard_json, created_at FROM dashboard_cache WHERE user_id = ? AND language = ?",
+        (user_id, language)
+    ).fetchone()
+    if row:
+        conn.execute(
+            "UPDATE dashboard_cache SET last_requested_at = ? WHERE user_id = ? AND language = ?",
+            (time.time(), user_id, language)
+        )
+        conn.commit()
+    conn.close()
+    if not row or row["dashboard_json"] is None or row["profile_hash"] != expected_hash:
+        record_cache("dashboard", "miss")
+        return None
+    if time.time() - row["created_at"] >= DASHBOARD_CACHE_TTL_SECONDS:
+        record_cache("dashboard", "expired")
+        return None
+    record_cache("dashboard", "hit")
+    return json.loads(row["dashboard_json"])
+
+
+def set_cached_dashboard(user_id: int, language: str, profile: dict, dashboard: dict):
+    now = time.time()
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO dashboard_cache (user_id, language, profile_hash, profile_json, dashboard_json, created_at, last_requested_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, language) DO UPDATE SET
+            profile_hash = excluded.profile_hash,
+            profile_json = excluded.profile_json,
+            dashboard_json = excluded.dashboard_json,
+            created_at = excluded.created_at
+    ''', (
+        user_id, language, profile_hash(profile, language),
+        json.dumps(profile, ensure_ascii=False, default=str),
+        json.dumps(dashboard, ensure_ascii=False), now, now
+    ))
+    conn.commit()
+    conn.close()
+
+
+def invalidate_dashboard_cache(user_id: int):
+    """Drop a user's cached dashboards after a profile, skills or job type change"""
+    try:
+        conn = get_db()
+        conn.execute("UPDATE dashboard_cache SET dashboard_json = NULL WHERE user_id = ?", (user_id,))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Could not invalidate dashboard cache for user {user_id}: {e}")
+
+
+def get_refresh_candidates(limit: int) -> List[dict]:
+    """
+    Recently active users whose dashboard is missing, invalidated or close to
+    expiry, most recent first. Returns dicts with user_id, language and the
+    last profile seen (None for users who never opened the dashboard).
+    """
+    now = time.time()
+    stale_before = now - DASHBOARD_CACHE_TTL_SECONDS * REFRESH_AHEAD_FRACTION
+    active_since = now - ACTIVE_USER_WINDOW_DAYS * 86400
+    conn = get_db()
+    rows = conn.execute('''
+        SELECT user_id, language, profile_json FROM dashboard_cache
+        WHERE last_requested_at >= ? AND (dashboard_json IS NULL OR created_at < ?)
+        ORDER BY last_requested_at DESC LIMIT ?
+    ''', (active_since, stale_before, limit)).fetchall()
+    candidates = [
+        {"user_id": row["user_id"], "language": row["language"], "profile": json.loads(row["profile_json"])}
+        for row in rows
+    ]
+    if len(candidates) < limit:
+        # Users who logged in recently but have never opened the dashboard
+        login_since = (datetime.now() - timedelta(days=ACTIVE_USER_WINDOW_DAYS)).isoformat()
+        rows = conn.execute('''
+            SELECT u.id FROM users u
+            JOIN unified_profiles p ON p.user_id = u.id
+            LEFT JOIN dashboard_cache d ON d.user_id = u.id
+            WHERE d.user_id IS NULL AND u.is_active = 1 AND u.last_login >= ?
+            ORDER BY u.last_login DESC LIMIT ?
+        ''', (login_since, limit - len(candidates))).fetchall()
+        candidates.extend({"user_id": row["id"], "language": "en", "profile": None} for row in rows)
+    conn.close()
+    return candidates
@@ -0,0 +1,243 @@
+"""
+Event service: event lookups shared by the HTTP routes and the AI assistant,
+so callers inside the app never need to go through the API layer, plus the
+transactional join/leave used by the registration endpoints and the date-driven
+status transitions applied by the event status scheduler.
+"""
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from init_db import get_db
+from services.row_mappers import EVENT_MAPPER, SOCIAL_POST_MAPPER
+
+
+def get_user_name_by_id(user_id):
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('SELECT name FROM users WHERE id = ?', (user_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row['name'] if row else 'Unknown'
+
+
+def serialize_events(cursor, rows) -> List[Dict[str, Any]]:
+    """
+    Response dicts for event rows, with organizer names and social media posts
+    loaded in one query each for the whole page instead of per event
+    """
+    events = EVENT_MAPPER.many(rows)
+    if not events:
+        return events
+
+    organizer_ids = list({event["organizer"]["id"] for event in events})
+    cursor.execute(
+        f"SELECT id, name FROM users WHERE id IN ({', '.join('?' for _ in organizer_ids)})", organizer_ids
+    )
+    names = {row['id']: row['name'] for row in cursor.fetchall()}
+
+    event_ids = [event["id"] for event in events]
+    cursor.execute(
+        f"SELECT * FROM social_media_posts WHERE event_id IN ({', '.join('?' for _ in event_ids)}) ORDER BY id",
+        event_ids
+    )
+    posts = {}
+    for post in cursor.fetchall():
+        posts.setdefault(post['event_id'], []).append(SOCIAL_POST_MAPPER(post))
+
+    for event in events:
+        event["organizer"]["name"] = names.get(event["organizer"]["id"], 'Unknown')
+        event["social_media_posts"] = posts.get(event["id"], [])
+    return events
+
+
+def search_events(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Search events by name or keyword (title or description)"""
+    conn = get_db()
+    cursor = conn.cursor()
+    sql = "SELECT * FROM events WHERE title LIKE ? OR description LIKE ? ORDER BY created_at DESC LIMIT ?"
+    like_query = f"%{query}%"
+    cursor.execute(sql, (like_query, like_query, limit))
+    events = serialize_events(cursor, cursor.fetchall())
+    conn.close()
+    return events
+
+
+LEAVE_EVENT_SQL = "DELETE FROM event_participants WHERE event_id = ? AND user_id = ?"
+
+
+class EventRegistrationError(Exception):
+    """A join/leave request that cannot be honoured; status_code maps to the HTTP response"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _begin_immediate():
+    """
+    Open a connection in autocommit mode and take the write lock up front, so
+    concurrent writers queue on the lock (up to the connect timeout)
+    instead of failing on lock upgrade halfway through.
+    """
+    conn = get_db()
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def join_event(event_id: int, user_id: int):
+    """
+    Register user_id for event_id. The seat is claimed with a single
+    conditional UPDATE, so capacity is enforced by SQLite rather than by a
+    read-then-write in Python, and the UNIQUE(event_id, user_id) constraint
+    rejects duplicate registrations in the same transaction.
+    """
+    conn = _begin_immediate()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE events
+            SET current_participants = current_participants + 1
+            WHERE id = ? AND status = 'active' AND current_participants < max_participants
+        ''', (event_id,))
+        if cursor.rowcount == 0:
+            cursor.execute("SELECT status FROM events WHERE id = ?", (event_id,))
+            event = cursor.fetchone()
+            if not event:
+                raise EventRegistrationError(404, "Event not found")
+            if event['status'] != 'active':
+                raise EventRegistrationError(400, "Event is not accepting participants")
+            raise EventRegistrationError(400, "Event is full")
+
+        try:
+            cursor.execute('''
+                INSERT INTO event_participants (event_id, user_id, status, joined_at)
+                VALUES (?, ?, 'registered', ?)
+            ''', (event_id, user_id, datetime.now().isoformat()))
+        except sqlite3.IntegrityError:
+            raise EventRegistrationError(400, "User is already a participant")
+
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def leave_event(event_id: int, user_id: int):
+    """Remove user_id from event_id and release the seat in the same transaction"""
+    conn = _begin_immediate()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(LEAVE_EVENT_SQL, (event_id, user_id))
+        if cursor.rowcount == 0:
+            raise EventRegistrationError(400, "User is not a participant")
+        cursor.execute('''
+            UPDATE events
+            SET current_participants = MAX(current_participants - 1, 0)
+            WHERE id = ?
+        ''', (event_id,))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+# changed_by for automatic transitions; history readers show it as "System"
+SYSTEM_USER_ID = 0
+
+DUE_EVENTS_SQL = "SELECT id, status FROM events WHERE {condition}"
+NEXT_START_SQL = "SELECT MIN(start_date) FROM events WHERE status = 'active' AND start_date >= ?"
+NEXT_END_SQL = "SELECT MIN(end_date) FROM events WHERE status IN ('active', 'ongoing') AND end_date >= ?"
+
+
+def status_transitions(now: datetime):
+    """
+    (new status, reason, condition, params) for the date-driven transitions.
+    Dates are compared as ISO strings against day boundaries rather than through
+    date(), so the conditions can use the (status, start_date) and
+    (status, end_date) indexes. start_date < tomorrow is date(start_date) <= today.
+    """
+    today = now.date().isoformat()
+    tomorrow = (now.date() + timedelta(days=1)).isoformat()
+    return [
+        ('ongoing', 'Automatic status update: event started',
+         "status = 'active' AND start_date < ? AND end_date >= ?", (tomorrow, today)),
+        ('completed', 'Automatic status update: event ended',
+         "status IN ('active', 'ongoing') AND end_date < ?", (today,)),
+        ('active', 'Automatic status update: upcoming event published',
+         "status = 'draft' AND start_date >= ?", (tomorrow,)),
+    ]
+
+
+def apply_due_status_transitions(now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Move events whose start or end date has been reached to their next status,
+    touching only the affected rows and recording each change in
+    event_status_history. Returns the changes that were made.
+    """
+    now = now or datetime.now()
+    changed_at = now.isoformat()
+    changes = []
+    conn = _begin_immediate()
+    try:
+        cursor = conn.cursor()
+        for new_status, reason, condition, params in status_transitions(now):
+            cursor.execute(DUE_EVENTS_SQL.format(condition=condition), params)
+            rows = cursor.fetchall()
+            if not rows:
+                continue
+            cursor.executemany(
+                "UPDATE events SET status = ?, updated_at = ? WHERE id = ?",
+                [(new_status, changed_at, row['id']) for row in rows]
+            )
+            cursor.executemany('''
+                INSERT INTO event_status_history (
+                    event_id, old_status, new_status, changed_by, reason, changed_at
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(row['id'], row['status'], new_status, SYSTEM_USER_ID, reason, changed_at) for row in rows])
+            changes.extend(
+                {"event_id": row['id'], "old_status": row['status'], "new_status": new_status}
+                for row in rows
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return changes
+
+
+def next_status_transition_at(now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    When the next date-driven transition becomes due: midnight of the earliest
+    upcoming start date of an active event, or midnight after the earliest end
+    date of an active/ongoing event. None when nothing is scheduled.
+    """
+    now = now or datetime.now()
+    today = now.date().isoformat()
+    tomorrow = (now.date() + timedelta(days=1)).isoformat()
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute(NEXT_START_SQL, (tomorrow,))
+    next_start = cursor.fetchone()[0]
+    cursor.execute(NEXT_END_SQL, (today,))
+    next_end = cursor.fetchone()[0]
+    conn.close()
+
+    candidates = []
+    if next_start:
+        candidates.append(datetime.fromisoformat(next_start[:10]))
+    if next_end:
+        candidates.append(datetime.fromisoformat(next_end[:10]) + timedelta(days=1))
+    return min(candidates) if candidates else None
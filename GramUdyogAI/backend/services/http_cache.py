@@ -0,0 +1,99 @@
+"""
+HTTP caching for the read-heavy catalog endpoints (job industries, locations,
+sectors and stats, course categories and skill levels, the scheme listing),
+whose data changes only when jobs, courses or scheme files are loaded.
+
+A response is keyed on its path and query string and validated by a data
+version: for database tables the counters in data_versions, which triggers
+created by init_db bump on every insert, update or delete (bulk loads from
+other processes included); scheme files use their own version string. The
+strong ETag is a hash of key and version, so a client whose If-None-Match
+still matches gets a bodiless 304. Otherwise the serialized body is served
+from an in-memory LRU cache and rebuilt only once the version has moved on.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from core.compression import base_etag
+from core.fast_json import dumps
+from core.metrics import record_cache
+from init_db import get_db
+
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "256"))
+# Clients keep the response but revalidate before reuse; a 304 costs a few bytes
+CATALOG_CACHE_CONTROL = "no-cache"
+
+_lock = threading.Lock()
+# cache key -> (etag, serialized body)
+_responses: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+
+
+def table_version(*tables: str) -> str:
+    """Current data version of the given tables, as one string"""
+    conn = get_db()
+    rows = conn.execute(
+        f"SELECT table_name, version FROM data_versions WHERE table_name IN ({', '.join('?' for _ in tables)})",
+        tables
+    ).fetchall()
+    conn.close()
+    versions = {row["table_name"]: row["version"] for row in rows}
+    return ",".join(f"{table}:{versions.get(table, 0)}" for table in tables)
+
+
+def _etag(key: str, version: str) -> str:
+    return '"' + hashlib.sha1(f"{key}|{version}".encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _matching_validator(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The validator from If-None-Match that matches etag (weak comparison), if any"""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    opaque = etag.strip('"')
+    for tag in if_none_match.split(","):
+        if base_etag(tag) == opaque:
+            return tag.strip()
+    return None
+
+
+def catalog_response(request: Request, version: str, load: Callable[[], Any]) -> Response:
+    """
+    Response for a catalog endpoint: 304 when the client's copy is current,
+    else the cached body for this version, calling load() only on a miss.
+    """
+    key = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+    etag = _etag(key, version)
+
+    validator = _matching_validator(request.headers.get("if-none-match"), etag)
+    if validator:
+        # Echo the client's validator, which carries any encoding suffix it was sent with
+        record_cache("http_catalog", "not_modified")
+        return Response(status_code=304, headers={"ETag": validator, "Cache-Control": CATALOG_CACHE_CONTROL})
+
+    with _lock:
+        entry = _responses.get(key)
+        if entry and entry[0] == etag:
+            _responses.move_to_end(key)
+            body = entry[1]
+        else:
+            body = None
+    record_cache("http_catalog", "hit" if body is not None else "miss")
+    if body is None:
+        body = dumps(load())
+        with _lock:
+            _responses[key] = (etag, body)
+            _responses.move_to_end(key)
+            while len(_responses) > HTTP_CACHE_MAX_ENTRIES:
+                _responses.popitem(last=False)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    )
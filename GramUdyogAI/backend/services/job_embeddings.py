@@ -0,0 +1,211 @@
+"""
+Job embedding index: a FAISS inner-product index over sentence embeddings of
+active job postings, built the same way as the course index in
+core/course_recommender.py but persisted and kept current as jobs are written.
+
+Vectors are stored in the job_embeddings table keyed on a hash of the embedded
+text rather than the job id, because the Skill India loader reinserts every
+job with new ids on each start; a restart therefore re-encodes only jobs whose
+text changed. The in-memory index is assembled from those rows by
+load_job_embedding_index() (run in the background at startup), and the job
+routes call add_job_embedding()/remove_job_embedding() on every write.
+
+search_jobs() is the semantic retrieval stage in front of
+services.job_matching: approximate nearest neighbours, optionally restricted to
+jobs in given locations or industries. faiss and sentence-transformers are
+optional; without them (or before the index has loaded) search_jobs() returns
+None and ranking is purely term-based.
+"""
+import hashlib
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from init_db import get_db
+from services.tags import normalize_tag
+
+JOB_EMBEDDING_MODEL = os.getenv("JOB_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+VECTOR_DIM = 384
+# Neighbours handed to the ranker; the ranker scores these plus exact term hits
+SEARCH_CANDIDATES = 200
+ENCODE_BATCH_SIZE = 256
+
+_lock = threading.Lock()
+_index = None
+_model = None
+# job_id -> normalized location parts / industries, for filtered search
+_locations: Dict[int, Set[str]] = {}
+_industries: Dict[int, Set[str]] = {}
+_unavailable = False
+
+
+def _load_dependencies():
+    """The faiss module and embedding model, or (None, None) when not installed"""
+    global _model, _unavailable
+    if _unavailable:
+        return None, None
+    try:
+        import faiss
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        print(f"Job embedding index disabled: {e}")
+        _unavailable = True
+        return None, None
+    if _model is None:
+        _model = SentenceTransformer(JOB_EMBEDDING_MODEL)
+    return faiss, _model
+
+
+def job_text(row) -> str:
+    return f"Job: {row['job_title']}. Industry: {row['industry'] or ''}. Description: {(row['description'] or '')[:500]}"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _encode(model, texts: List[str]) -> np.ndarray:
+    return np.asarray(
+        model.encode(texts, normalize_embeddings=True, batch_size=ENCODE_BATCH_SIZE),
+        dtype=np.float32
+    ).reshape(-1, VECTOR_DIM)
+
+
+def _job_rows(conn, job_ids: Optional[Iterable[int]] = None):
+    sql = '''
+        SELECT id, COALESCE(job_title, title) AS job_title, description, industry, sector, location
+        FROM job_postings
+        WHERE is_active = 1
+    '''
+    if job_ids is None:
+        return conn.execute(sql).fetchall()
+    job_ids = list(job_ids)
+    placeholders = ", ".join("?" for _ in job_ids)
+    return conn.execute(f"{sql} AND id IN ({placeholders})", job_ids).fetchall()
+
+
+def _vectors_for(conn, model, rows) -> np.ndarray:
+    """Stored vectors for rows, encoding and storing the ones not seen before"""
+    hashes = [_text_hash(job_text(row)) for row in rows]
+    stored = {}
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT text_hash, vector FROM job_embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+            [JOB_EMBEDDING_MODEL, *chunk]
+        ):
+            stored[row["text_hash"]] = np.frombuffer(row["vector"], dtype=np.float32)
+
+    missing = [i for i, text_hash in enumerate(hashes) if text_hash not in stored]
+    if missing:
+        encoded = _encode(model, [job_text(rows[i]) for i in missing])
+        conn.executemany(
+            "INSERT OR REPLACE INTO job_embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+            [(JOB_EMBEDDING_MODEL, hashes[i], vector.tobytes()) for i, vector in zip(missing, encoded)]
+        )
+        conn.commit()
+        for i, vector in zip(missing, encoded):
+            stored[hashes[i]] = vector
+
+    if not rows:
+        return np.zeros((0, VECTOR_DIM), dtype=np.float32)
+    return np.vstack([stored[text_hash] for text_hash in hashes])
+
+
+def _remember_filters(row):
+    _locations[row["id"]] = {normalize_tag(part) for part in (row["location"] or "").split(",") if part.strip()}
+    _industries[row["id"]] = {normalize_tag(value) for value in (row["industry"], row["sector"]) if value}
+
+
+def load_job_embedding_index():
+    """(Re)build the in-memory index from stored vectors, encoding only new job texts"""
+    global _index
+    faiss, model = _load_dependencies()
+    if faiss is None:
+        return
+    conn = get_db()
+    rows = _job_rows(conn)
+    vectors = _vectors_for(conn, model, rows)
+    # Drop vectors no active job uses any more so the table does not grow forever
+    live_hashes = [_text_hash(job_text(row)) for row in rows]
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS live_job_hashes (text_hash TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM live_job_hashes")
+    conn.executemany("INSERT OR IGNORE INTO live_job_hashes VALUES (?)", [(h,) for h in live_hashes])
+    conn.execute('''
+        DELETE FROM job_embeddings
+        WHERE model != ? OR text_hash NOT IN (SELECT text_hash FROM live_job_hashes)
+    ''', (JOB_EMBEDDING_MODEL,))
+    conn.commit()
+    conn.close()
+
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(VECTOR_DIM))
+    if rows:
+        index.add_with_ids(vectors, np.array([row["id"] for row in rows], dtype=np.int64))
+    with _lock:
+        _index = index
+        _locations.clear()
+        _industries.clear()
+        for row in rows:
+            _remember_filters(row)
+    print(f"Job embedding index ready with {index.ntotal} jobs")
+
+
+def add_job_embedding(job_id: int):
+    """Index a newly written job, or re-index an updated one"""
+    faiss, model = _load_dependencies()
+    if faiss is None or _index is None:
+        return
+    conn = get_db()
+    rows = _job_rows(conn, [job_id])
+    vectors = _vectors_for(conn, model, rows)
+    conn.close()
+    with _lock:
+        _index.remove_ids(np.array([job_id], dtype=np.int64))
+        _locations.pop(job_id, None)
+        _industries.pop(job_id, None)
+        if rows:  # inactive jobs are only removed
+            _index.add_with_ids(vectors, np.array([job_id], dtype=np.int64))
+            _remember_filters(rows[0])
+
+
+def remove_job_embedding(job_id: int):
+    if _index is None:
+        return
+    with _lock:
+        _index.remove_ids(np.array([job_id], dtype=np.int64))
+        _locations.pop(job_id, None)
+        _industries.pop(job_id, None)
+
+
+def search_jobs(query: str, k: int = SEARCH_CANDIDATES, locations: Iterable[str] = (),
+                industries: Iterable[str] = ()) -> Optional[Dict[int, float]]:
+    """
+    {job_id: cosine similarity} for the k jobs nearest to query. When locations
+    or industries are given (normalized terms), only jobs matching one of them
+    are searched. None when the index is unavailable.
+    """
+    faiss, model = _load_dependencies()
+    if faiss is None or _index is None or not query:
+        return None
+    query_vector = _encode(model, [query])
+    locations, industries = set(locations), set(industries)
+
+    with _lock:
+        params = None
+        if locations or industries:
+            allowed = [
+                job_id for job_id in _locations
+                if (not locations or _locations[job_id] & locations)
+                and (not industries or _industries.get(job_id, set()) & industries)
+            ]
+            if not allowed:
+                return {}
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(np.array(allowed, dtype=np.int64)))
+        k = min(k, _index.ntotal)
+        if k == 0:
+            return {}
+        similarities, ids = _index.search(query_vector, k, params=params)
+    return {int(job_id): float(similarity) for job_id, similarity in zip(ids[0], similarities[0]) if job_id != -1}
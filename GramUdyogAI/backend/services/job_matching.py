@@ -0,0 +1,302 @@
+"""
+Job matching service: ranks every active job against a seeker's skills, job
+roles, industries and locations in-process, so recommendations no longer
+depend on a LIKE pre-filter capped at a few dozen rows or on the LLM scoring
+candidates one prompt at a time.
+
+JobMatchIndex holds inverted indexes from normalized terms to row positions
+(the precomputed candidate list for each term) plus per-job arrays, and
+scores all jobs at once with numpy. The index is rebuilt lazily after
+invalidate_job_match_index() (job writes) or once it is older than
+JOB_MATCH_INDEX_TTL_SECONDS (bulk loads done by another process).
+
+When the job embedding index (services.job_embeddings) is available it is the
+first retrieval stage: its nearest neighbours join the term matches as
+candidates and their similarity is scored as one more signal. Without it
+ranking is purely term-based.
+"""
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from init_db import get_db
+from services.tags import normalize_tag, parse_tags
+from services.job_embeddings import search_jobs
+
+JOB_MATCH_INDEX_TTL_SECONDS = int(os.getenv("JOB_MATCH_INDEX_TTL_SECONDS", "600"))
+
+# Weight of each signal; only the signals present in a query count, and the
+# total is scaled so a job matching all of them scores 100
+MATCH_WEIGHTS = {
+    "skills": 0.35,
+    "roles": 0.25,
+    "industries": 0.15,
+    "locations": 0.1,
+    "experience": 0.05,
+    "semantic": 0.25,
+}
+# Signals where matching any one query term is a full match; for skills and
+# roles the score is the fraction of query terms the job carries
+ANY_MATCH_FIELDS = ("industries", "locations")
+# Embedding similarity at which a neighbour counts as a candidate on its own
+SEMANTIC_MATCH_THRESHOLD = 0.4
+# Longest phrase (in words) looked up when extracting terms from free text
+MAX_TERM_WORDS = 3
+# Newer jobs win ties; this is small enough never to outweigh a real signal
+RECENCY_TIEBREAK = 0.01
+
+STOP_WORDS = {
+    "a", "an", "and", "the", "for", "in", "of", "to", "with", "at", "on", "or",
+    "i", "am", "me", "my", "want", "looking", "need", "job", "jobs", "work",
+    "any", "some", "near", "from", "who", "can", "have", "as",
+}
+
+# Upper bound on experience_required (years, as the Skill India import stores
+# it) for seekers who describe themselves with these words; None is no bound
+EXPERIENCE_CEILINGS = (
+    (("senior", "experienced", "expert", "lead", "principal"), None),
+    (("mid", "intermediate"), 5.0),
+    (("fresher", "entry", "beginner", "graduate", "junior", "student"), 2.0),
+)
+
+# The columns format_job_response expects
+JOB_COLUMNS = """
+    id, job_title, company, company_name, location, salary_range, description,
+    industry, sector, job_type, employment_type, experience_required,
+    skills_required, posted_date, application_deadline, tags, source,
+    is_active, created_at, title, company_contact, pay, apply_url
+"""
+
+
+def experience_ceiling(text: str) -> Optional[float]:
+    """Maximum experience_required implied by the seeker's description, if any"""
+    words = set(normalize_tag(text).split())
+    for keywords, ceiling in EXPERIENCE_CEILINGS:
+        if words.intersection(keywords):
+            return ceiling
+    return None
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in normalize_tag(text).split() if word not in STOP_WORDS and len(word) > 1]
+
+
+def _parse_number(value: Any) -> float:
+    match = re.search(r"\d+(\.\d+)?", str(value or ""))
+    return float(match.group()) if match else np.nan
+
+
+class JobMatchIndex:
+    """Inverted indexes and per-job arrays over the active jobs at build time"""
+
+    def __init__(self, rows: Sequence, tags_by_job: Dict[int, List[str]]):
+        self.job_ids = np.array([row["id"] for row in rows], dtype=np.int64)
+        self.position = {row["id"]: position for position, row in enumerate(rows)}
+        self.experience = np.array([_parse_number(row["experience_required"]) for row in rows], dtype=np.float32)
+        # Rank of created_at scaled to 0..1, newest highest
+        order = sorted(range(len(rows)), key=lambda i: (rows[i]["created_at"] or "", rows[i]["id"]))
+        self.recency = np.zeros(len(rows), dtype=np.float32)
+        if len(rows) > 1:
+            self.recency[order] = np.arange(len(rows), dtype=np.float32) / (len(rows) - 1)
+        self.built_at = time.time()
+
+        postings = {field: {} for field in ("skills", "roles", "industries", "locations")}
+
+        def add(field, term, position):
+            if term:
+                postings[field].setdefault(term, set()).add(position)
+
+        for position, row in enumerate(rows):
+            for tag in tags_by_job.get(row["id"], []):
+                add("skills", tag, position)
+            for word in _words(row["job_title"] or ""):
+                add("roles", word, position)
+            for value in (row["industry"], row["sector"]):
+                if value:
+                    add("industries", normalize_tag(value), position)
+            for part in (row["location"] or "").split(","):
+                add("locations", normalize_tag(part), position)
+
+        self.postings = {
+            field: {term: np.fromiter(sorted(positions), dtype=np.int64) for term, positions in terms.items()}
+            for field, terms in postings.items()
+        }
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def extract_terms(self, text: str) -> Dict[str, List[str]]:
+        """
+        Phrases of up to MAX_TERM_WORDS words from free text that occur in each
+        index, longest first; words inside a matched phrase are not matched
+        again on their own ('data entry' does not also count as 'data').
+        """
+        words = normalize_tag(text).split()
+        terms = {}
+        for field, index in self.postings.items():
+            used = set()
+            found = []
+            for size in range(MAX_TERM_WORDS, 0, -1):
+                for start in range(len(words) - size + 1):
+                    span = range(start, start + size)
+                    phrase = " ".join(words[start:start + size])
+                    if phrase in STOP_WORDS or phrase not in index or used.intersection(span):
+                        continue
+                    used.update(span)
+                    if phrase not in found:
+                        found.append(phrase)
+            if found:
+                terms[field] = found
+        return terms
+
+    def score(self, criteria: Dict[str, List[str]], max_experience: Optional[float] = None,
+              semantic: Optional[Dict[int, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (score 0-100, matched) arrays over all jobs. semantic maps job ids to
+        embedding similarity. matched marks jobs with a term hit or a close
+        enough neighbour; experience alone never makes a match.
+        """
+        n = len(self)
+        total = np.zeros(n, dtype=np.float32)
+        matched = np.zeros(n, dtype=bool)
+        weight_sum = 0.0
+
+        for field, index in self.postings.items():
+            terms = criteria.get(field) or []
+            if not terms:
+                continue
+            weight_sum += MATCH_WEIGHTS[field]
+            hits = np.zeros(n, dtype=np.float32)
+            for term in terms:
+                positions = index.get(term)
+                if positions is not None:
+                    hits[positions] += 1
+            matched |= hits > 0
+            if field in ANY_MATCH_FIELDS:
+                total += MATCH_WEIGHTS[field] * np.minimum(hits, 1)
+            else:
+                total += MATCH_WEIGHTS[field] * hits / len(terms)
+
+        if semantic:
+            weight_sum += MATCH_WEIGHTS["semantic"]
+            similarity = np.zeros(n, dtype=np.float32)
+            for job_id, value in semantic.items():
+                position = self.position.get(job_id)
+                if position is not None:
+                    similarity[position] = min(max(value, 0.0), 1.0)
+            matched |= similarity >= SEMANTIC_MATCH_THRESHOLD
+            total += MATCH_WEIGHTS["semantic"] * similarity
+
+        if max_experience is not None:
+            weight_sum += MATCH_WEIGHTS["experience"]
+            fits = np.isnan(self.experience) | (self.experience <= max_experience)
+            total += MATCH_WEIGHTS["experience"] * fits
+
+        if weight_sum == 0:
+            return total, matched
+        return total * (100 / weight_sum), matched
+
+    def rank(self, criteria: Dict[str, List[str]], top_k: int = 10, max_experience: Optional[float] = None,
+             semantic: Optional[Dict[int, float]] = None) -> List[Tuple[int, float]]:
+        """Top-k (job_id, score) pairs, best first"""
+        if not len(self):
+            return []
+        scores, matched = self.score(criteria, max_experience, semantic)
+        candidates = np.flatnonzero(matched)
+        if not len(candidates):
+            return []
+        keys = scores[candidates] + RECENCY_TIEBREAK * self.recency[candidates]
+        if len(candidates) > top_k:
+            keep = np.argpartition(-keys, top_k - 1)[:top_k]
+            candidates, keys = candidates[keep], keys[keep]
+        order = np.argsort(-keys, kind="stable")
+        return [(int(self.job_ids[i]), round(float(scores[i]), 1)) for i in candidates[order]]
+
+
+_index_lock = threading.Lock()
+_index: Optional[JobMatchIndex] = None
+_index_stale = True
+
+
+def build_job_match_index() -> JobMatchIndex:
+    conn = get_db()
+    rows = conn.execute('''
+        SELECT id, COALESCE(job_title, title) AS job_title, industry, sector,
+               location, experience_required, created_at
+        FROM job_postings
+        WHERE is_active = 1
+        ORDER BY id
+    ''').fetchall()
+    tags_by_job: Dict[int, List[str]] = {}
+    for row in conn.execute('''
+        SELECT entity_id, tag FROM job_skills
+        UNION
+        SELECT entity_id, tag FROM job_tags
+    '''):
+        tags_by_job.setdefault(row["entity_id"], []).append(row["tag"])
+    conn.close()
+    return JobMatchIndex(rows, tags_by_job)
+
+
+def invalidate_job_match_index():
+    """Mark the index stale after a job write; the next query rebuilds it"""
+    global _index_stale
+    _index_stale = True
+
+
+def get_job_match_index() -> JobMatchIndex:
+    global _index, _index_stale
+    with _index_lock:
+        expired = _index is not None and time.time() - _index.built_at >= JOB_MATCH_INDEX_TTL_SECONDS
+        if _index is None or _index_stale or expired:
+            _index_stale = False
+            _index = build_job_match_index()
+        return _index
+
+
+def _normalize_terms(values: Iterable[Any]) -> List[str]:
+    return parse_tags([value for value in values or [] if value])
+
+
+def rank_jobs(text: str = "", skills: Iterable[Any] = (), roles: Iterable[Any] = (),
+              industries: Iterable[Any] = (), locations: Iterable[Any] = (),
+              max_experience: Optional[float] = None, top_k: int = 10) -> List[Tuple[int, float]]:
+    """
+    Rank active jobs for a seeker. Explicit criteria are merged with whatever
+    indexed terms occur in text; roles are matched word by word against job
+    titles. The text also drives the embedding search, restricted to the
+    requested locations and industries. Returns (job_id, score 0-100) pairs, best first.
+    """
+    index = get_job_match_index()
+    criteria = index.extract_terms(text) if text else {}
+    role_words = [word for role in _normalize_terms(roles) for word in _words(role)]
+    for field, values in (
+        ("skills", _normalize_terms(skills)),
+        ("roles", role_words),
+        ("industries", _normalize_terms(industries)),
+        ("locations", _normalize_terms(locations)),
+    ):
+        if values:
+            criteria[field] = list(dict.fromkeys(criteria.get(field, []) + values))
+
+    semantic = search_jobs(
+        text, locations=criteria.get("locations", ()), industries=criteria.get("industries", ())
+    ) if text else None
+    return index.rank(criteria, top_k, max_experience, semantic)
+
+
+def load_jobs(ranked: Sequence[Tuple[int, float]]) -> List[Tuple[float, Any]]:
+    """(score, job row) pairs for ranked ids, in rank order, skipping jobs removed since indexing"""
+    if not ranked:
+        return []
+    ids = [job_id for job_id, _ in ranked]
+    placeholders = ", ".join("?" for _ in ids)
+    conn = get_db()
+    rows = conn.execute(f"SELECT {JOB_COLUMNS} FROM job_postings WHERE id IN ({placeholders})", ids).fetchall()
+    conn.close()
+    by_id = {row["id"]: row for row in rows}
+    return [(score, by_id[job_id]) for job_id, score in ranked if job_id in by_id]
@@ -0,0 +1,149 @@
+"""
+Row mappers: the sqlite3.Row -> response dict conversions shared by the list
+and detail endpoints (and the assistant), declared once per table instead of
+as a dict literal with inline json.loads calls in every handler.
+
+A RowMapper is built at import time from (key, source, convert) specs; source
+is a column name or a function of the whole row, convert post-processes the
+value (JSON columns use json_column, which never raises on bad data). The
+output is plain JSON types, ready for core.fast_json.FastJSONResponse.
+"""
+import copy
+import json
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Union
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+def parse_json(value: Any, default: Any = None) -> Any:
+    """Decode a JSON column; default (copied) when it is empty or malformed"""
+    if value is None or value == "":
+        return copy.deepcopy(default)
+    if isinstance(value, (list, dict)):
+        return value
+    try:
+        return _loads(value)
+    except (ValueError, TypeError):
+        return copy.deepcopy(default)
+
+
+def json_column(default: Any) -> Callable[[Any], Any]:
+    return lambda value: parse_json(value, default)
+
+
+class RowMapper:
+    def __init__(self, *fields: Union[str, Sequence]):
+        """Each field is a column name, or (key, source) / (key, source, convert)"""
+        self.fields = []
+        for field in fields:
+            if isinstance(field, str):
+                field = (field, field)
+            key, source, convert = (*field, None)[:3]
+            self.fields.append((key, source, convert, callable(source)))
+
+    def __call__(self, row) -> Dict[str, Any]:
+        result = {}
+        for key, source, convert, derived in self.fields:
+            value = source(row) if derived else row[source]
+            result[key] = convert(value) if convert else value
+        return result
+
+    def many(self, rows: Iterable) -> List[Dict[str, Any]]:
+        return [self(row) for row in rows]
+
+
+def _first(*columns: str) -> Callable[[Any], Any]:
+    """First non-empty of several columns (new field, then its legacy name)"""
+    def pick(row):
+        for column in columns:
+            if row[column]:
+                return row[column]
+        return row[columns[-1]]
+    return pick
+
+
+def _or_empty(column: str) -> Callable[[Any], Any]:
+    return lambda row: row[column] or ""
+
+
+# routes_jobs GET /jobs (legacy title/company/pay fields kept for older clients)
+JOB_MAPPER = RowMapper(
+    "id",
+    ("job_title", _first("job_title", "title")),
+    ("company_name", _or_empty("company")),
+    "location",
+    ("salary_range", lambda row: row["salary_range"] or row["pay"] or ""),
+    "description", "industry", "sector", "job_type", "employment_type", "experience_required",
+    ("skills_required", "skills_required", json_column([])),
+    "posted_date", "application_deadline",
+    ("tags", "tags", json_column([])),
+    "source", "is_active", "created_at", "apply_url",
+    ("title", _first("job_title", "title")),
+    ("company", _or_empty("company")),
+    ("company_contact", _or_empty("company_contact")),
+    ("pay", lambda row: row["salary_range"] or row["pay"] or ""),
+)
+
+COURSE_MAPPER = RowMapper(
+    "id", "name", "link", "category", "skill_level", "duration", "provider", "description",
+    ("tags", "tags", json_column([])),
+    "source",
+    ("is_active", "is_active", bool),
+    "created_at",
+)
+
+PROJECT_MAPPER = RowMapper(
+    "id", "title", "description", "category", "event_id", "event_name", "event_type",
+    ("team_members", "team_members", json_column([])),
+    ("technologies", "technologies", json_column([])),
+    ("impact_metrics", "impact_metrics", json_column({})),
+    "funding_status", "funding_amount", "funding_goal", "location", "state",
+    "created_by", "created_at", "completed_at", "status",
+    ("media", "media", json_column({"images": [], "videos": []})),
+    ("testimonials", "testimonials", json_column([])),
+    ("awards", "awards", json_column([])),
+    ("tags", "tags", json_column([])),
+)
+
+DEFAULT_EVENT_IMPACT_METRICS = {
+    "participants_target": 0,
+    "skills_developed": 0,
+    "projects_created": 0,
+    "employment_generated": 0
+}
+
+# Everything but organizer.name and social_media_posts, which
+# services.events.serialize_events fills in with one query each per page
+EVENT_MAPPER = RowMapper(
+    "id", "title", "description", "event_type", "category", "location", "state",
+    "start_date", "end_date", "max_participants", "current_participants", "budget", "prize_pool",
+    ("organizer", lambda row: {"id": row["organizer_id"], "type": row["organizer_type"], "name": "Unknown"}),
+    ("skills_required", "skills_required", json_column([])),
+    ("tags", "tags", json_column([])),
+    "status",
+    ("impact_metrics", "impact_metrics", json_column(DEFAULT_EVENT_IMPACT_METRICS)),
+    ("marketing_highlights", "marketing_highlights", json_column([])),
+    ("success_metrics", "success_metrics", json_column([])),
+    ("sections", "sections", json_column([])),
+    ("social_media_posts", lambda row: []),
+    "created_at", "updated_at",
+)
+
+SOCIAL_POST_MAPPER = RowMapper("id", "platform", "content", "image_url", "scheduled_at", "status")
+
+NOTIFICATION_MAPPER = RowMapper(
+    "id", "title", "message", "notification_type", "related_id", "related_type", "event_id", "project_id",
+    ("metadata", "metadata", json_column(None)),
+    ("is_read", "is_read", bool),
+    "created_at", "updated_at",
+)
+
+VISUAL_SUMMARY_MAPPER = RowMapper(
+    "id", "topic",
+    ("summary_data", "summary_data", json_column({})),
+    "created_at",
+)
@@ -0,0 +1,152 @@
+"""
+Tag service: normalized (entity_id, tag) side tables for the JSON list columns
+(job skills and tags, course tags, event skills, profile skills, project
+technologies), declared in init_db.TAG_TABLES.
+
+The JSON columns stay the source for API responses; the side tables are what
+skill/tag filters and profile-to-job matching query, so those become indexed
+lookups and joins instead of LIKE '%skill%' scans over JSON text. Every write
+to a mirrored column must call sync_tags() on the same cursor before commit.
+"""
+import json
+import re
+from typing import Any, Iterable, List, Sequence, Tuple
+
+from init_db import get_db, TAG_TABLES
+
+PROFILE_SKILLS_SQL = "SELECT tag FROM profile_skills WHERE entity_id = ?"
+
+
+def normalize_tag(value: Any) -> str:
+    """
+    Lower-case and treat runs of whitespace, '-' and '_' as one space, so
+    'Data  Entry', 'data-entry' (the Skill India import's style) and
+    'data entry' all match
+    """
+    return re.sub(r"[\s_-]+", " ", str(value).lower()).strip()
+
+
+def parse_tags(value: Any) -> List[str]:
+    """
+    Normalized, de-duplicated tags from a list, a JSON array string or a
+    comma-separated string (older rows store skills that way).
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            value = value.split(",")
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        return []
+    tags = []
+    for item in value:
+        tag = normalize_tag(item) if item is not None else ""
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def sync_tags(cursor, table: str, entity_id: int, value: Any):
+    """Replace the side-table rows for one entity with the tags in value"""
+    cursor.execute(f"DELETE FROM {table} WHERE entity_id = ?", (entity_id,))
+    tags = parse_tags(value)
+    if tags:
+        cursor.executemany(
+            f"INSERT OR IGNORE INTO {table} (entity_id, tag) VALUES (?, ?)",
+            [(entity_id, tag) for tag in tags]
+        )
+
+
+def delete_tags(cursor, entity_id: int, tables: Iterable[str]):
+    for table in tables:
+        cursor.execute(f"DELETE FROM {table} WHERE entity_id = ?", (entity_id,))
+
+
+def rebuild_tag_table(cursor, table: str):
+    """Repopulate a side table from its source column (backfill and bulk loads)"""
+    source_table, id_column, value_column = TAG_TABLES[table]
+    cursor.execute(f"DELETE FROM {table}")
+    cursor.execute(
+        f"SELECT {id_column}, {value_column} FROM {source_table} "
+        f"WHERE {value_column} IS NOT NULL AND {value_column} NOT IN ('', '[]')"
+    )
+    rows = [(row[0], tag) for row in cursor.fetchall() for tag in parse_tags(row[1])]
+    cursor.executemany(f"INSERT OR IGNORE INTO {table} (entity_id, tag) VALUES (?, ?)", rows)
+
+
+def tag_filter(tables: Sequence[str], id_column: str = "id") -> str:
+    """
+    SQL condition matching rows that carry a tag in any of tables; bind the
+    normalized tag once per table.
+    """
+    lookups = " UNION ".join(f"SELECT entity_id FROM {table} WHERE tag = ?" for table in tables)
+    return f"{id_column} IN ({lookups})"
+
+
+def tag_prefix_filter(tables: Sequence[str], id_column: str = "id") -> str:
+    """
+    Like tag_filter, but matching tags that start with a prefix ("tailor"
+    finds "tailoring") as an index range scan; bind tag_prefix_bounds() once
+    per table.
+    """
+    lookups = " UNION ".join(f"SELECT entity_id FROM {table} WHERE tag >= ? AND tag < ?" for table in tables)
+    return f"{id_column} IN ({lookups})"
+
+
+def tag_prefix_bounds(value: Any) -> Tuple[str, str]:
+    """[low, high) range of normalized tags starting with value"""
+    prefix = normalize_tag(value)
+    if not prefix:
+        return "", chr(0x10FFFF)
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def job_skill_match_sql(tag_count: int) -> str:
+    """
+    Active jobs ranked by how many of tag_count tags they list as skills or
+    tags; bind the tags twice, then the limit.
+    """
+    placeholders = ", ".join("?" for _ in range(tag_count))
+    return f'''
+        SELECT m.entity_id AS job_id, COUNT(DISTINCT m.tag) AS overlap
+        FROM (
+            SELECT entity_id, tag FROM job_skills WHERE tag IN ({placeholders})
+            UNION ALL
+            SELECT entity_id, tag FROM job_tags WHERE tag IN ({placeholders})
+        ) m
+        JOIN job_postings j ON j.id = m.entity_id
+        WHERE j.is_active = 1
+        GROUP BY m.entity_id
+        ORDER BY overlap DESC, m.entity_id DESC
+        LIMIT ?
+    '''
+
+
+def match_jobs_by_skills(skills: Iterable[Any], limit: int = 50) -> List[Tuple[int, int]]:
+    """
+    Active jobs sharing the most skills or tags with the given skills, as
+    (job_id, overlap) pairs ordered by overlap.
+    """
+    tags = parse_tags(list(skills))
+    if not tags:
+        return []
+    conn = get_db()
+    rows = conn.execute(job_skill_match_sql(len(tags)), (*tags, *tags, limit)).fetchall()
+    conn.close()
+    return [(row["job_id"], row["overlap"]) for row in rows]
+
+
+def get_profile_skills(user_id: int) -> List[str]:
+    conn = get_db()
+    rows = conn.execute(PROFILE_SKILLS_SQL, (user_id,)).fetchall()
+    conn.close()
+    return [row["tag"] for row in rows]
+
+
+def match_jobs_for_user(user_id: int, limit: int = 50) -> List[Tuple[int, int]]:
+    """Jobs ranked by how many of the user's profile skills they list"""
+    return match_jobs_by_skills(get_profile_skills(user_id), limit)
@@ -0,0 +1,114 @@
+"""
+User activity service: per-user counters and the recent-activity feed shown on
+profile pages, each built with a single query and kept in a short-lived cache.
+
+Routes that create or join something (projects, events, registrations, team
+memberships) call invalidate_user_activity() so the owner sees the change on
+the next request instead of after the TTL.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from core.metrics import record_cache
+from init_db import get_db
+
+USER_ACTIVITY_TTL_SECONDS = int(os.getenv("USER_ACTIVITY_TTL_SECONDS", "60"))
+
+_cache_lock = threading.Lock()
+# user_id -> {cache key: (expires_at, value)}
+_cache: Dict[int, Dict[Any, tuple]] = {}
+
+# type -> (id prefix, title prefix, impact score)
+ACTIVITY_TYPES = {
+    "project_created": ("project", "Created project", 50),
+    "event_created": ("event", "Organized event", 30),
+    "event_participated": ("participation", "Participated in", 20),
+}
+
+USER_COUNTS_SQL = '''
+    SELECT
+        (SELECT COUNT(*) FROM projects WHERE created_by = :user_id) AS projects_created,
+        (SELECT COUNT(*) FROM events WHERE created_by = :user_id) AS events_organized,
+        (SELECT COUNT(*) FROM event_participants WHERE user_id = :user_id) AS events_participated,
+        (SELECT COUNT(*) FROM project_team_members WHERE user_id = :user_id) AS team_memberships
+'''
+
+USER_FEED_SQL = '''
+    SELECT type, id, title, description, date FROM (
+        SELECT 'project_created' AS type, id, title, description, created_at AS date
+        FROM projects WHERE created_by = :user_id
+        UNION ALL
+        SELECT 'event_created', id, title, description, created_at
+        FROM events WHERE created_by = :user_id
+        UNION ALL
+        SELECT 'event_participated', e.id, e.title, e.description, ep.joined_at
+        FROM event_participants ep JOIN events e ON ep.event_id = e.id
+        WHERE ep.user_id = :user_id
+    )
+    ORDER BY date DESC
+    LIMIT :limit
+'''
+
+
+def _cached(user_id: int, key, load):
+    now = time.time()
+    with _cache_lock:
+        entry = _cache.get(user_id, {}).get(key)
+        if entry and entry[0] > now:
+            record_cache("user_activity", "hit")
+            return entry[1]
+    record_cache("user_activity", "miss")
+    value = load()
+    with _cache_lock:
+        _cache.setdefault(user_id, {})[key] = (now + USER_ACTIVITY_TTL_SECONDS, value)
+    return value
+
+
+def invalidate_user_activity(user_id: Optional[int] = None):
+    """Forget a user's cached counters and feed (everyone's when user_id is None)"""
+    with _cache_lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(user_id, None)
+
+
+def get_user_counts(user_id: int) -> Dict[str, int]:
+    """Projects created, events organized, events joined and team memberships in one query"""
+    def load():
+        conn = get_db()
+        row = conn.execute(USER_COUNTS_SQL, {"user_id": user_id}).fetchone()
+        conn.close()
+        return dict(row)
+
+    return _cached(user_id, "counts", load)
+
+
+def _truncate(text: Optional[str]) -> str:
+    text = text or ""
+    return text[:100] + "..." if len(text) > 100 else text
+
+
+def get_user_feed(user_id: int, limit: int) -> List[Dict[str, Any]]:
+    """The user's most recent activities across projects, events and registrations, newest first"""
+    def load():
+        conn = get_db()
+        rows = conn.execute(USER_FEED_SQL, {"user_id": user_id, "limit": limit}).fetchall()
+        conn.close()
+
+        activities = []
+        for row in rows:
+            id_prefix, title_prefix, impact_score = ACTIVITY_TYPES[row['type']]
+            activities.append({
+                "id": f"{id_prefix}_{row['id']}",
+                "type": row['type'],
+                "title": f"{title_prefix}: {row['title']}",
+                "description": _truncate(row['description']),
+                "date": row['date'],
+                "impact_score": impact_score
+            })
+        return activities
+
+    return _cached(user_id, ("feed", limit), load)
@@ -0,0 +1,132 @@
+"""
+Visual summary service: generates and stores visual summaries. Used directly by
+the /visual-summary route and by the AI assistant, so assistant actions run
+in-process instead of calling back into our own HTTP API.
+
+A summary's sections live in visual_summary_sections, one row each, and
+visual_summaries.summary_data keeps the rest of the summary (type, title).
+Listings read only id, topic and created_at; load_visual_summary() puts the
+full summary back together when one is opened.
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.skill_tutorial import generate_visual_summary_json
+from init_db import get_db, SUMMARY_SECTION_FIELDS
+from services.row_mappers import RowMapper, VISUAL_SUMMARY_MAPPER
+
+VISUAL_SUMMARY_ITEM_MAPPER = RowMapper("id", "topic", "created_at")
+SUMMARY_SECTION_MAPPER = RowMapper(*((key, column) for column, key in SUMMARY_SECTION_FIELDS.items()))
+
+SUMMARY_PAGE_SQL = "SELECT id, topic, created_at FROM visual_summaries ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+SUMMARY_SECTIONS_SQL = (
+    f"SELECT {', '.join(SUMMARY_SECTION_FIELDS)} FROM visual_summary_sections WHERE summary_id = ? ORDER BY position"
+)
+UPDATE_SECTION_AUDIO_SQL = "UPDATE visual_summary_sections SET audio_url = ? WHERE summary_id = ? AND position = ?"
+
+
+def _insert_sections(cursor, summary_id: int, sections: List[Dict[str, Any]]):
+    cursor.executemany(
+        f"INSERT INTO visual_summary_sections (summary_id, position, {', '.join(SUMMARY_SECTION_FIELDS)}) "
+        f"VALUES (?, ?{', ?' * len(SUMMARY_SECTION_FIELDS)})",
+        [
+            (summary_id, position, *(str(section.get(key) or "") for key in SUMMARY_SECTION_FIELDS.values()))
+            for position, section in enumerate(sections)
+        ]
+    )
+
+
+def store_visual_summary(topic: str, summary_data: Dict[str, Any], language: str = "en") -> int:
+    """Persist a generated summary (and its translation) and return its id"""
+    header = {key: value for key, value in summary_data.items() if key != "sections"}
+    conn = get_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO visual_summaries (topic, summary_data) VALUES (?, ?)",
+            (topic, json.dumps(header))
+        )
+        summary_id = cursor.lastrowid
+        _insert_sections(cursor, summary_id, summary_data.get("sections") or [])
+
+        # Store translation if not English
+        if language != "en":
+            cursor.execute(
+                "INSERT INTO summary_translations (summary_id, language, translated_data) VALUES (?, ?, ?)",
+                (summary_id, language, json.dumps(summary_data))
+            )
+        conn.commit()
+        return summary_id
+    finally:
+        conn.close()
+
+
+async def create_visual_summary(topic: str, context: str = "", language: str = "en",
+                                generate_audio: bool = False) -> Dict[str, Any]:
+    """Generate a visual summary off the event loop, store it and return the API payload"""
+    summary = await asyncio.to_thread(
+        generate_visual_summary_json,
+        topic=topic,
+        rag=context,
+        language=language,
+        generate_audio=generate_audio
+    )
+    summary_data = summary.model_dump()
+    summary_id = store_visual_summary(topic, summary_data, language)
+    print(f"\nCreated summary with ID: {summary_id}")
+    return {
+        "id": summary_id,
+        "topic": topic,
+        "summary_data": summary_data,
+        "created_at": datetime.now().isoformat()
+    }
+
+
+def list_visual_summaries(limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """A page of summaries, newest first, read from idx_visual_summary_created alone"""
+    conn = get_db()
+    rows = conn.execute(SUMMARY_PAGE_SQL, (limit, offset)).fetchall()
+    total_count = conn.execute("SELECT COUNT(*) FROM visual_summaries").fetchone()[0]
+    conn.close()
+    return {
+        "summaries": VISUAL_SUMMARY_ITEM_MAPPER.many(rows),
+        "total_count": total_count,
+        "limit": limit,
+        "offset": offset
+    }
+
+
+def load_visual_summary(summary_id: int) -> Optional[Dict[str, Any]]:
+    """The full summary with its sections, or None when it does not exist"""
+    conn = get_db()
+    row = conn.execute(
+        "SELECT id, topic, summary_data, created_at FROM visual_summaries WHERE id = ?", (summary_id,)
+    ).fetchone()
+    if not row:
+        conn.close()
+        return None
+    sections = conn.execute(SUMMARY_SECTIONS_SQL, (summary_id,)).fetchall()
+    conn.close()
+
+    summary = VISUAL_SUMMARY_MAPPER(row)
+    summary["summary_data"]["sections"] = SUMMARY_SECTION_MAPPER.many(sections)
+    return summary
+
+
+def update_section_audio(summary_id: int, section_index: int, audio_url: str) -> Optional[bool]:
+    """
+    Set one section's audio URL. True when updated, False when the summary has
+    no such section, None when the summary does not exist.
+    """
+    conn = get_db()
+    try:
+        updated = conn.execute(UPDATE_SECTION_AUDIO_SQL, (audio_url, summary_id, section_index)).rowcount
+        conn.commit()
+        if updated:
+            return True
+        exists = conn.execute("SELECT 1 FROM visual_summaries WHERE id = ?", (summary_id,)).fetchone()
+        return False if exists else None
+    finally:
+        conn.close()
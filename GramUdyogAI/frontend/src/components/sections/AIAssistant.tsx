@@ -14,6 +14,7 @@ import {
 } from '../ui/FeatureRenderers';
 import { useEffect } from 'react';
 import VisualSummary from '../ui/VisualSummary';
+import { postEventStream } from '../../lib/sse';
 
 interface AssistantResponse {
   output: string;
@@ -50,6 +51,7 @@ export default function AIAssistant({ lang }: { lang: string }) {
   const [userInput, setUserInput] = useState("");
   const [assistantResponse, setAssistantResponse] = useState<AssistantResponse | null>(null);
   const [loading, setLoading] = useState(false);
+  const [stage, setStage] = useState<string | null>(null);
   const [transcribed, setTranscribed] = useState("");
   const [isSpeaking, setIsSpeaking] = useState(false);
   const [isListening, setIsListening] = useState(false);
@@ -110,20 +112,18 @@ export default function AIAssistant({ lang }: { lang: string }) {
 
   const handleProcess = async () => {
     setLoading(true);
+    setStage(null);
     setAssistantResponse(null);
     
     try {
-      const response = await fetch(`${VITE_API_BASE_URL}/api/ai-assistant-enhanced`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ text: userInput, lang }),
-      });
-      
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-      }
-      
-      const data: AssistantResponse = await response.json();
+      // The streaming variant reports each pipeline stage while the answer is prepared
+      const data = await postEventStream<AssistantResponse>(
+        `${VITE_API_BASE_URL}/api/ai-assistant-enhanced/stream`,
+        { text: userInput, lang },
+        (event, payload) => {
+          if (event === 'progress') setStage(payload.stage);
+        }
+      );
       setAssistantResponse(data);
       
       // Optional TTS
@@ -143,6 +143,7 @@ export default function AIAssistant({ lang }: { lang: string }) {
       });
     } finally {
       setLoading(false);
+      setStage(null);
     }
   };
 
@@ -380,7 +381,7 @@ export default function AIAssistant({ lang }: { lang: string }) {
         {loading ? (
           <>
             <div className="animate-spin rounded-full h-4 w-4 border-b-2 border-white"></div>
-            {t('status.processing', 'Processing...')}
+            {stage ? t(`stages.${stage}`, t('status.processing', 'Processing...')) : t('status.processing', 'Processing...')}
           </>
         ) : (
           t('buttons.askAssistant', 'Ask Assistant')
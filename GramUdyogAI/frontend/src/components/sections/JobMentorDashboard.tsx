@@ -1,9 +1,13 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import { Calendar, Award, Users } from 'lucide-react';
 import { Badge } from '../ui/badge';
-import { userAPI } from '../../lib/api';
+import { userAPI, getAuthToken } from '../../lib/api';
+
+// Sections that overran their budget are collected from /dashboard-recommendations/pending/{token}
+const PENDING_POLL_INTERVAL_MS = 2000;
+const PENDING_POLL_ATTEMPTS = 60;
 
 export default function JobMentorDashboard() {
   const { t, ready } = useTranslation('jobmentordashboard');
@@ -18,10 +22,49 @@ export default function JobMentorDashboard() {
   const [showSummaryModal, setShowSummaryModal] = useState(false);
   const [openSchemeIndexes, setOpenSchemeIndexes] = useState([]);
   const [openBizIndexes, setOpenBizIndexes] = useState([]);
+  const [pendingSections, setPendingSections] = useState([]);
+  const pendingPoll = useRef(null);
   const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
   const navigate = useNavigate();
 
+  const applySections = (data) => {
+    if ('jobs' in data) setJobs(data.jobs || []);
+    if ('business_suggestions' in data) setBusinessSuggestions(data.business_suggestions || []);
+    if ('schemes' in data) setSchemes(data.schemes || []);
+  };
+
+  const stopPendingPoll = () => {
+    clearTimeout(pendingPoll.current);
+    pendingPoll.current = null;
+    setPendingSections([]);
+  };
+
+  const pollPendingSections = (token, attempt = 1) => {
+    pendingPoll.current = setTimeout(async () => {
+      try {
+        const res = await fetch(`${API_BASE_URL}/api/dashboard-recommendations/pending/${token}`);
+        if (!res.ok) {
+          stopPendingPoll();
+          return;
+        }
+        const data = await res.json();
+        applySections(data);
+        const stillPending = data.pending_sections || [];
+        if (stillPending.length > 0 && attempt < PENDING_POLL_ATTEMPTS) {
+          setPendingSections(stillPending);
+          pollPendingSections(token, attempt + 1);
+        } else {
+          stopPendingPoll();
+        }
+      } catch (err) {
+        console.error('Error fetching pending dashboard sections:', err);
+        stopPendingPoll();
+      }
+    }, PENDING_POLL_INTERVAL_MS);
+  };
+
   const fetchDashboard = async (forceRefresh = false) => {
+    stopPendingPoll();
     setLoading(true);
     setDashboardError(null);
     try {
@@ -34,9 +77,14 @@ export default function JobMentorDashboard() {
         }
         setUserProfile(profile);
 
+        // The dashboard is cached per user only when the bearer token identifies them
+        const authToken = getAuthToken();
         const dashRes = await fetch(`${API_BASE_URL}/api/dashboard-recommendations`, {
           method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
+          headers: {
+            'Content-Type': 'application/json',
+            ...(authToken ? { Authorization: `Bearer ${authToken}` } : {}),
+          },
           body: JSON.stringify({ ...profile, force_refresh: forceRefresh }),
         });
         const data = await dashRes.json();
@@ -49,6 +97,10 @@ export default function JobMentorDashboard() {
         setJobs(data.jobs || []);
         setBusinessSuggestions(data.business_suggestions || []);
         setSchemes(data.schemes || []);
+        if (data.pending_token && data.pending_sections?.length) {
+          setPendingSections(data.pending_sections);
+          pollPendingSections(data.pending_token);
+        }
       } else if (profileRes.error) {
         console.error('Error fetching profile:', profileRes.error);
         setDashboardError(t('job_mentor_dashboard.loading_error'));
@@ -67,6 +119,8 @@ export default function JobMentorDashboard() {
     // eslint-disable-next-line
   }, [ready]);
 
+  useEffect(() => () => clearTimeout(pendingPoll.current), []);
+
   // Show a loading state if translations are not ready
   if (!ready || loading) {
     return (
@@ -259,6 +313,13 @@ export default function JobMentorDashboard() {
         </div>
       </section>
 
+      {pendingSections.length > 0 && (
+        <div className="animate-pulse space-y-4">
+          <div className="h-10 bg-gray-700/50 rounded w-1/4"></div>
+          <div className="h-48 bg-gray-800/50 rounded-lg"></div>
+        </div>
+      )}
+
       {jobs && jobs.length > 0 && (
         <section className="space-y-6">
           <h2 className="text-3xl font-semibold tracking-tight">{t('job_mentor_dashboard.jobs.title')}</h2>
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useTranslation } from 'react-i18next';
 import ParticleBackground from '../ui/ParticleBackground';
-import { visualSummaryAPI, csrCourseAPI, courseAPI } from '../../lib/api';
+import { visualSummaryAPI, csrCourseAPI, courseAPI, VisualSummaryListItem } from '../../lib/api';
 import { Toaster, toast } from 'react-hot-toast';
 interface Section {
   title: string;
@@ -90,6 +90,9 @@ interface LiveSession {
   participants: number;
 }
 
+// Visual summary cards per page (three rows of the grid)
+const SUMMARY_PAGE_SIZE = 9;
+
 // Main Component
 const SkillBuilder = () => {
   const { t, i18n } = useTranslation('skillbuilder');
@@ -130,7 +133,10 @@ const SkillBuilder = () => {
     status: 'active',
   });
   const [showSummaryCreator, setShowSummaryCreator] = useState(false);
-  const [summaries, setSummaries] = useState<VisualSummary[]>([]);
+  const [summaries, setSummaries] = useState<VisualSummaryListItem[]>([]);
+  const [summaryOffset, setSummaryOffset] = useState(0);
+  const [summaryTotal, setSummaryTotal] = useState(0);
+  const [openingSummaryId, setOpeningSummaryId] = useState<number | null>(null);
   const [currentSummary, setCurrentSummary] = useState<VisualSummary | null>(null);
   const [isCreating, setIsCreating] = useState(false);
   const [translatingSummaryId, setTranslatingSummaryId] = useState<number | null>(null);
@@ -179,11 +185,13 @@ const SkillBuilder = () => {
     fetchCourses(1, searchQuery);
   };
 
-  const fetchSummaries = async () => {
+  const fetchSummaries = async (offset: number = summaryOffset) => {
     try {
-      const response = await visualSummaryAPI.getVisualSummaries();
+      const response = await visualSummaryAPI.getVisualSummaries(SUMMARY_PAGE_SIZE, offset);
       if (response.data) {
-        setSummaries(response.data);
+        setSummaries(response.data.summaries);
+        setSummaryTotal(response.data.total_count);
+        setSummaryOffset(response.data.offset);
       } else if (response.error) {
         console.error('Error fetching summaries:', response.error);
       }
@@ -192,6 +200,25 @@ const SkillBuilder = () => {
     }
   };
 
+  // Listings carry only id, topic and created_at; the sections are loaded when a summary is opened
+  const openSummary = async (item: VisualSummaryListItem): Promise<VisualSummary | null> => {
+    setOpeningSummaryId(item.id);
+    try {
+      const response = await visualSummaryAPI.getVisualSummaryById(item.id);
+      if (response.data) {
+        const summary = response.data as unknown as VisualSummary;
+        setCurrentSummary(summary);
+        return summary;
+      }
+      console.error('Error loading summary:', response.error);
+    } catch (error) {
+      console.error('Error loading summary:', error);
+    } finally {
+      setOpeningSummaryId(null);
+    }
+    return null;
+  };
+
   const createVisualSummary = async (topic: string, context: string) => {
     setIsCreating(true);
     try {
@@ -203,8 +230,8 @@ const SkillBuilder = () => {
         audioOnDemand: false
       });
       if (response.data) {
-        setSummaries([response.data, ...summaries]);
-        setCurrentSummary(response.data);
+        fetchSummaries(0);
+        setCurrentSummary(response.data as unknown as VisualSummary);
         setShowSummaryCreator(false);
       } else if (response.error) {
         console.error('Error creating summary:', response.error);
@@ -228,12 +255,9 @@ const SkillBuilder = () => {
       });
       if (!response.ok) throw new Error('Translation failed');
       const translated = await response.json();
-      setSummaries((prev) =>
-        prev.map((s) => (s.id === summary.id ? { ...s, ...translated, id: s.id } : s))
+      setCurrentSummary((current) =>
+        current && current.id === summary.id ? { ...current, ...translated, id: summary.id } : current
       );
-      if (currentSummary && currentSummary.id === summary.id) {
-        setCurrentSummary({ ...currentSummary, ...translated, id: summary.id });
-      }
     } catch (error) {
       console.error('Error translating summary:', error);
       toast.error(t('consumer.visualSummaryModal.translateError'));
@@ -1210,55 +1234,61 @@ const SkillBuilder = () => {
                 </button>
               </div>
               <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-                {summaries.map((summary) => {
-                  const firstSection = summary.summary_data?.sections?.[0];
-                  if (!firstSection) return null;
-                  return (
-                    <div
-                      key={summary.id}
-                      className="relative group cursor-pointer rounded-xl overflow-hidden border border-white/10 bg-black/40 hover:shadow-xl transition"
-                      onClick={() => {
-                        setCurrentSummary(summary);
-                      }}
-                    >
-                      <div className="relative h-48 w-full">
-                        <img
-                          src={`${API_BASE_URL}/api${firstSection.imageUrl}`}
-                          alt={firstSection.title}
-                          className="w-full h-full object-cover object-center transition-all duration-300 group-hover:scale-105"
-                          loading="lazy"
-                        />
-                        <div className="absolute inset-0 bg-gradient-to-t from-black/80 via-black/10 to-transparent" />
-                      </div>
-                      <div className="absolute top-2 left-2 bg-purple-800/70 text-xs px-3 py-1 rounded-full text-white">
-                        {summary.summary_data.title}
-                      </div>
-                      <div className="absolute bottom-2 left-2 right-2 flex flex-col gap-1">
-                        <span className="text-sm font-semibold text-purple-200 drop-shadow">{firstSection.title}</span>
-                        <span className="text-xs text-white/80">{firstSection.text.slice(0, 60)}...</span>
-                      </div>
-                      <div className="absolute top-2 right-2 bg-black/60 text-xs px-2 py-1 rounded text-white">
-                        {summary.summary_data.sections.length} sections
-                      </div>
-                      <div className="absolute bottom-2 right-2 text-xs text-gray-400">
-                        {new Date(summary.created_at).toLocaleDateString()}
-                      </div>
+                {summaries.map((summary) => (
+                  <div
+                    key={summary.id}
+                    className="relative group cursor-pointer rounded-xl overflow-hidden border border-white/10 bg-black/40 hover:shadow-xl transition p-4 h-40 flex flex-col justify-between"
+                    onClick={() => openSummary(summary)}
+                  >
+                    <span className="text-lg font-semibold text-purple-200">{summary.topic}</span>
+                    <div className="flex justify-between items-center">
                       <button
-                        className="absolute bottom-2 left-2 bg-blue-700/80 text-xs px-3 py-1 rounded text-white hover:bg-blue-800 transition"
-                        onClick={(e) => {
+                        className="bg-blue-700/80 text-xs px-3 py-1 rounded text-white hover:bg-blue-800 transition"
+                        onClick={async (e) => {
                           e.stopPropagation();
-                          handleTranslateSummary(summary);
+                          const opened = await openSummary(summary);
+                          if (opened) handleTranslateSummary(opened);
                         }}
-                        disabled={translatingSummaryId === summary.id}
+                        disabled={translatingSummaryId === summary.id || openingSummaryId === summary.id}
                       >
                         {translatingSummaryId === summary.id
                           ? t('consumer.visualSummaryModal.translating')
                           : t('consumer.visualSummaryModal.translate')}
                       </button>
+                      <span className="text-xs text-gray-400">
+                        {openingSummaryId === summary.id
+                          ? 'Loading...'
+                          : new Date(summary.created_at).toLocaleDateString()}
+                      </span>
                     </div>
-                  );
-                })}
+                  </div>
+                ))}
               </div>
+
+              {/* Pagination Controls */}
+              {summaryTotal > SUMMARY_PAGE_SIZE && (
+                <div className="mt-6 flex justify-between items-center gap-4">
+                  <span className="text-sm text-gray-300">
+                    Showing {summaryOffset + 1} - {Math.min(summaryOffset + SUMMARY_PAGE_SIZE, summaryTotal)} of {summaryTotal} summaries
+                  </span>
+                  <div className="flex items-center gap-1">
+                    <button
+                      onClick={() => fetchSummaries(Math.max(0, summaryOffset - SUMMARY_PAGE_SIZE))}
+                      disabled={summaryOffset === 0}
+                      className="px-3 py-1 bg-white/10 text-white rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-white/20 transition"
+                    >
+                      &lt;
+                    </button>
+                    <button
+                      onClick={() => fetchSummaries(summaryOffset + SUMMARY_PAGE_SIZE)}
+                      disabled={summaryOffset + SUMMARY_PAGE_SIZE >= summaryTotal}
+                      className="px-3 py-1 bg-white/10 text-white rounded disabled:opacity-50 disabled:cursor-not-allowed hover:bg-white/20 transition"
+                    >
+                      &gt;
+                    </button>
+                  </div>
+                </div>
+              )}
             </div>
 
             {showSummaryCreator && (
@@ -1285,7 +1315,7 @@ const SkillBuilder = () => {
                         });
                         if (!response.ok) throw new Error('Failed to create summary with audio');
                         const data = await response.json();
-                        setSummaries([data, ...summaries]);
+                        fetchSummaries(0);
                         setCurrentSummary(data);
                       } else {
                         await createVisualSummary(topic, context);
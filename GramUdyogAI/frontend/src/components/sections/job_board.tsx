@@ -2,6 +2,7 @@ import React, { useState, useEffect } from "react";
 import { useTranslation } from "react-i18next";
 import ParticleBackground from "../ui/ParticleBackground";
 import { jobAPI, Job } from "../../lib/api"; // Import Job interface from api.ts
+import { postEventStream } from "../../lib/sse";
 
 // Remove duplicate Job interface since it's imported from api.ts
 
@@ -175,46 +176,34 @@ const JobBoard = () => {
     setLoading(true);
     
     try {
-      const response = await fetch(`${API_BASE_URL}/api/recommend-job-smart`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ user_info: userInfo }),
-      });
-
-      const responseText = await response.text();
-      if (!response.ok) {
-        try {
-          const errorData = JSON.parse(responseText);
-          console.error(`Error: ${errorData.detail}`);
-        } catch (err) {
-          console.error("Error processing error response:", responseText);
+      // The streaming variant sends the ranked candidates before the match
+      // explanations, so the top match is shown while those are generated
+      const data = await postEventStream(
+        `${API_BASE_URL}/api/recommend-job-smart/stream`,
+        { user_info: userInfo },
+        (event, payload) => {
+          if (event === "progress" && payload.stage === "candidates_retrieved" && payload.candidates?.length) {
+            setRecommendedJob(payload.candidates[0]);
+          }
         }
-        return;
-      }
+      );
 
-      try {
-        const data = JSON.parse(responseText);
-        console.log("Full API Response:", data);
-        console.log("Recommended Job Object:", data.best_job);
-        console.log("Job Properties:", Object.keys(data.best_job || {}));
-        console.log("Company Contact Field:", data.best_job?.company_contact);
-        console.log("All Contact Related Fields:", Object.keys(data.best_job || {}).filter(key => key.toLowerCase().includes('contact')));
-        
-        // Check if this job has contact info
-        if (data.best_job?.company_contact) {
-          console.log("✅ Job HAS contact info:", data.best_job.company_contact);
-        } else {
-          console.log("❌ Job does NOT have contact info");
-          console.log("Job Source:", data.best_job?.source);
-          console.log("Job ID:", data.best_job?.id);
-        }
-        
-        setRecommendedJob(data.best_job);
-      } catch (err) {
-        console.error("Error parsing job recommendation JSON:", err, "Raw response:", responseText);
+      console.log("Full API Response:", data);
+      console.log("Recommended Job Object:", data.best_job);
+      console.log("Job Properties:", Object.keys(data.best_job || {}));
+      console.log("Company Contact Field:", data.best_job?.company_contact);
+      console.log("All Contact Related Fields:", Object.keys(data.best_job || {}).filter(key => key.toLowerCase().includes('contact')));
+      
+      // Check if this job has contact info
+      if (data.best_job?.company_contact) {
+        console.log("✅ Job HAS contact info:", data.best_job.company_contact);
+      } else {
+        console.log("❌ Job does NOT have contact info");
+        console.log("Job Source:", data.best_job?.source);
+        console.log("Job ID:", data.best_job?.id);
       }
+      
+      setRecommendedJob(data.best_job);
     } catch (error) {
       console.error("Error fetching job recommendation:", error);
     } finally {
@@ -676,6 +676,19 @@ export interface VisualSummary {
   created_at: string;
 }
 
+export interface VisualSummaryListItem {
+  id: number;
+  topic: string;
+  created_at: string;
+}
+
+export interface VisualSummaryList {
+  summaries: VisualSummaryListItem[];
+  total_count: number;
+  limit: number;
+  offset: number;
+}
+
 export interface VisualSummaryCreate {
   topic: string;
   context: string;
@@ -1224,8 +1237,8 @@ export class VisualSummaryAPI {
   }
 
   // READ
-  async getVisualSummaries(): Promise<ApiResponse<VisualSummary[]>> {
-    return this.api.get<VisualSummary[]>('/api/visual-summaries');
+  async getVisualSummaries(limit = 20, offset = 0): Promise<ApiResponse<VisualSummaryList>> {
+    return this.api.get<VisualSummaryList>(`/api/visual-summaries?limit=${limit}&offset=${offset}`);
   }
 
   async getVisualSummaryById(id: number): Promise<ApiResponse<VisualSummary>> {
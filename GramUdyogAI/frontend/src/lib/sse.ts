@@ -0,0 +1,59 @@
+// Client for the POST /stream endpoints (core/streaming.py on the backend).
+// EventSource only supports GET, so the Server-Sent Events are read from a
+// fetch body: each "event: <name>\ndata: <json>\n\n" block is passed to
+// onEvent as it arrives, and the data of the final "result" event is returned.
+
+export type StreamEventHandler = (event: string, data: any) => void;
+
+export async function postEventStream<T = any>(
+  url: string,
+  body: unknown,
+  onEvent: StreamEventHandler = () => {}
+): Promise<T> {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(body),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result: T | undefined;
+  let received = false;
+
+  const dispatch = (block: string) => {
+    let event = 'message';
+    const dataLines: string[] = [];
+    for (const line of block.split('\n')) {
+      // Lines starting with ':' are keep-alive comments
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      else if (line.startsWith('data:')) dataLines.push(line.slice(5).trimStart());
+    }
+    if (!dataLines.length) return;
+    const data = JSON.parse(dataLines.join('\n'));
+    if (event === 'error') throw new Error(data?.detail || 'Streaming request failed');
+    if (event === 'result') {
+      result = data;
+      received = true;
+    }
+    onEvent(event, data);
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      dispatch(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+    }
+    if (done) break;
+  }
+  if (buffer.trim()) dispatch(buffer);
+  if (!received) throw new Error('Stream ended without a result');
+  return result as T;
+}
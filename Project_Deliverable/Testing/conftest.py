@@ -23,6 +23,19 @@ def test_app():
     return app
 
 
+@pytest.fixture(scope="function")
+def temp_db(tmp_path, monkeypatch):
+    """
+    Fresh, fully initialized gramudyogai.db in a temporary working directory,
+    for tests that exercise the backend's services without the full app
+    """
+    monkeypatch.chdir(tmp_path)
+    from init_db import init_database, migrate_database_schema
+    init_database()
+    migrate_database_schema()
+    return tmp_path / "gramudyogai.db"
+
+
 @pytest.fixture(scope="function")
 def client(test_app) -> Generator:
     """Create a test client for API testing"""
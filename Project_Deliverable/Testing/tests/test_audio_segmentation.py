@@ -0,0 +1,75 @@
+"""
+Audio segmentation tests for GramUdyogAI
+Long recordings are split on silence, or at the quietest frame when there is
+none, so no segment sent to Whisper exceeds MAX_SEGMENT_SECONDS
+"""
+import asyncio
+import io
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+from core import stt
+from core.audio_segmentation import (
+    AudioSegment, MAX_SEGMENT_SECONDS, TARGET_SAMPLE_RATE, segment_on_silence,
+)
+
+
+def speech(seconds, rng):
+    """Voiced, steady-level signal standing in for uninterrupted speech"""
+    t = np.arange(int(seconds * TARGET_SAMPLE_RATE)) / TARGET_SAMPLE_RATE
+    voiced = np.sin(2 * np.pi * 180 * t) + 0.3 * rng.standard_normal(t.size)
+    return (0.1 * voiced * (0.8 + 0.2 * np.sin(2 * np.pi * 3 * t))).astype(np.float32)
+
+
+def room_noise(seconds, rng):
+    return (0.002 * rng.standard_normal(int(seconds * TARGET_SAMPLE_RATE))).astype(np.float32)
+
+
+@pytest.mark.unit
+class TestSegmentOnSilence:
+    """Segment boundaries for speech with and without pauses"""
+
+    @pytest.fixture
+    def rng(self):
+        return np.random.default_rng(0)
+
+    def assert_covers(self, segments, samples):
+        duration = len(samples) / TARGET_SAMPLE_RATE
+        assert len(segments) > 1
+        assert all(seg.end - seg.start <= MAX_SEGMENT_SECONDS for seg in segments)
+        assert sum(seg.end - seg.start for seg in segments) > 0.95 * duration
+
+    def test_long_speech_without_pauses(self, rng):
+        """A speech-only clip is cut at its quietest frames instead of going up whole"""
+        samples = speech(120, rng)
+        self.assert_covers(segment_on_silence(samples), samples)
+
+    def test_speech_with_short_pauses(self, rng):
+        """400 ms pauses are found even though they are a small share of the frames"""
+        samples = np.concatenate([np.concatenate([speech(3.6, rng), room_noise(0.4, rng)]) for _ in range(22)])
+        self.assert_covers(segment_on_silence(samples), samples)
+
+    def test_silence_has_no_segments(self, rng):
+        assert segment_on_silence(room_noise(20, rng)) == []
+
+
+@pytest.mark.unit
+class TestChunkedTranscription:
+    """Error handling across segment uploads"""
+
+    def test_all_segments_failing_raises(self, monkeypatch):
+        """A recording none of whose segments could be transcribed is an error, not empty text"""
+        segments = [AudioSegment(0.0, 1.0, np.zeros(TARGET_SAMPLE_RATE, dtype=np.float32))] * 3
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("upstream unavailable")
+
+        monkeypatch.setattr(stt, "decode_audio", lambda data: np.zeros(3 * TARGET_SAMPLE_RATE, dtype=np.float32))
+        monkeypatch.setattr(stt, "segment_on_silence", lambda samples: segments)
+        monkeypatch.setattr(stt, "_transcribe", fail)
+
+        with pytest.raises(Exception, match="Could not transcribe"):
+            asyncio.run(stt.transcribe_audio_chunked(io.BytesIO(b"RIFF")))
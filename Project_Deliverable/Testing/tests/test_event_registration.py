@@ -0,0 +1,116 @@
+"""
+Event registration concurrency tests for GramUdyogAI
+Join and leave run as single transactions in services.events: under many
+threads an event must never oversell, register a user twice or let
+current_participants drift from the participant rows
+"""
+import random
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from init_db import get_db
+from services import events as event_service
+
+
+THREADS = 32
+USERS = 200
+CAPACITY = 25
+ROUNDS = 25
+LEAVE_RATIO = 0.3
+
+
+def create_event(capacity):
+    conn = get_db()
+    now = datetime.now().isoformat()
+    cursor = conn.execute('''
+        INSERT INTO events (title, description, event_type, category, location, state,
+                            start_date, end_date, max_participants, current_participants,
+                            organizer_id, organizer_type, created_by, skills_required, tags, status,
+                            created_at, updated_at)
+        VALUES ('Stress test', 'Registration rush', 'workshop', 'test', 'Pune', 'Maharashtra',
+                ?, ?, ?, 0, 1, 'ngo', 1, '[]', '[]', 'active', ?, ?)
+    ''', (now, now, capacity, now, now))
+    conn.commit()
+    event_id = cursor.lastrowid
+    conn.close()
+    return event_id
+
+
+def registration_state(event_id):
+    """(current_participants, participant rows, users registered more than once)"""
+    conn = get_db()
+    counter = conn.execute("SELECT current_participants FROM events WHERE id = ?", (event_id,)).fetchone()[0]
+    rows = conn.execute("SELECT COUNT(*) FROM event_participants WHERE event_id = ?", (event_id,)).fetchone()[0]
+    duplicates = conn.execute('''
+        SELECT COUNT(*) FROM (
+            SELECT user_id FROM event_participants WHERE event_id = ? GROUP BY user_id HAVING COUNT(*) > 1
+        )
+    ''', (event_id,)).fetchone()[0]
+    conn.close()
+    return counter, rows, duplicates
+
+
+@pytest.mark.slow
+@pytest.mark.unit
+class TestEventRegistrationConcurrency:
+    """Capacity and uniqueness of event registrations under concurrent join/leave"""
+
+    def test_join_leave_storm_keeps_invariants(self, temp_db):
+        """Random joins, double-submitted joins and leaves from many threads"""
+        event_id = create_event(CAPACITY)
+        outcomes = Counter()
+        outcomes_lock = threading.Lock()
+
+        def attempt(call, user_id):
+            try:
+                call(event_id, user_id)
+                outcome = f"{call.__name__}: ok"
+            except event_service.EventRegistrationError as e:
+                outcome = f"{call.__name__}: {e.detail}"
+            except sqlite3.OperationalError as e:
+                outcome = f"{call.__name__}: {e}"
+            with outcomes_lock:
+                outcomes[outcome] += 1
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(ROUNDS):
+                user_id = rng.randrange(USERS)
+                # Double-submit half the joins to exercise the UNIQUE constraint
+                attempt(event_service.join_event, user_id)
+                if rng.random() < 0.5:
+                    attempt(event_service.join_event, user_id)
+                if rng.random() < LEAVE_RATIO:
+                    attempt(event_service.leave_event, user_id)
+
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            list(pool.map(worker, range(THREADS)))
+
+        counter, rows, duplicates = registration_state(event_id)
+        assert rows <= CAPACITY
+        assert counter == rows
+        assert duplicates == 0
+        assert outcomes["join_event: ok"] > 0
+        assert outcomes["join_event: User is already a participant"] > 0
+
+    def test_concurrent_joins_fill_exactly_to_capacity(self, temp_db):
+        """More users than seats: exactly capacity joins succeed, the rest see a full event"""
+        event_id = create_event(CAPACITY)
+
+        def join(user_id):
+            try:
+                event_service.join_event(event_id, user_id)
+                return "ok"
+            except event_service.EventRegistrationError as e:
+                return e.detail
+
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = Counter(pool.map(join, range(CAPACITY * 3)))
+
+        assert results == Counter({"ok": CAPACITY, "Event is full": CAPACITY * 2})
+        assert registration_state(event_id) == (CAPACITY, CAPACITY, 0)
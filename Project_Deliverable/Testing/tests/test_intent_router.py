@@ -0,0 +1,42 @@
+"""
+Intent router tests for GramUdyogAI
+Confidently routed requests skip the LLM, so the arguments extracted locally
+must be the bare subject of the request, without cue words or request nouns
+"""
+import pytest
+
+from core.intent_router import extract_local_arguments, extract_subject
+
+
+@pytest.mark.unit
+class TestSubjectExtraction:
+    """extract_subject and the arguments built from it"""
+
+    @pytest.mark.parametrize("text, subject", [
+        ("subsidy for dairy farmers", "dairy farmers"),
+        ("teach me how to do embroidery", "embroidery"),
+        ("what business can I start with sewing skills", "sewing skills"),
+        ("I want to learn about tailoring", "tailoring"),
+        ("tell me about schemes for farmers", "farmers"),
+        ("government schemes for women entrepreneurs", "women entrepreneurs"),
+        ("videos to learn carpentry", "carpentry"),
+        ("I want to learn business management", "business management"),
+    ])
+    def test_subject_without_cue_words(self, text, subject):
+        """The subject follows the first cue, with later cues and request nouns stripped"""
+        assert extract_subject(text) == subject
+
+    @pytest.mark.parametrize("text", ["give me business ideas", "tell me about schemes", "show me jobs"])
+    def test_no_subject(self, text):
+        """Requests that only name what they want have no subject"""
+        assert extract_subject(text) == ""
+
+    def test_scheme_occupation(self):
+        """Scheme requests route with the occupation alone, or a generic one"""
+        assert extract_local_arguments("scheme_recommendation", "tell me about schemes for farmers") == "farmers"
+        assert extract_local_arguments("scheme_recommendation", "tell me about schemes") == ""
+
+    def test_missing_subject_falls_back_to_llm(self):
+        """Intents that need a subject return None when none can be extracted"""
+        assert extract_local_arguments("skill_tutorial", "I want to learn about tailoring") == "tailoring"
+        assert extract_local_arguments("skill_tutorial", "show me a tutorial") is None
@@ -0,0 +1,95 @@
+"""
+Login storm tests for GramUdyogAI
+bcrypt runs on a bounded pool off the event loop: a burst of logins must not
+stall other requests, and work beyond the queue is rejected instead of waiting
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException, status
+
+bcrypt = pytest.importorskip("bcrypt")
+
+from api import routes_auth
+
+
+STORM_LOGINS = 8
+PROBE_INTERVAL = 0.005
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * len(ordered))))]
+
+
+async def measure_loop_lag(storm):
+    """p99 delay (ms) of a 5 ms timer on the event loop while storm() runs"""
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    await storm()
+    done.set()
+    await probe_task
+    return percentile(lags, 99)
+
+
+@pytest.mark.slow
+@pytest.mark.unit
+class TestLoginStorm:
+    """Event-loop latency and queue bounds for password hashing"""
+
+    @pytest.fixture
+    def password_hash(self):
+        # Cost 10 keeps the test quick while each check still takes tens of ms
+        return bcrypt.hashpw(b"Right-password1!", bcrypt.gensalt(rounds=10)).decode("utf-8")
+
+    def test_storm_does_not_stall_event_loop(self, password_hash, monkeypatch):
+        """Concurrent wrong-password checks keep p99 loop lag low, unlike inline bcrypt"""
+        async def inline_storm():
+            async def login():
+                await asyncio.sleep(0)
+                routes_auth.verify_password("Wrong-password1!", password_hash)
+            await asyncio.gather(*(login() for _ in range(STORM_LOGINS)))
+
+        async def pooled_storm():
+            # The semaphore must be created inside the loop that uses it
+            monkeypatch.setattr(routes_auth, "_password_slots", asyncio.Semaphore(routes_auth.PASSWORD_QUEUE_SLOTS))
+            await asyncio.gather(*(
+                routes_auth.verify_password_async("Wrong-password1!", password_hash)
+                for _ in range(STORM_LOGINS)
+            ))
+
+        inline_p99 = asyncio.run(measure_loop_lag(inline_storm))
+        pooled_p99 = asyncio.run(measure_loop_lag(pooled_storm))
+        print(f"\nloop lag p99: inline bcrypt {inline_p99:.1f} ms, bounded pool {pooled_p99:.1f} ms")
+
+        assert pooled_p99 < 25
+        assert pooled_p99 < inline_p99 / 2
+
+    def test_work_beyond_queue_is_rejected(self, monkeypatch):
+        """Once every slot is taken, further password work fails fast with 503"""
+        slots = 3
+        monkeypatch.setattr(routes_auth, "PASSWORD_QUEUE_SLOTS", slots)
+
+        async def storm():
+            monkeypatch.setattr(routes_auth, "_password_slots", asyncio.Semaphore(slots))
+            return await asyncio.gather(
+                *(routes_auth._run_password_work(time.sleep, 0.05) for _ in range(slots + 2)),
+                return_exceptions=True
+            )
+
+        outcomes = asyncio.run(storm())
+        rejected = [o for o in outcomes if isinstance(o, HTTPException)]
+
+        assert len(rejected) == 2
+        assert all(o.status_code == status.HTTP_503_SERVICE_UNAVAILABLE for o in rejected)
+        assert all(o.headers.get("Retry-After") for o in rejected)
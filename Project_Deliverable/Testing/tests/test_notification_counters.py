@@ -0,0 +1,110 @@
+"""
+Notification counter tests for GramUdyogAI
+Deleting a notification and answering a team invite race with duplicate
+requests; only the request that actually changed the row may move the
+per-user counters, add the team member or notify the inviter
+"""
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException, status
+
+from api import routes_notifications
+from init_db import get_db
+
+
+INVITEE_ID = 2
+INVITER_ID = 1
+PROJECT_ID = 7
+DUPLICATES = 8
+
+
+def create_invite():
+    conn = get_db()
+    try:
+        return routes_notifications.create_notification(
+            db=conn,
+            user_id=INVITEE_ID,
+            title="Team Invite",
+            message="Join my project",
+            notification_type="team_invite",
+            related_id=PROJECT_ID,
+            related_type="project",
+            project_id=PROJECT_ID,
+            metadata={
+                "inviter_id": INVITER_ID, "project_id": PROJECT_ID, "project_title": "Solar dryer",
+                "role": "Designer", "skills": ["cad"],
+            },
+        )
+    finally:
+        conn.close()
+
+
+def counters(user_id):
+    conn = get_db()
+    try:
+        return routes_notifications.read_notification_counts(conn.cursor(), user_id)
+    finally:
+        conn.close()
+
+
+def fire_together(db_path, call):
+    """
+    Run call() from DUPLICATES threads while a write lock is held, so every
+    call reads the row before any of them can write; returns the number of
+    calls that succeeded and of 404s
+    """
+    blocker = sqlite3.connect(db_path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    def attempt(_):
+        try:
+            call()
+            return "ok"
+        except HTTPException as e:
+            assert e.status_code == status.HTTP_404_NOT_FOUND
+            return "not found"
+
+    with ThreadPoolExecutor(max_workers=DUPLICATES) as pool:
+        results = pool.map(attempt, range(DUPLICATES))
+        time.sleep(0.5)
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        outcomes = list(results)
+    return outcomes.count("ok"), outcomes.count("not found")
+
+
+@pytest.mark.unit
+class TestNotificationCounters:
+    """Counter deltas under duplicate delete and invite-response requests"""
+
+    def test_duplicate_deletes_decrement_once(self, temp_db):
+        invite_id = create_invite()
+        create_invite()  # keeps the counters above zero, where extra decrements would show
+
+        ok, not_found = fire_together(temp_db, lambda: routes_notifications.delete_notification(invite_id))
+
+        assert (ok, not_found) == (1, DUPLICATES - 1)
+        assert counters(INVITEE_ID)["types"]["team_invite"] == {"total": 1, "unread": 1}
+
+    @pytest.mark.parametrize("action", ["accept", "reject"])
+    def test_duplicate_invite_responses_apply_once(self, temp_db, action):
+        invite_id = create_invite()
+        create_invite()
+        response = routes_notifications.TeamInviteResponse(invite_id=invite_id, action=action)
+
+        ok, not_found = fire_together(
+            temp_db, lambda: routes_notifications.respond_to_team_invite(invite_id, response)
+        )
+
+        assert (ok, not_found) == (1, DUPLICATES - 1)
+        assert counters(INVITEE_ID)["types"]["team_invite"] == {"total": 2, "unread": 1}
+        assert counters(INVITER_ID)["types"]["team_invite_response"] == {"total": 1, "unread": 1}
+        conn = get_db()
+        members = conn.execute(
+            "SELECT COUNT(*) FROM project_team_members WHERE project_id = ? AND user_id = ?", (PROJECT_ID, INVITEE_ID)
+        ).fetchone()[0]
+        conn.close()
+        assert members == (1 if action == "accept" else 0)
@@ -0,0 +1,118 @@
+"""
+Query plan tests for GramUdyogAI
+The hot list and lookup queries must be served by the indexes in
+init_db.INDEX_MANIFEST, never by a full scan of a large table. The SQL is
+imported from the modules that run it, so a changed query is checked as-is.
+"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from api import routes_notifications, routes_projects
+from services import events, tags, user_activity, visual_summaries
+
+
+# (description, SQL, sample parameters)
+HOT_QUERIES = [
+    ("notifications: list for user",
+     routes_notifications.notification_list_sql(), (1, 20, 0)),
+    ("notifications: unread for user",
+     routes_notifications.notification_list_sql(unread_only=True), (1, 20, 0)),
+    ("notifications: by type for user",
+     routes_notifications.notification_list_sql(by_type=True), (1, "team_invite", 20, 0)),
+    ("notifications: unread by type for user",
+     routes_notifications.notification_list_sql(unread_only=True, by_type=True), (1, "team_invite", 20, 0)),
+    ("notifications: pending team invite",
+     routes_notifications.PENDING_TEAM_INVITE_SQL, (1, 1)),
+    ("notifications: mark all as read",
+     routes_notifications.MARK_ALL_READ_SQL, ("2024-01-01", 1)),
+    ("notification_counters: unread count",
+     routes_notifications.UNREAD_COUNT_SQL, (1,)),
+    ("event_participants: leave",
+     events.LEAVE_EVENT_SQL, (1, 1)),
+    ("events: next start transition",
+     events.NEXT_START_SQL, ("2024-01-02",)),
+    ("events: next end transition",
+     events.NEXT_END_SQL, ("2024-01-01",)),
+    *((f"events: due to become {new_status}", events.DUE_EVENTS_SQL.format(condition=condition), params)
+      for new_status, _, condition, params in events.status_transitions(datetime(2024, 1, 1))),
+    ("projects: created by user",
+     routes_projects.USER_PROJECTS_SQL, (1,)),
+    ("project_investments: for project",
+     routes_projects.PROJECT_INVESTMENTS_SQL, (1,)),
+    ("project_investments: existing investment",
+     routes_projects.EXISTING_INVESTMENT_SQL, (1, 1)),
+    ("project_investments: for investor",
+     routes_projects.INVESTOR_INVESTMENTS_SQL, (1,)),
+    ("users: activity counters",
+     user_activity.USER_COUNTS_SQL, {"user_id": 1}),
+    ("users: activity feed",
+     user_activity.USER_FEED_SQL, {"user_id": 1, "limit": 10}),
+    ("job_skills/job_tags: jobs with skill",
+     f"SELECT id FROM job_postings WHERE is_active = 1 AND {tags.tag_filter(['job_skills', 'job_tags'])}",
+     ("python", "python")),
+    ("job_skills/job_tags: skill matches",
+     tags.job_skill_match_sql(2), ("python", "excel", "python", "excel", 50)),
+    ("course_tags: courses with tag",
+     f"SELECT id FROM courses WHERE {tags.tag_filter(['course_tags'])}", ("agriculture",)),
+    # The search route ORs this with name/description LIKE, which scans
+    # anyway; the tag half must still be a range over idx_course_tags_tag
+    ("course_tags: courses with tag prefix",
+     f"SELECT id FROM courses WHERE {tags.tag_prefix_filter(['course_tags'])}",
+     tags.tag_prefix_bounds("tailor")),
+    ("event_skills: events with skill",
+     f"SELECT id FROM events WHERE {tags.tag_filter(['event_skills'])}", ("python",)),
+    ("profile_skills: skills for user",
+     tags.PROFILE_SKILLS_SQL, (1,)),
+    ("visual_summary_sections: sections of summary",
+     visual_summaries.SUMMARY_SECTIONS_SQL, (1,)),
+    ("visual_summary_sections: update audio",
+     visual_summaries.UPDATE_SECTION_AUDIO_SQL, ("/audio/a.wav", 1, 0)),
+]
+
+
+def full_scans(plan):
+    """
+    Plan details that read a whole table. "SCAN t USING [COVERING] INDEX i"
+    walks a whole index, which is just as unbounded for a filtered query;
+    "SCAN CONSTANT ROW" is the FROM-less outer query of scalar subqueries, and
+    a MATERIALIZEd subquery only holds the rows its own plan produced.
+    """
+    materialized = {detail.split()[1] for detail in plan if detail.startswith("MATERIALIZE ")}
+    return [
+        detail for detail in plan
+        if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW"
+        and detail.split()[1] not in materialized
+    ]
+
+
+@pytest.mark.unit
+class TestQueryPlans:
+    """EXPLAIN QUERY PLAN checks against a freshly built schema"""
+
+    @pytest.mark.parametrize(
+        "sql, params", [(sql, params) for _, sql, params in HOT_QUERIES],
+        ids=[description for description, _, _ in HOT_QUERIES]
+    )
+    def test_hot_query_uses_index(self, temp_db, sql, params):
+        """The query plan contains no full table scan"""
+        conn = sqlite3.connect(temp_db)
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+        finally:
+            conn.close()
+
+        assert not full_scans(plan), "\n".join(plan)
+
+    def test_visual_summary_page_is_index_ordered(self, temp_db):
+        """Listing summaries reads idx_visual_summary_created instead of sorting the table"""
+        conn = sqlite3.connect(temp_db)
+        try:
+            plan = [row[3] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN {visual_summaries.SUMMARY_PAGE_SQL}", (20, 0)
+            ).fetchall()]
+        finally:
+            conn.close()
+
+        assert not any("TEMP B-TREE" in detail for detail in plan), "\n".join(plan)